@@ -0,0 +1,51 @@
+import matplotlib
+matplotlib.use("Agg")  # Use non-GUI backend before importing pyplot
+import matplotlib.pyplot as plt
+import numpy as np
+from epydemix.calibration import CalibrationResults
+from epydemix.utils import compute_simulation_dates
+from epydemix.visualization import plot_quantiles, plot_spectral_radius
+from .common import make_model, make_initial_conditions
+
+
+class TimeQuantiles:
+    """Quantiles of simulation and calibration results."""
+    params = [100, 1000]
+    param_names = ["Nsim"]
+
+    def setup(self, Nsim):
+        np.random.seed(0)
+        model = make_model(n_groups=5)
+        self.results = model.run_simulations(start_date="2020-01-01", end_date="2020-06-30", Nsim=Nsim, 
+                                             initial_conditions_dict=make_initial_conditions(model))
+        stacked = self.results.get_stacked_transitions()["S_to_I_total"]
+        self.calibration_results = CalibrationResults(selected_trajectories={0: [{"data": traj} for traj in stacked]})
+
+    def time_get_quantiles_compartments(self, Nsim):
+        self.results.get_quantiles_compartments()
+
+    def time_get_calibration_quantiles(self, Nsim):
+        self.calibration_results.get_calibration_quantiles()
+
+
+class TimePlotting:
+    """Plotting helpers."""
+
+    def setup(self):
+        np.random.seed(0)
+        self.model = make_model(n_groups=16)
+        self.model.add_intervention("school", "2020-03-01", "2020-06-30", reduction_factor=0.5, name="school closure")
+        results = self.model.run_simulations(start_date="2020-01-01", end_date="2020-12-31", Nsim=50, 
+                                             initial_conditions_dict=make_initial_conditions(self.model))
+        self.df_quantiles = results.get_quantiles_compartments()
+        self.simulation_dates = compute_simulation_dates("2020-01-01", "2020-12-31")
+
+    def teardown(self):
+        plt.close("all")
+
+    def time_plot_quantiles(self):
+        plot_quantiles(self.df_quantiles, columns=["I_total", "R_total"])
+
+    def time_plot_spectral_radius(self):
+        self.model.compute_contact_reductions(self.simulation_dates)
+        plot_spectral_radius(self.model)
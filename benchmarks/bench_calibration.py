@@ -0,0 +1,36 @@
+import numpy as np
+from scipy import stats
+from epydemix.calibration import ABCSampler
+from epydemix.model import simulate
+from .common import make_model, make_initial_conditions
+
+
+class TimeABCSampler:
+    """Calibration of a SEIR model with the three ABC strategies."""
+    params = ["rejection", "top_fraction", "smc"]
+    param_names = ["strategy"]
+    timeout = 600
+
+    def setup(self, strategy):
+        np.random.seed(0)
+        model = make_model(n_groups=5, n_compartments=4)
+        initial_conditions = make_initial_conditions(model)
+        parameters = {"epimodel": model, "start_date": "2020-01-01", "end_date": "2020-03-31", 
+                      "initial_conditions_dict": initial_conditions}
+        observed = simulate(**parameters).transitions["S_to_E_0_total"]
+
+        def simulation_function(parameters):
+            return {"data": simulate(**parameters).transitions["S_to_E_0_total"]}
+
+        self.sampler = ABCSampler(simulation_function=simulation_function, 
+                                  priors={"beta": stats.uniform(0.2, 0.2), "gamma": stats.uniform(0.1, 0.2)}, 
+                                  parameters=parameters, 
+                                  observed_data=observed)
+
+    def time_calibrate(self, strategy):
+        if strategy == "rejection":
+            self.sampler.calibrate(strategy="rejection", epsilon=float("inf"), num_particles=100, verbose=False)
+        elif strategy == "top_fraction":
+            self.sampler.calibrate(strategy="top_fraction", top_fraction=0.1, Nsim=100, verbose=False)
+        else:
+            self.sampler.calibrate(strategy="smc", num_particles=50, num_generations=3, verbose=False)
@@ -0,0 +1,20 @@
+import shutil
+import tempfile
+from epydemix.population import load_epydemix_population
+from .common import write_population_data
+
+
+class TimeLoadPopulation:
+    """Loading and aggregation of population data from a local directory."""
+    params = [["home"], ["school", "work", "home", "community"]]
+    param_names = ["layers"]
+
+    def setup(self, layers):
+        self.path = tempfile.mkdtemp()
+        write_population_data(self.path)
+
+    def teardown(self, layers):
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def time_load_epydemix_population(self, layers):
+        load_epydemix_population("Benchmarkland", path_to_data=self.path, layers=layers)
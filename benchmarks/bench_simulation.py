@@ -0,0 +1,68 @@
+import numpy as np
+from epydemix.model import simulate
+from .common import make_model, make_initial_conditions
+
+
+class TimeSimulateGroups:
+    """Scaling of `simulate` with the number of demographic groups."""
+    params = [1, 5, 16, 85]
+    param_names = ["n_groups"]
+
+    def setup(self, n_groups):
+        np.random.seed(0)
+        self.model = make_model(n_groups=n_groups)
+        self.initial_conditions = make_initial_conditions(self.model)
+
+    def time_simulate(self, n_groups):
+        simulate(self.model, start_date="2020-01-01", end_date="2020-12-31", 
+                 initial_conditions_dict=self.initial_conditions)
+
+
+class TimeSimulateCompartments:
+    """Scaling of `simulate` with the number of compartments."""
+    params = [3, 6, 12, 24]
+    param_names = ["n_compartments"]
+
+    def setup(self, n_compartments):
+        np.random.seed(0)
+        self.model = make_model(n_groups=5, n_compartments=n_compartments)
+        self.initial_conditions = make_initial_conditions(self.model)
+
+    def time_simulate(self, n_compartments):
+        simulate(self.model, start_date="2020-01-01", end_date="2020-12-31", 
+                 initial_conditions_dict=self.initial_conditions)
+
+
+class TimeSimulateHorizon:
+    """Scaling of `simulate` with the simulation horizon and the time step."""
+    params = ([90, 365, 730], [1., 1. / 4, 1. / 24])
+    param_names = ["days", "dt"]
+
+    def setup(self, days, dt):
+        np.random.seed(0)
+        self.model = make_model(n_groups=5)
+        self.initial_conditions = make_initial_conditions(self.model)
+        self.end_date = np.datetime64("2020-01-01") + np.timedelta64(days, "D")
+
+    def time_simulate(self, days, dt):
+        simulate(self.model, start_date="2020-01-01", end_date=self.end_date, dt=dt, 
+                 initial_conditions_dict=self.initial_conditions, resample_frequency=None)
+
+    def peakmem_simulate(self, days, dt):
+        simulate(self.model, start_date="2020-01-01", end_date=self.end_date, dt=dt, 
+                 initial_conditions_dict=self.initial_conditions, resample_frequency=None)
+
+
+class TimeRunSimulations:
+    """Scaling of `run_simulations` with the number of simulations."""
+    params = [10, 100]
+    param_names = ["Nsim"]
+
+    def setup(self, Nsim):
+        np.random.seed(0)
+        self.model = make_model(n_groups=5)
+        self.initial_conditions = make_initial_conditions(self.model)
+
+    def time_run_simulations(self, Nsim):
+        self.model.run_simulations(start_date="2020-01-01", end_date="2020-06-30", Nsim=Nsim, 
+                                   initial_conditions_dict=self.initial_conditions)
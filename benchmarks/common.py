@@ -0,0 +1,91 @@
+import os
+import numpy as np
+import pandas as pd
+from epydemix import EpiModel
+from epydemix.population import Population
+
+
+def make_population(n_groups: int, seed: int = 42) -> Population:
+    """
+    Creates a synthetic population with the given number of demographic groups and four contact layers.
+
+    Args:
+        n_groups (int): The number of demographic groups.
+        seed (int, optional): The seed of the random number generator. Defaults to 42.
+
+    Returns:
+        Population: The synthetic population.
+    """
+    rng = np.random.default_rng(seed)
+    population = Population(name="benchmark_population")
+    population.add_population(rng.integers(50000, 500000, size=n_groups), 
+                              [f"group_{i}" for i in range(n_groups)])
+    for layer in ["school", "work", "home", "community"]:
+        population.add_contact_matrix(rng.random(size=(n_groups, n_groups)) / n_groups, layer_name=layer)
+    return population
+
+
+def make_model(n_groups: int = 1, n_compartments: int = 3) -> EpiModel:
+    """
+    Creates a model with a chain of compartments S -> E_1 -> ... -> E_k -> I -> R, where k = n_compartments - 3.
+
+    Args:
+        n_groups (int, optional): The number of demographic groups. Defaults to 1.
+        n_compartments (int, optional): The number of compartments (at least 3). Defaults to 3.
+
+    Returns:
+        EpiModel: The model.
+    """
+    exposed = [f"E_{i}" for i in range(n_compartments - 3)]
+    model = EpiModel(compartments=["S"] + exposed + ["I", "R"], 
+                     parameters={"beta": 0.3, "sigma": 0.5, "gamma": 0.2})
+    chain = ["S"] + exposed + ["I"]
+    model.add_transition(source="S", target=chain[1], kind="mediated", params=("beta", "I"))
+    for source, target in zip(chain[1:-1], chain[2:]):
+        model.add_transition(source=source, target=target, kind="spontaneous", params="sigma")
+    model.add_transition(source="I", target="R", kind="spontaneous", params="gamma")
+    model.set_population(make_population(n_groups))
+    return model
+
+
+def make_initial_conditions(model: EpiModel) -> dict:
+    """
+    Creates initial conditions with 0.1% of each demographic group infected.
+
+    Args:
+        model (EpiModel): The model.
+
+    Returns:
+        dict: The initial conditions.
+    """
+    Nk = np.asarray(model.population.Nk)
+    infected = np.maximum(Nk // 1000, 1)
+    return {"S": Nk - infected, "I": infected}
+
+
+def write_population_data(path: str, population_name: str = "Benchmarkland", seed: int = 42) -> None:
+    """
+    Writes a synthetic population in the layout of the epydemix-data repository, 
+    to benchmark `load_epydemix_population` without network access.
+
+    Args:
+        path (str): The directory where data are written.
+        population_name (str, optional): The name of the population. Defaults to "Benchmarkland".
+        seed (int, optional): The seed of the random number generator. Defaults to 42.
+    """
+    rng = np.random.default_rng(seed)
+    groups = [str(age) for age in range(84)] + ["84+"]
+    
+    pd.DataFrame({"location": [population_name], "primary_contact_source": ["mistry_2021"]}).to_csv(
+        os.path.join(path, "locations.csv"), index=False)
+    
+    demographic_path = os.path.join(path, "data", population_name, "demographic")
+    os.makedirs(demographic_path, exist_ok=True)
+    pd.DataFrame({"group_name": groups, "value": rng.integers(1000, 100000, size=len(groups))}).to_csv(
+        os.path.join(demographic_path, "age_distribution.csv"), index=False)
+    
+    contacts_path = os.path.join(path, "data", population_name, "contact_matrices", "mistry_2021")
+    os.makedirs(contacts_path, exist_ok=True)
+    for layer in ["school", "work", "home", "community"]:
+        pd.DataFrame(rng.random(size=(len(groups), len(groups)))).to_csv(
+            os.path.join(contacts_path, f"contacts_matrix_{layer}.csv"), index=False, header=False)
@@ -0,0 +1,179 @@
+"""
+Offline runner for the epydemix benchmark suite.
+
+Benchmarks follow the airspeed velocity (asv) conventions and can also be run with `asv run`.
+This runner executes them without asv, in the current environment:
+
+    python -m benchmarks.run_benchmarks                          # run all benchmarks
+    python -m benchmarks.run_benchmarks -b Simulate -r 5         # run benchmarks matching "Simulate", 5 repeats
+    python -m benchmarks.run_benchmarks -o baseline.json         # save results as a baseline
+    python -m benchmarks.run_benchmarks -c baseline.json         # compare against a baseline
+"""
+import argparse
+import importlib
+import inspect
+import itertools
+import json
+import pkgutil
+import platform
+import re
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+def discover_benchmarks(pattern: Optional[str] = None) -> List[Tuple[str, type]]:
+    """
+    Discovers benchmark classes in the modules of this package.
+
+    Args:
+        pattern (str, optional): Regular expression to filter benchmarks by name. Defaults to None (all benchmarks).
+
+    Returns:
+        List[Tuple[str, type]]: List of (module name, class) tuples.
+    """
+    package = importlib.import_module(__package__)
+    benchmarks = []
+    for module_info in pkgutil.iter_modules(package.__path__):
+        if not module_info.name.startswith("bench_"):
+            continue
+        module = importlib.import_module(f"{__package__}.{module_info.name}")
+        for name, cls in inspect.getmembers(module, inspect.isclass):
+            if cls.__module__ != module.__name__:
+                continue
+            if pattern is None or re.search(pattern, f"{module_info.name}.{name}"):
+                benchmarks.append((module_info.name, cls))
+    return benchmarks
+
+
+def expand_params(cls: type) -> Tuple[List[str], List[Tuple[Any, ...]]]:
+    """
+    Expands the parameter grid of a benchmark class.
+
+    Args:
+        cls (type): The benchmark class.
+
+    Returns:
+        Tuple[List[str], List[Tuple]]: The parameter names and the list of parameter combinations.
+    """
+    params = getattr(cls, "params", [])
+    if not params:
+        return [], [()]
+    # A single list of parameters is a grid over one parameter
+    if not isinstance(params, tuple):
+        params = (params,)
+    param_names = getattr(cls, "param_names", [f"param{i}" for i in range(len(params))])
+    return list(param_names), list(itertools.product(*params))
+
+
+def run_benchmark(cls: type, method_name: str, params: Tuple[Any, ...], repeat: int) -> float:
+    """
+    Runs a benchmark method for a parameter combination.
+
+    Methods prefixed with `time_` are timed (best wall-clock time over repeats, in seconds),
+    methods prefixed with `peakmem_` are measured in peak traced memory (in bytes).
+
+    Args:
+        cls (type): The benchmark class.
+        method_name (str): The name of the benchmark method.
+        params (tuple): The parameter combination.
+        repeat (int): The number of repeats.
+
+    Returns:
+        float: The measured value.
+    """
+    values = []
+    for _ in range(repeat if method_name.startswith("time_") else 1):
+        instance = cls()
+        if hasattr(instance, "setup"):
+            instance.setup(*params)
+        try:
+            method = getattr(instance, method_name)
+            if method_name.startswith("time_"):
+                start_time = time.perf_counter()
+                method(*params)
+                values.append(time.perf_counter() - start_time)
+            else:
+                tracemalloc.start()
+                method(*params)
+                values.append(tracemalloc.get_traced_memory()[1])
+                tracemalloc.stop()
+        finally:
+            if hasattr(instance, "teardown"):
+                instance.teardown(*params)
+    return float(np.min(values))
+
+
+def run_benchmarks(pattern: Optional[str] = None, repeat: int = 3, verbose: bool = True) -> Dict[str, float]:
+    """
+    Runs all benchmarks matching a pattern.
+
+    Args:
+        pattern (str, optional): Regular expression to filter benchmarks by name. Defaults to None (all benchmarks).
+        repeat (int, optional): The number of repeats of timing benchmarks. Defaults to 3.
+        verbose (bool, optional): Whether to print results as they are collected. Defaults to True.
+
+    Returns:
+        Dict[str, float]: Dictionary mapping benchmark names (including parameters) to measured values.
+    """
+    results = {}
+    for module_name, cls in discover_benchmarks(pattern):
+        param_names, grid = expand_params(cls)
+        methods = [name for name in dir(cls) if name.startswith(("time_", "peakmem_"))]
+        for method_name, params in itertools.product(methods, grid):
+            label = ", ".join(f"{name}={value}" for name, value in zip(param_names, params))
+            key = f"{module_name}.{cls.__name__}.{method_name}({label})"
+            results[key] = run_benchmark(cls, method_name, params, repeat)
+            if verbose:
+                print(f"{key}: {format_value(method_name, results[key])}")
+    return results
+
+
+def format_value(method_name: str, value: float) -> str:
+    """Formats a measured value with its unit."""
+    if method_name.startswith("peakmem_"):
+        return f"{value / 2**20:.2f} MiB"
+    return f"{value * 1000:.2f} ms"
+
+
+def compare(results: Dict[str, float], baseline: Dict[str, float], threshold: float = 1.1) -> None:
+    """
+    Prints the ratio between results and a baseline for the benchmarks they have in common.
+
+    Args:
+        results (Dict[str, float]): The current results.
+        baseline (Dict[str, float]): The baseline results.
+        threshold (float, optional): Ratio above (below the inverse of) which a benchmark is flagged
+            as slower (faster). Defaults to 1.1.
+    """
+    print(f"\n{'ratio':>8}  benchmark")
+    for key in sorted(set(results) & set(baseline)):
+        ratio = results[key] / baseline[key] if baseline[key] > 0 else float("nan")
+        flag = "+" if ratio > threshold else "-" if ratio < 1 / threshold else " "
+        print(f"{flag}{ratio:7.2f}  {key}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the epydemix benchmark suite offline.")
+    parser.add_argument("-b", "--bench", default=None, help="Regular expression to select benchmarks.")
+    parser.add_argument("-r", "--repeat", type=int, default=3, help="Number of repeats of timing benchmarks.")
+    parser.add_argument("-o", "--output", default=None, help="Path of the JSON file where results are saved.")
+    parser.add_argument("-c", "--compare", default=None, help="Path of a JSON baseline to compare results against.")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.bench, args.repeat)
+
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump({"machine": platform.platform(), "python": platform.python_version(),
+                       "results": results}, f, indent=2)
+
+    if args.compare is not None:
+        with open(args.compare) as f:
+            compare(results, json.load(f)["results"])
+
+
+if __name__ == "__main__":
+    main()
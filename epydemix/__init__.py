@@ -1,9 +1,11 @@
 # epydemix/__init__.py
 
 from .model.epimodel import EpiModel, simulate
+from .model.scenarios import run_scenarios
 from .model.predefined_models import load_predefined_model
 __all__ = [
     'EpiModel',
     'simulate',
+    'run_scenarios',
     'load_predefined_model'
 ]
@@ -0,0 +1,20 @@
+# epydemix/analysis/__init__.py
+
+from .sensitivity import (sobol_sample, sobol_indices, morris_sample, morris_indices, evaluate_outputs,
+                          run_sobol_analysis, run_morris_analysis, peak_incidence, attack_rate, peak_size, final_size)
+from .sensitivity_results import SensitivityResults
+
+__all__ = [
+    'sobol_sample',
+    'sobol_indices',
+    'morris_sample',
+    'morris_indices',
+    'evaluate_outputs',
+    'run_sobol_analysis',
+    'run_morris_analysis',
+    'peak_incidence',
+    'attack_rate',
+    'peak_size',
+    'final_size',
+    'SensitivityResults'
+]
@@ -0,0 +1,419 @@
+from concurrent.futures import Executor
+from itertools import repeat
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from scipy.stats import qmc
+from ..model.epimodel import EpiModel
+from ..model.sweep_results import SweepResults
+from .sensitivity_results import SensitivityResults
+
+OutputFunction = Callable[[SweepResults], np.ndarray]
+
+
+def _validate_bounds(bounds: Dict[str, Tuple[float, float]]) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """
+    Validates parameter bounds and returns the parameter names, lower bounds and upper bounds.
+    """
+    if len(bounds) == 0:
+        raise ValueError("At least one parameter must be provided.")
+    names = list(bounds.keys())
+    lower = np.array([bounds[name][0] for name in names], dtype=float)
+    upper = np.array([bounds[name][1] for name in names], dtype=float)
+    if np.any(lower >= upper):
+        raise ValueError("The lower bound of each parameter must be smaller than its upper bound.")
+    return names, lower, upper
+
+
+def sobol_sample(bounds: Dict[str, Tuple[float, float]],
+                 n: int,
+                 seed: Optional[int] = None) -> pd.DataFrame:
+    """
+    Generates a Saltelli design for the estimation of Sobol indices.
+
+    Two independent matrices A and B of n points are drawn from a scrambled Sobol sequence. The design contains
+    A, B and, for each parameter i, the matrix AB_i equal to A with the column i taken from B, for a total of
+    n * (d + 2) points, where d is the number of parameters.
+
+    Args:
+        bounds (Dict[str, Tuple[float, float]]): Dictionary mapping parameter names to their (lower, upper) bounds
+        n (int): The number of base points. It is rounded up to the next power of 2, as required by Sobol sequences
+        seed (int, optional): The seed of the scrambling. Default is None.
+
+    Returns:
+        pd.DataFrame: The design, one row per point and one column per parameter, with rows ordered as A, B, AB_1, ..., AB_d
+
+    Raises:
+        ValueError: If the bounds are not valid or n is not positive.
+    """
+    names, lower, upper = _validate_bounds(bounds)
+    if n < 1:
+        raise ValueError("The number of base points must be positive.")
+    d = len(names)
+    base = qmc.Sobol(d=2 * d, scramble=True, seed=seed).random_base2(int(np.ceil(np.log2(n))))
+    A, B = base[:, :d], base[:, d:]
+    blocks = [A, B]
+    for i in range(d):
+        AB = A.copy()
+        AB[:, i] = B[:, i]
+        blocks.append(AB)
+    return pd.DataFrame(qmc.scale(np.vstack(blocks), lower, upper), columns=names)
+
+
+def sobol_indices(outputs: np.ndarray, n_parameters: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Computes first-order and total Sobol indices from the outputs of a Saltelli design.
+
+    First-order indices use the Saltelli (2010) estimator and total indices the Jansen estimator.
+
+    Args:
+        outputs (np.ndarray): The outputs of the design points, ordered as in `sobol_sample`
+        n_parameters (int): The number of parameters of the design
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The first-order and total indices of each parameter. Indices are NaN if the
+            output has no variance.
+
+    Raises:
+        ValueError: If the number of outputs is not a multiple of n_parameters + 2.
+    """
+    y = np.asarray(outputs, dtype=float)
+    if len(y) % (n_parameters + 2) != 0:
+        raise ValueError("The number of outputs must be a multiple of the number of parameters + 2.")
+    n = len(y) // (n_parameters + 2)
+    f_A, f_B, f_AB = y[:n], y[n:2 * n], y[2 * n:].reshape(n_parameters, n)
+    variance = np.var(np.concatenate([f_A, f_B]))
+    if variance == 0:
+        return np.full(n_parameters, np.nan), np.full(n_parameters, np.nan)
+    first_order = np.mean(f_B * (f_AB - f_A), axis=1) / variance
+    total = 0.5 * np.mean((f_A - f_AB) ** 2, axis=1) / variance
+    return first_order, total
+
+
+def morris_sample(bounds: Dict[str, Tuple[float, float]],
+                  n_trajectories: int,
+                  num_levels: int = 4,
+                  seed: Optional[int] = None) -> pd.DataFrame:
+    """
+    Generates a Morris design of one-at-a-time trajectories.
+
+    The starting points of trajectories are drawn with Latin hypercube sampling and snapped to a grid of
+    `num_levels` levels. Each trajectory then moves every parameter once, in random order, by a step of
+    num_levels / (2 * (num_levels - 1)) of its range.
+
+    Args:
+        bounds (Dict[str, Tuple[float, float]]): Dictionary mapping parameter names to their (lower, upper) bounds
+        n_trajectories (int): The number of trajectories
+        num_levels (int, optional): The number of levels of the grid. Default is 4.
+        seed (int, optional): The random seed. Default is None.
+
+    Returns:
+        pd.DataFrame: The design, one row per point and one column per parameter, with the d + 1 points of each
+            trajectory in consecutive rows
+
+    Raises:
+        ValueError: If the bounds are not valid, n_trajectories is not positive or num_levels is smaller than 2.
+    """
+    names, lower, upper = _validate_bounds(bounds)
+    if n_trajectories < 1:
+        raise ValueError("The number of trajectories must be positive.")
+    if num_levels < 2:
+        raise ValueError("The number of levels must be at least 2.")
+    d = len(names)
+    rng = np.random.default_rng(seed)
+    delta = num_levels / (2 * (num_levels - 1))
+    starts = np.floor(qmc.LatinHypercube(d=d, seed=rng).random(n_trajectories) * num_levels) / (num_levels - 1)
+
+    points = []
+    for start in starts:
+        point = start.copy()
+        points.append(point)
+        for i in rng.permutation(d):
+            point = point.copy()
+            point[i] += delta if point[i] + delta <= 1 + 1e-12 else -delta
+            points.append(point)
+    return pd.DataFrame(lower + np.clip(np.array(points), 0, 1) * (upper - lower), columns=names)
+
+
+def morris_indices(samples: pd.DataFrame,
+                   outputs: np.ndarray,
+                   bounds: Dict[str, Tuple[float, float]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Computes the Morris elementary effects statistics from the outputs of a Morris design.
+
+    Elementary effects are computed with parameters rescaled to the unit interval.
+
+    Args:
+        samples (pd.DataFrame): The design, as returned by `morris_sample`
+        outputs (np.ndarray): The outputs of the design points
+        bounds (Dict[str, Tuple[float, float]]): Dictionary mapping parameter names to their (lower, upper) bounds
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: The mean (mu), mean absolute value (mu_star) and standard
+            deviation (sigma) of the elementary effects of each parameter
+
+    Raises:
+        ValueError: If the number of points is not a multiple of the number of parameters + 1.
+    """
+    names, lower, upper = _validate_bounds(bounds)
+    d = len(names)
+    if len(samples) % (d + 1) != 0 or len(samples) != len(outputs):
+        raise ValueError("The number of points must be a multiple of the number of parameters + 1.")
+    unit = ((samples[names].to_numpy(dtype=float) - lower) / (upper - lower)).reshape(-1, d + 1, d)
+    y = np.asarray(outputs, dtype=float).reshape(-1, d + 1)
+
+    steps = np.diff(unit, axis=1)
+    moved = np.argmax(np.abs(steps), axis=2)
+    effects = np.diff(y, axis=1) / np.take_along_axis(steps, moved[..., None], axis=2)[..., 0]
+
+    elementary_effects = np.empty((len(unit), d))
+    np.put_along_axis(elementary_effects, moved, effects, axis=1)
+    sigma = elementary_effects.std(axis=0, ddof=1) if len(unit) > 1 else np.full(d, np.nan)
+    return elementary_effects.mean(axis=0), np.abs(elementary_effects).mean(axis=0), sigma
+
+
+def evaluate_outputs(epimodel: EpiModel,
+                     samples: pd.DataFrame,
+                     outputs: Dict[str, OutputFunction],
+                     Nsim_per_point: int = 1,
+                     chunk_size: int = 100,
+                     executor: Optional[Executor] = None,
+                     seed: Optional[int] = None,
+                     **simulation_kwargs) -> pd.DataFrame:
+    """
+    Evaluates scalar outputs of the model at each point of a design.
+
+    Design points are simulated in chunks with `EpiModel.sweep`, and each batch of simulations is reduced to its 
+    outputs without storing trajectories, so that memory does not grow with the size of the design. Chunks are run in the
+    executor if provided, each with its own random generator so that results do not depend on scheduling. With a 
+    `ProcessPoolExecutor`, the model and output functions must be picklable, which is the case of the built-in 
+    output functions (custom ones must be defined at module level).
+
+    Args:
+        epimodel (EpiModel): The model to evaluate
+        samples (pd.DataFrame): The design, one row per point and one column per parameter
+        outputs (Dict[str, Callable]): Dictionary mapping output names to functions that take the `SweepResults`
+            of a chunk and return an array of shape (n_points, Nsim_per_point), such as `peak_incidence` or `attack_rate`
+        Nsim_per_point (int, optional): The number of replicates of each point, whose outputs are averaged. Default is 1.
+        chunk_size (int, optional): The number of design points simulated together. Default is 100.
+        executor (Executor, optional): The executor used to run chunks in parallel. Default is None (sequential).
+        seed (int, optional): The random seed. Default is None (seeded from the global numpy random state).
+        **simulation_kwargs: Additional arguments passed to `EpiModel.sweep` (e.g. start_date, end_date,
+            initial_conditions_dict, dt)
+
+    Returns:
+        pd.DataFrame: The outputs, one row per design point and one column per output
+    """
+    if len(outputs) == 0:
+        raise ValueError("At least one output must be provided.")
+    points = samples.to_dict("records")
+    chunks = [points[start:start + chunk_size] for start in range(0, len(points), chunk_size)]
+    if seed is None:
+        seed = np.random.randint(np.iinfo(np.int64).max)
+    seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+
+    sweep_kwargs = dict(Nsim_per_point=Nsim_per_point, resample_frequency=None, **simulation_kwargs)
+    mapper = map if executor is None else executor.map
+    evaluated = mapper(_evaluate_chunk, repeat(epimodel), chunks, seeds, repeat(outputs), repeat(sweep_kwargs))
+    values = {name: np.empty(len(points)) for name in outputs}
+    start = 0
+    for chunk, chunk_values in zip(chunks, evaluated):
+        for name in outputs:
+            values[name][start:start + len(chunk)] = chunk_values[name]
+        start += len(chunk)
+    return pd.DataFrame(values, index=samples.index)
+
+
+def _evaluate_chunk(epimodel: EpiModel,
+                    chunk: List[Dict[str, float]],
+                    chunk_seed: np.random.SeedSequence,
+                    outputs: Dict[str, OutputFunction],
+                    sweep_kwargs: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    """
+    Simulates a chunk of design points and returns their outputs averaged over replicates.
+
+    It is defined at module level so that chunks can be run in worker processes.
+    """
+    results = epimodel.sweep(chunk, outputs=outputs, rng=np.random.default_rng(chunk_seed), **sweep_kwargs)
+    return {name: np.asarray(values, dtype=float).reshape(len(chunk), -1).mean(axis=1)
+            for name, values in results.outputs.items()}
+
+
+def run_sobol_analysis(epimodel: EpiModel,
+                       bounds: Dict[str, Tuple[float, float]],
+                       outputs: Dict[str, OutputFunction],
+                       n: int = 64,
+                       Nsim_per_point: int = 1,
+                       chunk_size: int = 100,
+                       executor: Optional[Executor] = None,
+                       seed: Optional[int] = None,
+                       **simulation_kwargs) -> SensitivityResults:
+    """
+    Runs a variance-based sensitivity analysis and computes first-order and total Sobol indices.
+
+    Args:
+        epimodel (EpiModel): The model to analyze
+        bounds (Dict[str, Tuple[float, float]]): Dictionary mapping parameter names to their (lower, upper) bounds
+        outputs (Dict[str, Callable]): Dictionary mapping output names to output functions (see `evaluate_outputs`)
+        n (int, optional): The number of base points of the Saltelli design, rounded up to a power of 2. Default is 64.
+        Nsim_per_point (int, optional): The number of replicates of each point. Default is 1.
+        chunk_size (int, optional): The number of design points simulated together. Default is 100.
+        executor (Executor, optional): The executor used to run chunks in parallel. Default is None (sequential).
+        seed (int, optional): The random seed of the design and simulations. Default is None.
+        **simulation_kwargs: Additional arguments passed to `EpiModel.sweep`
+
+    Returns:
+        SensitivityResults: The design, outputs and Sobol indices
+    """
+    design_seed, simulation_seed = np.random.SeedSequence(seed).generate_state(2).tolist() if seed is not None else (None, None)
+    samples = sobol_sample(bounds, n, seed=design_seed)
+    values = evaluate_outputs(epimodel, samples, outputs, Nsim_per_point=Nsim_per_point, chunk_size=chunk_size,
+                              executor=executor, seed=simulation_seed, **simulation_kwargs)
+    indices = []
+    for name in outputs:
+        first_order, total = sobol_indices(values[name].to_numpy(), len(bounds))
+        indices.append(pd.DataFrame({"output": name, "parameter": list(bounds), "S1": first_order, "ST": total}))
+    return SensitivityResults(method="sobol", samples=samples, outputs=values,
+                              indices=pd.concat(indices).set_index(["output", "parameter"]))
+
+
+def run_morris_analysis(epimodel: EpiModel,
+                        bounds: Dict[str, Tuple[float, float]],
+                        outputs: Dict[str, OutputFunction],
+                        n_trajectories: int = 10,
+                        num_levels: int = 4,
+                        Nsim_per_point: int = 1,
+                        chunk_size: int = 100,
+                        executor: Optional[Executor] = None,
+                        seed: Optional[int] = None,
+                        **simulation_kwargs) -> SensitivityResults:
+    """
+    Runs an elementary effects (Morris) screening of the model parameters.
+
+    Args:
+        epimodel (EpiModel): The model to analyze
+        bounds (Dict[str, Tuple[float, float]]): Dictionary mapping parameter names to their (lower, upper) bounds
+        outputs (Dict[str, Callable]): Dictionary mapping output names to output functions (see `evaluate_outputs`)
+        n_trajectories (int, optional): The number of trajectories of the Morris design. Default is 10.
+        num_levels (int, optional): The number of levels of the grid. Default is 4.
+        Nsim_per_point (int, optional): The number of replicates of each point. Default is 1.
+        chunk_size (int, optional): The number of design points simulated together. Default is 100.
+        executor (Executor, optional): The executor used to run chunks in parallel. Default is None (sequential).
+        seed (int, optional): The random seed of the design and simulations. Default is None.
+        **simulation_kwargs: Additional arguments passed to `EpiModel.sweep`
+
+    Returns:
+        SensitivityResults: The design, outputs and elementary effects statistics
+    """
+    design_seed, simulation_seed = np.random.SeedSequence(seed).generate_state(2).tolist() if seed is not None else (None, None)
+    samples = morris_sample(bounds, n_trajectories, num_levels=num_levels, seed=design_seed)
+    values = evaluate_outputs(epimodel, samples, outputs, Nsim_per_point=Nsim_per_point, chunk_size=chunk_size,
+                              executor=executor, seed=simulation_seed, **simulation_kwargs)
+    indices = []
+    for name in outputs:
+        mu, mu_star, sigma = morris_indices(samples, values[name].to_numpy(), bounds)
+        indices.append(pd.DataFrame({"output": name, "parameter": list(bounds), "mu": mu, "mu_star": mu_star, "sigma": sigma}))
+    return SensitivityResults(method="morris", samples=samples, outputs=values,
+                              indices=pd.concat(indices).set_index(["output", "parameter"]))
+
+
+def peak_incidence(transition: str) -> OutputFunction:
+    """
+    Returns an output function computing the peak of a transition, summed over demographic groups.
+
+    The incidence is counted per simulation step, so it depends on the time step of the simulation.
+
+    Args:
+        transition (str): The name of the transition (e.g. "S_to_I")
+
+    Returns:
+        Callable: The output function
+    """
+    return _PeakIncidence(transition)
+
+
+def attack_rate(transition: str) -> OutputFunction:
+    """
+    Returns an output function computing the cumulative number of a transition divided by the population size.
+
+    Args:
+        transition (str): The name of the transition (e.g. "S_to_I")
+
+    Returns:
+        Callable: The output function
+    """
+    return _AttackRate(transition)
+
+
+def peak_size(compartment: str) -> OutputFunction:
+    """
+    Returns an output function computing the peak size of a compartment, summed over demographic groups.
+
+    Args:
+        compartment (str): The name of the compartment
+
+    Returns:
+        Callable: The output function
+    """
+    return _PeakSize(compartment)
+
+
+def final_size(compartment: str) -> OutputFunction:
+    """
+    Returns an output function computing the size of a compartment at the end date, summed over demographic groups.
+
+    Args:
+        compartment (str): The name of the compartment
+
+    Returns:
+        Callable: The output function
+    """
+    return _FinalSize(compartment)
+
+
+class _PeakIncidence:
+    """Output function of `peak_incidence`, defined as a class so that it can be sent to worker processes."""
+    def __init__(self, transition: str):
+        self.transition = transition
+
+    def __call__(self, results: SweepResults) -> np.ndarray:
+        return results.transitions[..., _get_index(results.transitions_idx, self.transition), :].sum(axis=-1).max(axis=-1)
+
+
+class _AttackRate:
+    """Output function of `attack_rate`, defined as a class so that it can be sent to worker processes."""
+    def __init__(self, transition: str):
+        self.transition = transition
+
+    def __call__(self, results: SweepResults) -> np.ndarray:
+        cumulative = results.transitions[..., _get_index(results.transitions_idx, self.transition), :].sum(axis=(-2, -1))
+        return cumulative / results.compartments[:, :, 0].sum(axis=(-2, -1))
+
+
+class _PeakSize:
+    """Output function of `peak_size`, defined as a class so that it can be sent to worker processes."""
+    def __init__(self, compartment: str):
+        self.compartment = compartment
+
+    def __call__(self, results: SweepResults) -> np.ndarray:
+        _get_index(results.compartment_idx, self.compartment)
+        return results.get_totals(self.compartment).max(axis=-1)
+
+
+class _FinalSize:
+    """Output function of `final_size`, defined as a class so that it can be sent to worker processes."""
+    def __init__(self, compartment: str):
+        self.compartment = compartment
+
+    def __call__(self, results: SweepResults) -> np.ndarray:
+        _get_index(results.compartment_idx, self.compartment)
+        return results.get_totals(self.compartment)[..., -1]
+
+
+def _get_index(indices: Dict[str, int], name: str) -> int:
+    """
+    Returns the index of a compartment or transition, raising a ValueError if it does not exist.
+    """
+    if name not in indices:
+        raise ValueError(f"{name} is not a compartment or transition of the model. Available: {list(indices)}")
+    return indices[name]
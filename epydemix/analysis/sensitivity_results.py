@@ -0,0 +1,36 @@
+from dataclasses import dataclass
+from typing import Optional
+import pandas as pd
+
+
+@dataclass
+class SensitivityResults:
+    """
+    Class to store the results of a global sensitivity analysis.
+
+    Attributes:
+        method (str): The sensitivity analysis method ("sobol" or "morris")
+        samples (pd.DataFrame): The parameter values of the design, one row per design point
+        outputs (pd.DataFrame): The outputs of the design points, averaged over replicates, one column per output
+        indices (pd.DataFrame): The sensitivity indices, indexed by (output, parameter). For the Sobol method,
+            columns are the first-order ("S1") and total ("ST") indices. For the Morris method, columns are the
+            mean ("mu"), mean absolute value ("mu_star") and standard deviation ("sigma") of elementary effects
+    """
+    method: str
+    samples: pd.DataFrame
+    outputs: pd.DataFrame
+    indices: pd.DataFrame
+
+    def get_indices(self, output: Optional[str] = None) -> pd.DataFrame:
+        """
+        Get the sensitivity indices of an output.
+
+        Args:
+            output (str, optional): The name of the output. If None, the indices of all outputs are returned.
+
+        Returns:
+            pd.DataFrame: The sensitivity indices, indexed by parameter if an output is given
+        """
+        if output is None:
+            return self.indices
+        return self.indices.xs(output, level="output")
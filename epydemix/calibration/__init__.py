@@ -3,6 +3,7 @@
 from .metrics import rmse, wmape, ae, mae, mape
 from .calibration_results import CalibrationResults
 from .abc import ABCSampler
+from .streaming import StreamingDistance, DistanceMonitor, SimulationAborted
 
 __all__ = [
     'rmse',
@@ -11,5 +12,8 @@ __all__ = [
     'mae',
     'mape',
     'CalibrationResults',
-    'ABCSampler'
+    'ABCSampler',
+    'StreamingDistance',
+    'DistanceMonitor',
+    'SimulationAborted'
 ]
\ No newline at end of file
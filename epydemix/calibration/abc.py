@@ -1,16 +1,32 @@
-from typing import Callable, Dict, Any, Optional, List
-import copy
+from typing import Callable, Dict, Any, Optional, List, Iterator, Tuple, Union
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import contextmanager
+from collections import deque
+from copy import deepcopy
+from dataclasses import replace
+import itertools
+import os
 import numpy as np
 import pandas as pd
+from scipy.special import logsumexp
 from datetime import datetime, timedelta
 from .calibration_results import CalibrationResults
 from .metrics import rmse
+from .streaming import StreamingDistance, SimulationAborted
 from ..utils.abc_smc_utils import (
     DefaultPerturbationContinuous, 
     DefaultPerturbationDiscrete, 
-    sample_prior
+    ComponentwisePerturbation,
+    JointPerturbation,
+    LocalPerturbation,
+    MultivariateNormalPerturbation,
+    NearestNeighboursScreening,
+    PriorSampler
 )
 
+# Number of candidates drawn at once when generating proposals
+_PROPOSAL_BLOCK_SIZE = 256
+
 
 class ABCSampler:
     """
@@ -21,8 +37,53 @@ class ABCSampler:
                  priors: Dict[str, Any],
                  parameters: Dict[str, Any],
                  observed_data: Any,
-                 distance_function: Callable = rmse):
-        """Initialize ABC calibration."""
+                 distance_function: Callable = rmse,
+                 executor: Optional[Executor] = None,
+                 workers: int = 1,
+                 batch_size: int = 10,
+                 max_pending: Optional[int] = None,
+                 seed: Optional[int] = None,
+                 streaming_distance: Optional[StreamingDistance] = None):
+        """
+        Initialize ABC calibration.
+
+        Args:
+            simulation_function (Callable): Function taking a dictionary of parameters and returning a dictionary 
+                with the simulated data under the key "data"
+            priors (Dict[str, Any]): Dictionary mapping parameter names to scipy.stats prior distributions
+            parameters (Dict[str, Any]): Fixed parameters passed to the simulation function
+            observed_data (Any): The observed data
+            distance_function (Callable, optional): Distance between observed and simulated data. Default is rmse.
+            executor (Executor, optional): Executor used to simulate proposals in parallel. Default is None.
+            workers (int, optional): Number of worker processes used to simulate proposals when no executor is 
+                provided. Default is 1 (proposals are simulated in the current process).
+            batch_size (int, optional): Number of proposals submitted together to the executor. Default is 10.
+            max_pending (int, optional): Maximum number of batches submitted to the executor ahead of consumption. 
+                Default is None (twice the number of workers, which should match the number of workers of the 
+                executor if one is provided).
+            seed (int, optional): Seed of the calibration. Proposals are generated in the current process and each 
+                simulation is run with its own seed for the global numpy random state, so results for a given seed 
+                do not depend on the number of workers. Default is None (seeded from the global numpy random state).
+            streaming_distance (StreamingDistance, optional): If provided, simulations run with a finite threshold 
+                receive a `DistanceMonitor` under the "step_callback" parameter, to be forwarded to `simulate` or 
+                `run_simulations`, and are aborted and rejected as soon as their distance is known to exceed the 
+                threshold. It must compute the same distance as `distance_function`. Since parameters are passed 
+                as a dictionary, forwarding cannot be checked from the signature of the simulation function: a 
+                ValueError is raised by the first monitored simulation that does not call the monitor. Default is None.
+
+        Note:
+            When running in parallel, the simulation function, the distance function and the parameters must be 
+            picklable (e.g. functions defined at module level). Simulations run in threads share the global numpy 
+            random state, so only process-based executors give reproducible results. Custom perturbation kernels whose `propose` method 
+            does not accept an `rng` argument draw from the global numpy random state, so their proposals are only 
+            reproducible when simulations are run sequentially.
+        """
+        if workers < 1:
+            raise ValueError("The number of workers must be at least 1.")
+        if batch_size < 1:
+            raise ValueError("The batch size must be at least 1.")
+        if max_pending is not None and max_pending < 1:
+            raise ValueError("The maximum number of pending batches must be at least 1.")
         self.simulation_function = simulation_function
         self.priors = priors
         self.parameters = parameters.copy()
@@ -30,15 +91,24 @@ class ABCSampler:
         self.distance_function = distance_function
         self.param_names = list(priors.keys())
         self.results = None  
+        self.executor = executor
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_pending = max_pending if max_pending is not None else 2 * workers
+        self.streaming_distance = streaming_distance
+        self._prior_sampler = None
+        self.seed_sequence = np.random.SeedSequence(seed if seed is not None else np.random.randint(np.iinfo(np.int64).max))
         
         # Separate continuous and discrete parameters
         self.continuous_params = [name for name in self.param_names 
                                 if hasattr(priors[name], 'pdf')]
         self.discrete_params = [name for name in self.param_names 
                               if name not in self.continuous_params]
+        self._discrete_columns = [i for i, name in enumerate(self.param_names) if name in self.discrete_params]
 
     def calibrate(self, 
             strategy: str = "smc",
+            copy: bool = False,
             **kwargs) -> CalibrationResults:
         """Run calibration using the specified strategy.
 
@@ -56,6 +126,8 @@ class ABCSampler:
         ### Arguments:
         - **strategy** (`str`, default: `"smc"`): 
         Specifies the calibration strategy. Must be one of `{"smc", "rejection", "top_fraction"}`.
+        - **copy** (`bool`, default: `False`): Whether to return a deep copy of the results instead of the results 
+        stored in the sampler.
         - **kwargs**: Additional parameters depending on the chosen strategy.
 
         ### Strategy-Specific Arguments:
@@ -68,7 +140,15 @@ class ABCSampler:
         - `minimum_epsilon` (`Optional[float]`, default: `None`): Minimum allowable epsilon value.
         - `max_time` (`Optional[timedelta]`, default: `None`): Maximum allowed runtime.
         - `total_simulations_budget` (`Optional[int]`, default: `None`): Maximum number of allowed simulations.
-        - `perturbations` (`Optional[Dict[str, Any]]`, default: `None`): Perturbation kernels for parameters.
+        - `perturbations` (`Optional[Union[Dict[str, Any], JointPerturbation]]`, default: `None`): Perturbation kernels 
+        for parameters, or a joint kernel acting on all parameters (e.g. `MultivariateNormalPerturbation()`). 
+        Multivariate normal and local kernels are only supported when all priors are continuous.
+        - `screening` (`Optional[NearestNeighboursScreening]`, default: `None`): Surrogate model trained on all 
+        simulations so far, used to simulate only proposals likely to be accepted. Importance weights are corrected 
+        for the screening.
+        - `checkpoint_dir` (`Optional[str]`, default: `None`): Directory where the state at the end of each generation 
+        is written.
+        - `resume_from` (`Optional[str]`, default: `None`): Checkpoint directory of an interrupted run to continue.
         - `verbose` (`bool`, default: `True`): Whether to print progress updates.
 
         #### `"rejection"` (ABC Rejection Sampling)
@@ -85,7 +165,9 @@ class ABCSampler:
         - `verbose` (`bool`, default: `True`): Whether to print progress updates.
 
         ### Returns:
-        - `CalibrationResults`: A deep copy of the results from the chosen calibration strategy.
+        - `CalibrationResults`: The results from the chosen calibration strategy, also stored in `self.results` 
+        (a deep copy if `copy` is True). Each call creates new results, so results returned by previous calls are 
+        not modified.
 
         ### Raises:
         - `ValueError`: If an unknown strategy is specified.
@@ -112,7 +194,7 @@ class ABCSampler:
             raise ValueError(f"Unknown strategy: {strategy}. Must be one of {list(strategies.keys())}")
         
         self.results = strategies[strategy](**kwargs)
-        return copy.deepcopy(self.results)
+        return deepcopy(self.results) if copy else self.results
 
     def run_smc(self,
                 num_particles: int = 1000,
@@ -122,9 +204,20 @@ class ABCSampler:
                 minimum_epsilon: Optional[float] = None,
                 max_time: Optional[timedelta] = None,
                 total_simulations_budget: Optional[int] = None,
-                perturbations: Optional[Dict[str, Any]] = None, 
+                perturbations: Optional[Union[Dict[str, Any], JointPerturbation]] = None, 
+                screening: Optional[NearestNeighboursScreening] = None,
+                checkpoint_dir: Optional[str] = None,
+                resume_from: Optional[str] = None,
                 verbose: bool = True) -> CalibrationResults:
-        """Run ABC-SMC calibration."""
+        """
+        Run ABC-SMC calibration.
+
+        If `checkpoint_dir` is provided, the state at the end of each generation is written to 
+        `generation_<k>.npz` in this directory (see `_save_checkpoint`). A run resumed with `resume_from` set to 
+        such a directory continues after its last generation exactly as the interrupted run would have, provided 
+        that the sampler and the remaining arguments are the same. Simulation budgets and running time include 
+        those of the interrupted run.
+        """
         # Initialize perturbations if not provided
         if perturbations is None:
             perturbations = {
@@ -133,6 +226,17 @@ class ABCSampler:
                        else DefaultPerturbationDiscrete(param, self.priors[param]))
                 for param in self.param_names
             }
+        # Per-parameter kernels are combined into a joint kernel
+        if isinstance(perturbations, dict):
+            perturbation = ComponentwisePerturbation([perturbations[param] for param in self.param_names])
+        elif isinstance(perturbations, JointPerturbation):
+            perturbation = perturbations
+        else:
+            raise ValueError("Perturbations must be a dictionary of per-parameter kernels or a JointPerturbation.")
+        # Continuous proposals of discrete parameters are outside the prior support and would all be rejected
+        if self.discrete_params and isinstance(perturbation, (MultivariateNormalPerturbation, LocalPerturbation)):
+            raise ValueError(f"{type(perturbation).__name__} only supports continuous parameters, "
+                             f"got discrete parameters {self.discrete_params}.")
 
         if verbose:
             print(f"Starting ABC-SMC with {num_particles} particles and {num_generations} generations")
@@ -140,79 +244,117 @@ class ABCSampler:
         # Run generations
         start_time = datetime.now()
         n_simulations = 0
-
-        for gen in range(num_generations):
-            start_generation_time = datetime.now()
-
-            if gen == 0:
-                epsilon = epsilon_schedule[0] if epsilon_schedule is not None else float('inf')
-                if verbose:
-                    print(f"\nGeneration {gen + 1}/{num_generations} (epsilon: {epsilon:.6f})")
-                # Initialize particles, weights, distances, simulations
-                new_gen = self._initialize_particles(
-                    num_particles, 
-                    epsilon
-                )
-                n_simulations += new_gen["n_simulations"]
-
-                # Store results for generation 0
-                results = self._create_results("smc", 
-                             pd.DataFrame(data={self.param_names[i]: new_gen["particles"][:, i] 
-                                              for i in range(len(self.param_names))}), 
-                             new_gen["weights"], new_gen["distances"], new_gen["simulations"])
+        # All simulated parameters and distances, used to train the screening surrogate
+        simulated_particles, simulated_distances = [], []
+        start_generation = 0
+
+        if resume_from is not None:
+            checkpoints = self._load_checkpoints(resume_from)
+            results = self._create_results("smc", 
+                                           pd.DataFrame(checkpoints[0]["particles"], columns=self.param_names), 
+                                           checkpoints[0]["weights"], checkpoints[0]["distances"], 
+                                           checkpoints[0]["simulations"])
+            for gen, checkpoint in enumerate(checkpoints[1:], start=1):
+                results.posterior_distributions[gen] = pd.DataFrame(checkpoint["particles"], columns=self.param_names)
+                results.distances[gen] = checkpoint["distances"]
+                results.weights[gen] = checkpoint["weights"]
+                results.selected_trajectories[gen] = checkpoint["simulations"]
+            simulated_particles = [checkpoint["simulated_particles"] for checkpoint in checkpoints]
+            simulated_distances = [checkpoint["simulated_distances"] for checkpoint in checkpoints]
+            last = checkpoints[-1]
+            particles, weights, distances = last["particles"], last["weights"], last["distances"]
+            n_simulations = last["total_simulations"]
+            start_time -= timedelta(seconds=last["elapsed_seconds"])
+            self.seed_sequence = last["seed_sequence"]
+            start_generation = len(checkpoints)
+            if verbose:
+                print(f"Resuming from generation {start_generation} (epsilon: {last['epsilon']:.6f})")
+
+        with self._parallel_executor() as executor:
+            for gen in range(start_generation, num_generations):
+                start_generation_time = datetime.now()
+
+                if gen == 0:
+                    epsilon = epsilon_schedule[0] if epsilon_schedule is not None else float('inf')
+                    if verbose:
+                        print(f"\nGeneration {gen + 1}/{num_generations} (epsilon: {epsilon:.6f})")
+                    # Initialize particles, weights, distances, simulations
+                    new_gen = self._initialize_particles(
+                        num_particles, 
+                        epsilon,
+                        executor=executor
+                    )
+                    n_simulations += new_gen["n_simulations"]
+                    simulated_particles.append(new_gen["simulated_particles"])
+                    simulated_distances.append(new_gen["simulated_distances"])
+
+                    # Store results for generation 0
+                    results = self._create_results("smc", 
+                                 pd.DataFrame(data={self.param_names[i]: new_gen["particles"][:, i] 
+                                                  for i in range(len(self.param_names))}), 
+                                 new_gen["weights"], new_gen["distances"], new_gen["simulations"])
                 
-                particles = new_gen["particles"]
-                weights = new_gen["weights"]
-                distances = new_gen["distances"]
-                simulations = new_gen["simulations"]
+                    particles = new_gen["particles"]
+                    weights = new_gen["weights"]
+                    distances = new_gen["distances"]
+                    simulations = new_gen["simulations"]
                 
-            else:
-                # Compute epsilon for this generation
-                epsilon = (epsilon_schedule[gen] if epsilon_schedule is not None 
-                        else np.quantile(distances, epsilon_quantile_level))
+                else:
+                    # Compute epsilon for this generation
+                    epsilon = (epsilon_schedule[gen] if epsilon_schedule is not None 
+                            else np.quantile(distances, epsilon_quantile_level))
             
-                if verbose:
-                    print(f"\nGeneration {gen + 1}/{num_generations} (epsilon: {epsilon:.6f})")
+                    if verbose:
+                        print(f"\nGeneration {gen + 1}/{num_generations} (epsilon: {epsilon:.6f})")
                 
-                # Update perturbations
-                for perturbation in perturbations.values():
-                    perturbation.update(particles, weights, self.param_names)
+                    # Update perturbations
+                    perturbation.update(particles, weights, self.param_names, distances=distances, epsilon=epsilon)
+                    if screening is not None:
+                        screening.update(np.concatenate(simulated_particles), np.concatenate(simulated_distances), epsilon)
                     
-                # Run generation
-                new_gen = self._run_smc_generation(
-                    particles, weights, epsilon, 
-                    num_particles, perturbations
-                )
-                n_simulations += new_gen["n_simulations"]
+                    # Run generation
+                    new_gen = self._run_smc_generation(
+                        particles, weights, epsilon, 
+                        num_particles, perturbation,
+                        executor=executor,
+                        screening=screening
+                    )
+                    n_simulations += new_gen["n_simulations"]
+                    simulated_particles.append(new_gen["simulated_particles"])
+                    simulated_distances.append(new_gen["simulated_distances"])
                 
-                # Store results
-                results.posterior_distributions[gen] = pd.DataFrame(data={self.param_names[i]: new_gen["particles"][:, i] for i in range(len(self.param_names))})
-                results.distances[gen] = new_gen["distances"]
-                results.weights[gen] = new_gen["weights"]
-                results.selected_trajectories[gen] = new_gen["simulations"]
+                    # Store results
+                    results.posterior_distributions[gen] = pd.DataFrame(data={self.param_names[i]: new_gen["particles"][:, i] for i in range(len(self.param_names))})
+                    results.distances[gen] = new_gen["distances"]
+                    results.weights[gen] = new_gen["weights"]
+                    results.selected_trajectories[gen] = new_gen["simulations"]
                 
-                # Update current generation
-                particles = new_gen["particles"]
-                weights = new_gen["weights"]
-                distances = new_gen["distances"]
-                simulations = new_gen["simulations"]
+                    # Update current generation
+                    particles = new_gen["particles"]
+                    weights = new_gen["weights"]
+                    distances = new_gen["distances"]
+                    simulations = new_gen["simulations"]
 
-            if verbose:
-                # Print generation information
-                end_generation_time = datetime.now()
-                elapsed_time = end_generation_time - start_generation_time
-                formatted_time = f"{elapsed_time.seconds // 3600:02}:{(elapsed_time.seconds % 3600) // 60:02}:{elapsed_time.seconds % 60:02}"
-                acceptance_rate = len(new_gen["particles"]) / new_gen["n_simulations"] * 100
-                print(f"\tAccepted {len(new_gen['particles'])}/{new_gen['n_simulations']} (acceptance rate: {acceptance_rate:.2f}%)")
-                print(f"\tElapsed time: {formatted_time}")
-
-            # Check stopping conditions
-            if self._check_stopping_conditions(
-                epsilon, minimum_epsilon, 
-                start_time, max_time, 
-                n_simulations, total_simulations_budget
-            ):
-                break
+                if verbose:
+                    # Print generation information
+                    end_generation_time = datetime.now()
+                    elapsed_time = end_generation_time - start_generation_time
+                    formatted_time = f"{elapsed_time.seconds // 3600:02}:{(elapsed_time.seconds % 3600) // 60:02}:{elapsed_time.seconds % 60:02}"
+                    acceptance_rate = len(new_gen["particles"]) / new_gen["n_simulations"] * 100
+                    print(f"\tAccepted {len(new_gen['particles'])}/{new_gen['n_simulations']} (acceptance rate: {acceptance_rate:.2f}%)")
+                    print(f"\tElapsed time: {formatted_time}")
+
+                if checkpoint_dir is not None:
+                    self._save_checkpoint(checkpoint_dir, gen, new_gen, epsilon, n_simulations, 
+                                          (datetime.now() - start_time).total_seconds())
+
+                # Check stopping conditions
+                if self._check_stopping_conditions(
+                    epsilon, minimum_epsilon, 
+                    start_time, max_time, 
+                    n_simulations, total_simulations_budget
+                ):
+                    break
                     
         return results
 
@@ -224,54 +366,47 @@ class ABCSampler:
                      verbose: bool = True, 
                      progress_update_interval: int = 1000) -> CalibrationResults:
         """Run ABC rejection sampling."""
-        simulations, distances = [], []
-        sampled_params = {p: [] for p in self.param_names}
-        
         start_time = datetime.now()
-        n_simulations = 0
-        last_print = 0  # For tracking progress updates
 
         if verbose:
             print(f"Starting ABC rejection sampling with {num_particles} particles and epsilon threshold {epsilon}")
-        
-        while len(distances) < num_particles:
-            # Check stopping conditions
-            if self._check_stopping_conditions(
+
+        def stop(n_simulations: int) -> bool:
+            return self._check_stopping_conditions(
                 None, None, 
                 start_time, max_time, 
                 n_simulations, total_simulations_budget
-            ):
-                break
-                
-            # Sample and simulate
-            params = self._sample_parameters()
-            simulation = self._run_simulation(params)
-            distance = self.distance_function(self.observed_data, simulation)
-            n_simulations += 1
-            
-            if distance < epsilon:
-                simulations.append(simulation)
-                distances.append(distance)
-                for i, p in enumerate(self.param_names):
-                    sampled_params[p].append(params[i])
+            )
 
+        def progress(n_simulations: int, n_accepted: int) -> None:
             # Print progress every progress_update_interval simulations if verbose
-            if verbose and n_simulations % progress_update_interval == 0 and n_simulations != last_print:
-                last_print = n_simulations
-                acceptance_rate = len(distances) / n_simulations * 100
-                print(f"\tSimulations: {n_simulations}, Accepted: {len(distances)}, "
+            if verbose and n_simulations % progress_update_interval == 0:
+                acceptance_rate = n_accepted / n_simulations * 100
+                print(f"\tSimulations: {n_simulations}, Accepted: {n_accepted}, "
                       f"Acceptance rate: {acceptance_rate:.2f}%")
+
+        with self._parallel_executor() as executor:
+            accepted = self._run_proposals(
+                self._sample_parameters, 
+                lambda distance: distance < epsilon, 
+                num_particles, 
+                executor=executor, 
+                stop=stop, 
+                progress=progress,
+                epsilon=epsilon
+            )
+        n_accepted, n_simulations = len(accepted["distances"]), accepted["n_simulations"]
                 
         if verbose:
-            print(f"\tFinal: {len(distances)} particles accepted from {n_simulations} simulations "
-                  f"({len(distances)/n_simulations*100:.2f}% acceptance rate)")
+            print(f"\tFinal: {n_accepted} particles accepted from {n_simulations} simulations "
+                  f"({n_accepted/n_simulations*100:.2f}% acceptance rate)")
                     
         return self._create_results(
             "rejection",
-            pd.DataFrame(sampled_params),
-            np.ones(len(distances)) / len(distances),
-            np.array(distances),
-            simulations
+            pd.DataFrame(accepted["particles"], columns=self.param_names),
+            np.ones(n_accepted) / n_accepted,
+            accepted["distances"],
+            accepted["simulations"]
         )
 
     def run_top_fraction(self,
@@ -279,29 +414,28 @@ class ABCSampler:
                         Nsim: int = 100,
                         verbose: bool = True) -> CalibrationResults:
         """Run ABC top fraction selection."""
-        simulations, distances = [], []
-        sampled_params = {p: [] for p in self.param_names}
-
         if verbose:
             print(f"Starting ABC top fraction selection with {Nsim} simulations and top {top_fraction*100:.1f}% selected")
-        
-        for _ in range(Nsim):
-            params = self._sample_parameters()
-            simulation = self._run_simulation(params)
-            distance = self.distance_function(self.observed_data, simulation)
-            
-            simulations.append(simulation)
-            distances.append(distance)
-            for i, p in enumerate(self.param_names):
-                sampled_params[p].append(params[i])
-
-        # Print progress every 10% if verbose
-        if verbose and (i + 1) % max(1, Nsim // 10) == 0:
-            print(f"\tProgress: {i + 1}/{Nsim} simulations completed ({(i + 1)/Nsim*100:.1f}%)")
+
+        def progress(n_simulations: int, n_accepted: int) -> None:
+            # Print progress every 10% if verbose
+            if verbose and n_simulations % max(1, Nsim // 10) == 0:
+                print(f"\tProgress: {n_simulations}/{Nsim} simulations completed ({n_simulations/Nsim*100:.1f}%)")
+
+        with self._parallel_executor() as executor:
+            evaluated = self._run_proposals(
+                self._sample_parameters, 
+                lambda distance: True, 
+                Nsim, 
+                executor=executor, 
+                progress=progress,
+                max_proposals=Nsim
+            )
+        distances, simulations = evaluated["distances"], evaluated["simulations"]
             
         # Select top fraction
         threshold = np.quantile(distances, top_fraction)
-        mask = np.array(distances) <= threshold
+        mask = distances <= threshold
         n_selected = sum(mask)
         
         if verbose:
@@ -310,28 +444,237 @@ class ABCSampler:
 
         return self._create_results(
             "top_fraction",
-            pd.DataFrame(sampled_params)[mask],
+            pd.DataFrame(evaluated["particles"], columns=self.param_names)[mask],
             np.ones(sum(mask)) / sum(mask),
-            np.array(distances)[mask],
+            distances[mask],
             np.array(simulations)[mask]
         )
 
-    def _run_simulation(self, params: List[float]) -> Dict[str, Any]:
-        """Run a single simulation with given parameters."""
-        full_params = {**self.parameters, 
-                       **dict(zip(self.param_names, params))}
-        simulation = self.simulation_function(full_params)
-        return self._validate_simulation(simulation)
+    @contextmanager
+    def _parallel_executor(self) -> Iterator[Optional[Executor]]:
+        """Yield the executor used to simulate proposals, creating a process pool if needed."""
+        if self.executor is not None:
+            yield self.executor
+        elif self.workers > 1:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                yield executor
+        else:
+            yield None
+
+    def _evaluate_proposals(self, 
+                            proposals: Iterator[Tuple[List[float], int]], 
+                            executor: Optional[Executor] = None,
+                            epsilon: Optional[float] = None) -> Iterator[Tuple[List[float], Dict[str, Any], float]]:
+        """
+        Simulate proposals and yield (params, simulation, distance) in proposal order.
+
+        Without executor, each proposal is simulated when requested. Otherwise, batches of proposals are 
+        submitted ahead of consumption (up to `max_pending`), and pending batches are cancelled when the consumer 
+        stops iterating. If epsilon is finite and the sampler has a streaming distance, simulations exceeding 
+        it are aborted and yielded with no simulation and an infinite distance.
+        """
+        streaming_distance = self.streaming_distance if epsilon is not None and np.isfinite(epsilon) else None
+        if executor is None:
+            for params, seed in proposals:
+                (simulation, distance), = _simulate_proposals(
+                    self.simulation_function, self.distance_function, self.observed_data, 
+                    self.parameters, self.param_names, [(params, seed)], streaming_distance, epsilon)
+                yield params, simulation, distance
+            return
+
+        pending = deque()
+        try:
+            while True:
+                while len(pending) < self.max_pending:
+                    batch = list(itertools.islice(proposals, self.batch_size))
+                    if len(batch) == 0:
+                        break
+                    pending.append((batch, executor.submit(
+                        _simulate_proposals, self.simulation_function, self.distance_function, 
+                        self.observed_data, self.parameters, self.param_names, batch, streaming_distance, epsilon)))
+                if len(pending) == 0:
+                    return
+                batch, future = pending.popleft()
+                for (params, _), (simulation, distance) in zip(batch, future.result()):
+                    yield params, simulation, distance
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+    def _run_proposals(self,
+                       propose: Callable[[np.random.Generator], List[float]],
+                       accept: Callable[[float], bool],
+                       num_particles: int,
+                       executor: Optional[Executor] = None,
+                       stop: Optional[Callable[[int], bool]] = None,
+                       progress: Optional[Callable[[int, int], None]] = None,
+                       max_proposals: Optional[int] = None,
+                       epsilon: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Simulate proposals until num_particles are accepted.
+
+        Proposals and simulation seeds are drawn in the current process from streams spawned from the seed of 
+        the sampler, and results are processed in proposal order, so accepted particles do not depend on the 
+        executor. Proposals simulated ahead of the last processed one are discarded.
 
-    def _validate_simulation(self, simulation: Any) -> Dict[str, Any]:
-        """Ensure simulation output is in correct format."""
-        if not isinstance(simulation, dict):
-            raise ValueError(f"Simulation must return dictionary, got {type(simulation)}")
-        return simulation
+        Args:
+            propose (Callable): Function drawing a block of candidate parameter sets from a random generator, 
+                given the number of draws. It returns an array of shape (n_candidates, n_parameters), where 
+                candidates rejected before simulation (e.g. outside the prior support) have been removed
+            accept (Callable): Function returning whether a distance is accepted
+            num_particles (int): Number of particles to accept
+            executor (Executor, optional): Executor used to simulate proposals. Default is None.
+            stop (Callable, optional): Function of the number of submitted simulations returning whether to stop 
+                early. It is called before each block of candidates is drawn and before each proposal is submitted
+            progress (Callable, optional): Function called with the number of simulations and of accepted 
+                particles after each simulation
+            max_proposals (int, optional): Maximum number of proposals. Default is None (unbounded).
+            epsilon (float, optional): Acceptance threshold above which simulations are aborted early when the 
+                sampler has a streaming distance. Default is None (simulations are run to completion).
+
+        Returns:
+            Dict[str, Any]: The accepted particles, distances and simulations, the number of simulations, and the 
+                parameters and distances of all simulations
+        """
+        proposal_sequence, simulation_sequence = self.seed_sequence.spawn(2)
+        proposal_rng = np.random.default_rng(proposal_sequence)
+        simulation_rng = np.random.default_rng(simulation_sequence)
+
+        def proposals() -> Iterator[Tuple[List[float], int]]:
+            n_proposals = 0
+            while max_proposals is None or n_proposals < max_proposals:
+                # Blocks may be empty when all candidates fall outside the prior support
+                if stop is not None and stop(n_proposals):
+                    return
+                block = propose(proposal_rng, _PROPOSAL_BLOCK_SIZE)
+                seeds = simulation_rng.integers(2**32, size=len(block))
+                for params, seed in zip(block, seeds):
+                    if max_proposals is not None and n_proposals >= max_proposals:
+                        return
+                    if stop is not None and stop(n_proposals):
+                        return
+                    yield self._parameter_values(params), int(seed)
+                    n_proposals += 1
+
+        particles, distances, simulations = [], [], []
+        simulated_particles, simulated_distances = [], []
+        n_simulations = 0
+        evaluated = self._evaluate_proposals(proposals(), executor, epsilon)
+        try:
+            for params, simulation, distance in evaluated:
+                n_simulations += 1
+                simulated_particles.append(params)
+                simulated_distances.append(distance)
+                if accept(distance):
+                    particles.append(params)
+                    distances.append(distance)
+                    simulations.append(simulation)
+                if progress is not None:
+                    progress(n_simulations, len(particles))
+                if len(particles) >= num_particles:
+                    break
+        finally:
+            evaluated.close()
 
-    def _sample_parameters(self) -> List[float]:
-        """Sample parameters from priors."""
-        return sample_prior(self.priors, self.param_names)
+        return {
+            "particles": np.array(particles).reshape(len(particles), len(self.param_names)),
+            "distances": np.array(distances),
+            "simulations": simulations,
+            "n_simulations": n_simulations,
+            "simulated_particles": np.array(simulated_particles).reshape(n_simulations, len(self.param_names)),
+            "simulated_distances": np.array(simulated_distances, dtype=float)
+        }
+
+    def _parameter_values(self, params: np.ndarray) -> List[Any]:
+        """Convert a row of a particles array to parameter values, with integers for discrete priors."""
+        values = params.tolist()
+        for i in self._discrete_columns:
+            values[i] = int(values[i])
+        return values
+
+    def _sample_parameters(self, rng: Optional[np.random.Generator] = None, n: int = 1) -> np.ndarray:
+        """Sample n parameter sets from priors, as an array of shape (n, n_parameters)."""
+        # Samples are buffered per generator, so that each proposal stream reuses its own buffer
+        if self._prior_sampler is None or self._prior_sampler.random_state is not rng:
+            self._prior_sampler = PriorSampler(self.priors, self.param_names, random_state=rng)
+        return self._prior_sampler.sample(n)
+
+    def _save_checkpoint(self, 
+                         checkpoint_dir: str, 
+                         generation: int, 
+                         new_gen: Dict[str, Any], 
+                         epsilon: float, 
+                         total_simulations: int, 
+                         elapsed_seconds: float) -> None:
+        """
+        Write the state at the end of an ABC-SMC generation to `<checkpoint_dir>/generation_<generation>.npz`.
+
+        The file stores as arrays the particles, weights and distances of the generation, its epsilon, the 
+        parameters and distances of all its simulations, the number of simulations so far, the running time and 
+        the state of the seed sequence of the sampler. Selected simulations are stored as one stacked array per 
+        key, and keys whose values cannot be stacked into a numeric array are dropped. Perturbation kernels and 
+        screening surrogates are refitted from these arrays at the start of each generation, so they need no 
+        state of their own. The file is written to a temporary path first, so that an interrupted write 
+        never leaves a corrupted checkpoint.
+        """
+        os.makedirs(checkpoint_dir, exist_ok=True)
+        arrays = {
+            "generation": generation,
+            "epsilon": epsilon,
+            "param_names": np.array(self.param_names),
+            "particles": new_gen["particles"],
+            "weights": new_gen["weights"],
+            "distances": new_gen["distances"],
+            "n_simulations": new_gen["n_simulations"],
+            "total_simulations": total_simulations,
+            "simulated_particles": new_gen["simulated_particles"],
+            "simulated_distances": new_gen["simulated_distances"],
+            "elapsed_seconds": elapsed_seconds,
+            "seed_entropy": np.array(str(self.seed_sequence.entropy)),
+            "seed_spawn_key": np.array(self.seed_sequence.spawn_key, dtype=np.int64),
+            "seed_pool_size": self.seed_sequence.pool_size,
+            "seed_n_children_spawned": self.seed_sequence.n_children_spawned
+        }
+        simulations = new_gen["simulations"]
+        if len(simulations) > 0:
+            for key in simulations[0]:
+                try:
+                    values = np.stack([np.asarray(simulation[key]) for simulation in simulations])
+                except (KeyError, ValueError):
+                    continue
+                if values.dtype.kind in "biufcmM":
+                    arrays[f"simulation_{key}"] = values
+
+        path = os.path.join(checkpoint_dir, f"generation_{generation}.npz")
+        with open(path + ".tmp", "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(path + ".tmp", path)
+
+    def _load_checkpoints(self, checkpoint_dir: str) -> List[Dict[str, Any]]:
+        """Load the checkpoints of consecutive generations written by `_save_checkpoint`, starting from 0."""
+        checkpoints = []
+        for generation in itertools.count():
+            path = os.path.join(checkpoint_dir, f"generation_{generation}.npz")
+            if not os.path.exists(path):
+                break
+            with np.load(path) as data:
+                if list(data["param_names"]) != self.param_names:
+                    raise ValueError(f"The parameters of the checkpoint {path} do not match the priors of the sampler.")
+                checkpoint = {key: data[key] for key in ["particles", "weights", "distances", 
+                                                         "simulated_particles", "simulated_distances"]}
+                checkpoint.update({key: data[key].item() for key in ["epsilon", "total_simulations", "elapsed_seconds"]})
+                keys = [key for key in data.files if key.startswith("simulation_")]
+                checkpoint["simulations"] = [{key[len("simulation_"):]: data[key][i] for key in keys} 
+                                             for i in range(len(checkpoint["particles"]))]
+                checkpoint["seed_sequence"] = np.random.SeedSequence(
+                    int(data["seed_entropy"].item()), 
+                    spawn_key=tuple(data["seed_spawn_key"].tolist()), 
+                    pool_size=int(data["seed_pool_size"]), 
+                    n_children_spawned=int(data["seed_n_children_spawned"]))
+            checkpoints.append(checkpoint)
+        if len(checkpoints) == 0:
+            raise ValueError(f"No checkpoint found in {checkpoint_dir}.")
+        return checkpoints
 
     def _create_results(self, strategy: str, 
                        particles: pd.DataFrame,
@@ -368,114 +711,109 @@ class ABCSampler:
             return True
         return False
 
-    def _initialize_particles(self, num_particles, epsilon):
+    def _initialize_particles(self, num_particles, epsilon, executor=None):
         """
         Initialize the first generation of particles by sampling from priors.
         
         Args:
             num_particles (int): Number of particles to generate
             epsilon (float): Epsilon threshold for initial generation
+            executor (Executor, optional): Executor used to simulate proposals
             
         Returns:
-            tuple: (particles, weights, distances, simulations) where
+            dict: Dictionary with keys particles, weights, distances, simulations and n_simulations, where
                 - particles: numpy array of shape (num_particles, num_parameters)
                 - weights: numpy array of uniform weights
                 - distances: numpy array of distances between simulations and observed data
                 - simulations: list of simulation results
         """
-        particles, weights, distances, simulations = [], [], [], []
-        
-        n_simulations = 0
-        # Sample from priors and run simulations
-        while len(particles) < num_particles:
-            params = sample_prior(self.priors, self.param_names)
-            full_params = {**self.parameters, **dict(zip(self.param_names, params))}
-            simulated_data = self.simulation_function(full_params)
-            dist = self.distance_function(data=self.observed_data, simulation=simulated_data)
-            n_simulations += 1
-            
-            if dist <= epsilon:
-                particles.append(params)
-                weights.append(1.0 / num_particles)  # Uniform weights initially
-                distances.append(dist)
-                simulations.append(simulated_data)
-                
-        return {
-            "particles": np.array(particles),
-            "weights": np.array(weights),
-            "distances": np.array(distances),
-            "simulations": simulations,
-            "n_simulations": n_simulations
-        }
+        new_gen = self._run_proposals(
+            self._sample_parameters, 
+            lambda distance: distance <= epsilon, 
+            num_particles, 
+            executor=executor,
+            epsilon=epsilon
+        )
+        # Uniform weights initially
+        new_gen["weights"] = np.full(len(new_gen["particles"]), 1.0 / num_particles)
+        return new_gen
 
     def _run_smc_generation(self,
                            particles: np.ndarray,
                            weights: np.ndarray,
                            epsilon: float,
                            num_particles: int,
-                           perturbations: Dict[str, Any]) -> Dict[str, Any]:
+                           perturbation: JointPerturbation,
+                           executor: Optional[Executor] = None,
+                           screening: Optional[NearestNeighboursScreening] = None) -> Dict[str, Any]:
         """Run a single generation of ABC-SMC."""
-        new_particles, new_weights, new_distances, new_simulations = [], [], [], []
-        
-        n_simulations = 0
-        for _ in range(num_particles):
-            while True:
-                # Resample a particle based on weights
-                index = np.random.choice(len(particles), p=weights / weights.sum())
-                candidate_params = particles[index]
-
-                # Propose new parameters (perturbation kernel)
-                perturbed_params = [
-                    perturbations[self.param_names[i]].propose(candidate_params[i]) for i in range(len(self.param_names))
-                ]
-
-                # Check if perturbed parameters have prior probability > 0
-                prior_probabilities = [
-                  self.priors[param].pdf(perturbed_params[i]) if param in self.continuous_params
-                  else self.priors[param].pmf(perturbed_params[i])
-                  for i, param in enumerate(self.param_names)
-                ]
-                if all(prob > 0 for prob in prior_probabilities):
-                    simulation = self._run_simulation(perturbed_params)
-                    distance = self.distance_function(self.observed_data, simulation)
-                    n_simulations += 1
-
-                    if distance < epsilon:
-                        new_particles.append(perturbed_params)
-                        weight_numerator = np.prod([
-                          self.priors[param].pdf(perturbed_params[i]) if param in self.continuous_params
-                          else self.priors[param].pmf(perturbed_params[i])
-                          for i, param in enumerate(self.param_names)
-                        ])
-                        weight_denominator = np.sum([
-                            weights[j] * np.prod([
-                                perturbations[self.param_names[i]].pdf(
-                                    perturbed_params[i], particles[j][i]
-                                ) for i in range(len(self.param_names))
-                            ]) for j in range(len(particles))
-                        ])
-                        new_weights.append(weight_numerator / weight_denominator)
-                        new_distances.append(distance)
-                        new_simulations.append(simulation)
-                        break
+        probabilities = weights / weights.sum()
+
+        def propose(rng: np.random.Generator, n: int) -> np.ndarray:
+            # Resample particles based on weights
+            indices = rng.choice(len(particles), size=n, p=probabilities)
+
+            # Propose new parameters (perturbation kernel)
+            perturbed = perturbation.propose_batch(particles[indices], rng=rng, indices=indices)
+
+            # Keep perturbed parameters with prior probability > 0
+            perturbed = perturbed[np.isfinite(self._log_prior_probability(perturbed))]
+
+            # Simulate each proposal with its probability under the screening surrogate
+            if screening is not None:
+                perturbed = perturbed[rng.random(len(perturbed)) < screening.acceptance_probability(perturbed)]
+            return perturbed
+
+        new_gen = self._run_proposals(propose, lambda distance: distance < epsilon, num_particles, 
+                                      executor=executor, epsilon=epsilon)
+
+        screening_probabilities = (screening.acceptance_probability(new_gen["particles"]) 
+                                   if screening is not None else None)
+        new_gen["weights"] = self._compute_weights(new_gen["particles"], particles, weights, perturbation, 
+                                                   screening_probabilities=screening_probabilities)
+        return new_gen
+
+    def _compute_weights(self,
+                         new_particles: np.ndarray,
+                         particles: np.ndarray,
+                         weights: np.ndarray,
+                         perturbation: JointPerturbation,
+                         screening_probabilities: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Compute the normalized importance weights of a new generation of particles.
 
-        # Normalize weights
-        new_weights = np.array(new_weights)
-        new_weights /= new_weights.sum()
-        
-        return {
-            "particles": np.array(new_particles),
-            "weights": np.array(new_weights),
-            "distances": np.array(new_distances),
-            "simulations": new_simulations,
-            "n_simulations": n_simulations
-        }
+        The weight of a new particle is its prior density divided by the weighted sum of the kernel densities 
+        centered on the previous particles. Kernel densities are evaluated in log space as (new, old) matrices, 
+        in blocks of new particles to bound memory, and summed with logsumexp. If proposals were screened, the 
+        proposal density is also multiplied by the probability of each particle passing the screening.
+        """
+        with np.errstate(divide="ignore"):
+            log_weights = np.log(weights)
+        log_denominator = np.empty(len(new_particles))
+        block_size = max(1, 2**20 // max(1, len(particles)))
+        for start in range(0, len(new_particles), block_size):
+            log_kernel = perturbation.logpdf(new_particles[start:start + block_size], particles)
+            log_denominator[start:start + block_size] = logsumexp(log_kernel + log_weights[None, :], axis=1)
+
+        log_new_weights = self._log_prior_probability(new_particles) - log_denominator
+        if screening_probabilities is not None:
+            log_new_weights -= np.log(screening_probabilities)
+        return np.exp(log_new_weights - logsumexp(log_new_weights))
+
+    def _log_prior_probability(self, particles: np.ndarray) -> np.ndarray:
+        """Evaluate the log prior density (or mass) of each row of a particles array."""
+        return np.sum([
+            self.priors[param].logpdf(particles[:, i]) if param in self.continuous_params
+            else self.priors[param].logpmf(particles[:, i])
+            for i, param in enumerate(self.param_names)
+        ], axis=0)
 
     def run_projections(self,
                        parameters: Dict[str, Any],
                        iterations: int = 100,
                        generation: Optional[int] = None,
-                       scenario_id: str = "baseline") -> CalibrationResults:
+                       scenario_id: str = "baseline",
+                       copy: bool = False) -> CalibrationResults:
         """
         Run projections using parameters sampled from the posterior distribution.
 
@@ -484,9 +822,12 @@ class ABCSampler:
             iterations: Number of projection iterations to run. Default is 100.
             generation: Which generation to use for posterior. If None, the last generation is used.
             scenario_id: Identifier for this projection scenario. Default is "baseline".
+            copy: Whether to return a deep copy of the results. Default is False.
 
         Returns:
-            CalibrationResults: A new CalibrationResults object containing the original results plus the new projections
+            CalibrationResults: A new CalibrationResults object containing the original results plus the new projections. 
+                It shares the calibration history with the previous results instead of copying it, and only its 
+                dictionaries of projections are new, so results returned by previous calls are not modified.
         """
         
         # Get posterior distribution from specified generation
@@ -510,7 +851,63 @@ class ABCSampler:
             result = self.simulation_function(proj_params)
             projections.append(result)
 
-        self.results.projections[scenario_id] = projections
-        self.results.projection_parameters[scenario_id] = pd.DataFrame(posterior_samples)
+        self.results = replace(
+            self.results,
+            projections={**self.results.projections, scenario_id: projections},
+            projection_parameters={**self.results.projection_parameters, 
+                                   scenario_id: pd.DataFrame(posterior_samples)}
+        )
  
-        return copy.deepcopy(self.results)
+        return deepcopy(self.results) if copy else self.results
+
+
+def _simulate_proposals(simulation_function: Callable,
+                        distance_function: Callable,
+                        observed_data: Dict[str, Any],
+                        parameters: Dict[str, Any],
+                        param_names: List[str],
+                        proposals: List[Tuple[List[float], int]],
+                        streaming_distance: Optional[StreamingDistance] = None,
+                        epsilon: Optional[float] = None) -> List[Tuple[Optional[Dict[str, Any]], float]]:
+    """
+    Simulate a batch of proposals and compute their distances to the observed data.
+
+    Each simulation is run with the global numpy random state seeded with the seed of its proposal, and the 
+    previous state is restored afterwards. If a streaming distance is given, each simulation receives a monitor 
+    with threshold epsilon under the "step_callback" parameter, and aborted simulations are returned as 
+    (None, inf). Defined at module level so that it can be run in worker processes.
+    """
+    results = []
+    for params, seed in proposals:
+        simulation_parameters = {**parameters, **dict(zip(param_names, params))}
+        monitor = None
+        if streaming_distance is not None:
+            monitor = simulation_parameters["step_callback"] = streaming_distance.monitor(epsilon)
+        state = np.random.get_state()
+        np.random.seed(seed)
+        try:
+            simulation = simulation_function(simulation_parameters)
+        except Exception as e:
+            # Aborts may be wrapped by the simulation (e.g. in the RuntimeError of `run_simulations`)
+            if not _is_aborted(e):
+                raise
+            results.append((None, np.inf))
+            continue
+        finally:
+            np.random.set_state(state)
+        if monitor is not None and monitor.n_steps == 0:
+            raise ValueError("The simulation function did not call the step callback of the streaming distance. "
+                             "It must forward the \"step_callback\" parameter to `simulate` or `run_simulations`.")
+        if not isinstance(simulation, dict):
+            raise ValueError(f"Simulation must return dictionary, got {type(simulation)}")
+        results.append((simulation, distance_function(observed_data, simulation)))
+    return results
+
+
+def _is_aborted(exception: BaseException) -> bool:
+    """Whether an exception, or one of the exceptions it was raised from, is a `SimulationAborted`."""
+    while exception is not None:
+        if isinstance(exception, SimulationAborted):
+            return True
+        exception = exception.__cause__ or exception.__context__
+    return False
@@ -0,0 +1,146 @@
+from typing import Optional, Sequence, Union
+import numpy as np
+import pandas as pd
+
+
+class SimulationAborted(Exception):
+    """
+    Raised by a `DistanceMonitor` to abort a simulation whose distance is known to exceed the threshold.
+    """
+    pass
+
+
+class StreamingDistance:
+    """
+    Distance between an observed series and the corresponding simulated series, accumulated while the simulation
+    runs so that candidates can be rejected early.
+
+    The simulated series is the total over demographic groups of a compartment (value at the last step of each day)
+    or of a transition (sum over the steps of each day), matched to the observations by day. After each observed
+    day, a lower bound of the final distance is computed from the errors seen so far; the simulation is aborted
+    as soon as it exceeds the threshold. The metric and series must match the distance function of the sampler,
+    otherwise candidates may be rejected wrongly.
+
+    Attributes:
+        observed (np.ndarray): The observed values
+        dates (pd.DatetimeIndex): The days of the observations
+        compartment (str, optional): The name of the simulated compartment
+        transition (str, optional): The name of the simulated transition (e.g. "Susceptible_to_Infected")
+        metric (str): The distance metric, one of "rmse", "mae", "mape" and "wmape". Default is "rmse"
+    """
+    metrics = ("rmse", "mae", "mape", "wmape")
+
+    def __init__(self,
+                 observed: Sequence[float],
+                 dates: Sequence[Union[str, pd.Timestamp]],
+                 compartment: Optional[str] = None,
+                 transition: Optional[str] = None,
+                 metric: str = "rmse"):
+        if (compartment is None) == (transition is None):
+            raise ValueError("Exactly one of compartment and transition must be provided.")
+        if metric not in self.metrics:
+            raise ValueError(f"Unknown metric: {metric}. Must be one of {list(self.metrics)}")
+        self.observed = np.asarray(observed, dtype=float)
+        self.dates = pd.DatetimeIndex(dates).normalize()
+        if len(self.observed) != len(self.dates):
+            raise ValueError("The observed values and dates must have the same length.")
+        self.compartment = compartment
+        self.transition = transition
+        self.metric = metric
+        self.positions = {date: k for k, date in enumerate(self.dates)}
+
+    def monitor(self, epsilon: float) -> "DistanceMonitor":
+        """
+        Returns a new monitor of a simulation, to be passed as `step_callback` to `simulate`.
+
+        Args:
+            epsilon (float): The threshold above which the simulation is aborted
+
+        Returns:
+            DistanceMonitor: The monitor
+        """
+        return DistanceMonitor(self, epsilon)
+
+    def lower_bound(self, errors: np.ndarray, observed: np.ndarray) -> float:
+        """
+        Computes the lower bound of the final distance given the errors of the first observations.
+
+        Args:
+            errors (np.ndarray): The errors (observed - simulated) of the observations seen so far
+            observed (np.ndarray): The corresponding observed values
+
+        Returns:
+            float: The lower bound of the distance over all observations
+        """
+        K = len(self.observed)
+        if self.metric == "rmse":
+            return np.sqrt(np.sum(errors**2) / K)
+        if self.metric == "mae":
+            return np.sum(np.abs(errors)) / K
+        if self.metric == "mape":
+            return np.sum(np.abs(errors / observed)) / K
+        return np.sum(np.abs(errors)) / np.sum(np.abs(self.observed))
+
+
+class DistanceMonitor:
+    """
+    Step callback accumulating the streaming distance of one simulation, raising `SimulationAborted` when its
+    lower bound exceeds the threshold.
+
+    A day is closed, and its error added to the bound, at its last step. The time step is inferred from the 
+    dates of the first two steps, so the first day is closed when the second day starts.
+
+    Attributes:
+        distance (StreamingDistance): The streaming distance
+        epsilon (float): The threshold above which the simulation is aborted
+        errors (List[float]): The errors of the observed days closed so far
+        n_steps (int): The number of steps monitored so far
+    """
+    def __init__(self, distance: StreamingDistance, epsilon: float):
+        self.distance = distance
+        self.epsilon = epsilon
+        self.errors, self.observed = [], []
+        self.n_steps = 0
+        self._index = None
+        self._day = None
+        self._value = 0.
+        self._date = None
+        self._step = None
+
+    def __call__(self, epimodel, date: pd.Timestamp, compartments: np.ndarray, transitions: np.ndarray) -> None:
+        if self._index is None:
+            if self.distance.compartment is not None:
+                self._index = ("compartment", epimodel.compartments_idx[self.distance.compartment])
+            else:
+                self._index = ("transition", epimodel.transitions_idx[self.distance.transition])
+
+        date = pd.Timestamp(date)
+        day = date.normalize()
+        if day != self._day:
+            self._close_day()
+            self._day, self._value = day, 0.
+        kind, index = self._index
+        if kind == "compartment":
+            self._value = compartments[index].sum()
+        else:
+            self._value += transitions[index].sum()
+
+        # Close the day at its last step, once the time step is known
+        if self._date is not None:
+            self._step = date - self._date
+        self._date = date
+        self.n_steps += 1
+        if self._step is not None and (date + self._step).normalize() != day:
+            self._close_day()
+
+    def _close_day(self) -> None:
+        """Adds the error of the current day, if observed, and aborts if the distance exceeds the threshold."""
+        position = self.distance.positions.get(self._day)
+        self._day = None
+        if position is None:
+            return
+        observed = self.distance.observed[position]
+        self.errors.append(observed - self._value)
+        self.observed.append(observed)
+        if self.distance.lower_bound(np.array(self.errors), np.array(self.observed)) > self.epsilon:
+            raise SimulationAborted(f"Distance exceeds {self.epsilon} after {len(self.errors)} observations.")
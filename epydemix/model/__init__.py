@@ -3,6 +3,12 @@
 from .epimodel import EpiModel, simulate
 from .transition import Transition
 from .simulation_results import SimulationResults
+from .sweep_results import SweepResults
+from .simulation_stats import SimulationStats
+from .simulation_output import Trajectory, SimulationCheckpoint
+from .scenarios import run_scenarios
+from .random_streams import RandomStreams
+from .reproduction_number import compute_R0, compute_Rt, compute_transmission_rate
 from .predefined_models import load_predefined_model
 
 __all__ = [
@@ -10,5 +16,14 @@ __all__ = [
     'simulate',
     'Transition', 
     'SimulationResults',
+    'SweepResults',
+    'SimulationStats',
+    'Trajectory',
+    'SimulationCheckpoint',
+    'run_scenarios',
+    'RandomStreams',
+    'compute_R0',
+    'compute_Rt',
+    'compute_transmission_rate',
     'load_predefined_model'
 ]
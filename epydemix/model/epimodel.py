@@ -1,16 +1,31 @@
 from .transition import Transition
-from ..utils.utils import format_simulation_output, create_definitions, apply_overrides, generate_unique_string, evaluate, compute_simulation_dates, apply_initial_conditions
-from .simulation_output import Trajectory
+from ..utils.utils import format_simulation_output, create_definitions, compact_parameter, stack_parameters, apply_overrides, compile_overrides, generate_unique_string, evaluate, compute_simulation_dates, apply_initial_conditions
+from .simulation_output import Trajectory, SimulationCheckpoint
 from .simulation_results import SimulationResults
+from .sweep_results import SweepResults
+from .simulation_stats import SimulationStats, profile_phase, profile_run
+from .random_streams import RandomStreams
 import numpy as np 
 import pandas as pd
-from numpy.random import multinomial
 from ..population.population import Population, load_epydemix_population
-from typing import List, Dict, Optional, Union, Any, Callable, Tuple
+from typing import List, Dict, Optional, Union, Any, Callable, Tuple, Iterable, Iterator, AsyncIterator
 import copy
 import inspect
+from dataclasses import replace
+import itertools
+import time
+import os
+import asyncio
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor
 
 
+TRANSITION_FUNCTION_SIGNATURES = {
+    "scalar": ["params", "data"],
+    "vectorized": ["params", "state", "context"],
+    "rate": ["params", "context"]
+}
+
 class EpiModel:
     """
     EpiModel: A compartmental epidemic model simulator
@@ -65,6 +80,7 @@ class EpiModel:
             self.compartments_idx = {}
             self.transitions_idx = {}
             self.transition_functions = {}
+            self.transition_function_modes = {}
             self.parameters = {}
             self.definitions = {}
             self.overrides = {}
@@ -98,8 +114,8 @@ class EpiModel:
             )
 
             # Initalize functions to compute transition probabilities
-            self.register_transition_kind(kind="spontaneous", function=compute_spontaneous_transition_probability)
-            self.register_transition_kind(kind="mediated", function=compute_mediated_transition_probability)
+            self.register_transition_kind(kind="spontaneous", function=compute_spontaneous_transition_rate, mode="rate")
+            self.register_transition_kind(kind="mediated", function=compute_mediated_transition_probabilities, mode="vectorized")
 
 
     def __repr__(self) -> str:
@@ -386,6 +402,29 @@ class EpiModel:
         self.overrides = {}
 
 
+    def get_compiled_overrides(self, 
+                               simulation_dates: List[pd.Timestamp], 
+                               parameter_names: Optional[List[str]] = None) -> Dict[str, List[Tuple[int, int, np.ndarray]]]:
+        """
+        Returns the parameter overrides compiled into integer index ranges over the simulation dates.
+
+        The model is not modified, so that compiled overrides can be computed once and shared by concurrent 
+        simulations with the same dates (see the `compiled_overrides` argument of `simulate`).
+
+        Args:
+            simulation_dates (list of pd.Timestamp): The simulation dates.
+            parameter_names (list of str, optional): The names of the parameters to compile overrides for. 
+                If None, overrides of all parameters are compiled.
+
+        Returns:
+            dict: A dictionary mapping parameter names to lists of `(start, stop, value)` tuples.
+        """
+        if parameter_names is None:
+            parameter_names = list(self.overrides.keys())
+        names = [name for name in self.overrides if name in parameter_names]
+        return compile_overrides({name: self.overrides[name] for name in names}, simulation_dates, len(self.population.Nk))
+
+
     def add_transition(self, source: str, target: str, kind: str, params: Any) -> None:
         """
         Adds a transition to the epidemic model.
@@ -415,19 +454,37 @@ class EpiModel:
             self.transitions_idx[transition_name] = len(self.transitions_idx)
 
 
-    def register_transition_kind(self, kind: str, function: Callable):
+    def register_transition_kind(self, kind: str, function: Callable, mode: str = "scalar"):
         """
         Registers a transition function for a given kind of transition.
 
+        Three forms of transition functions are supported:
+            - "scalar": `function(params, data)` is called once per transition and time step, and returns the 
+              transition probabilities of a single simulation as an array of shape (n_groups,).
+            - "vectorized": `function(params, state, context)` is called once per transition and time step, and 
+              receives the current batch state as an array of shape (n_replicates, n_compartments, n_groups). 
+              It returns transition probabilities for all replicates at once, as an array broadcastable to 
+              (n_replicates, n_groups).
+            - "rate": `function(params, context)` is called once per transition and simulation, and returns the 
+              transition rates over the whole horizon as an array whose first axis is time (length 1 for constant 
+              rates) or a scalar. Probabilities are computed as `1 - exp(-rate * dt)`. This is suited for 
+              transitions whose rates do not depend on the state of the system (e.g., seasonal forcing, waning immunity).
+
         Args:
             kind (str): The kind of transition (e.g., spontaneous or mediated).
             function (Callable): The function to register.
+            mode (str, optional): The form of the transition function, one of "scalar", "vectorized" or "rate". 
+                Defaults to "scalar".
+
+        Raises:
+            ValueError: If the mode is not supported or the function signature doesn't match the mode.
 
         Returns:
             None
         """
-        validate_transition_function(function)
+        validate_transition_function(function, mode=mode)
         self.transition_functions[kind] = function
+        self.transition_function_modes[kind] = mode
 
 
     @property
@@ -505,10 +562,16 @@ class EpiModel:
         self.interventions = []
 
 
-    def apply_intervention(self, intervention: Dict, simulation_dates: List[pd.Timestamp]) -> None:
+    def apply_intervention(self, 
+                           intervention: Dict, 
+                           simulation_dates: List[pd.Timestamp], 
+                           contact_matrices: Optional[Dict[pd.Timestamp, Dict[str, np.ndarray]]] = None) -> None:
         """
         Applies an intervention to the contact matrices for specified simulation dates.
 
+        Contact matrices are not modified in place: the matrices of the affected dates are replaced with new ones, 
+        so that matrices can be shared across dates and simulations.
+
         Args:
             intervention (dict): A dictionary containing intervention details with the following keys:
                 - "layer" (str): The name of the layer to which the intervention applies.
@@ -517,6 +580,7 @@ class EpiModel:
                 - "reduction_factor" (float, optional): The factor by which to reduce the contact matrix.
                 - "new_matrix" (np.ndarray, optional): A new contact matrix to use during the intervention.
             simulation_dates (list of pd.Timestamp): A list of dates for which the simulation is run.
+            contact_matrices (dict, optional): The contact matrices by date to update. Defaults to `self.Cs`.
 
         Raises:
             ValueError: If neither reduction_factor nor new_matrix is provided in the intervention.
@@ -524,6 +588,9 @@ class EpiModel:
         Returns:
             None
         """
+        if contact_matrices is None:
+            contact_matrices = self.Cs
+
         # Early validation of the intervention inputs
         reduction_factor = intervention.get("reduction_factor")
         new_matrix = intervention.get("new_matrix")
@@ -536,12 +603,49 @@ class EpiModel:
         start_date = intervention["start_date"]
         end_date = intervention["end_date"]
 
-        # Apply the intervention to the relevant dates
+        # Apply the intervention to the relevant dates. Dates sharing the same matrices before the intervention 
+        # share the same matrices after it (the original matrices are kept alive to make ids unique)
+        updated = {}
         for date in filter(lambda d: start_date <= d <= end_date, simulation_dates):
-            if reduction_factor is not None:
-                self.Cs[date][layer] *= reduction_factor
-            else:  # If reduction_factor is None, we assume new_matrix is provided
-                self.Cs[date][layer] = new_matrix
+            matrices = contact_matrices[date]
+            if id(matrices) not in updated:
+                new_matrices = dict(matrices)
+                if reduction_factor is not None:
+                    new_matrices[layer] = matrices[layer] * reduction_factor
+                else:  # If reduction_factor is None, we assume new_matrix is provided
+                    new_matrices[layer] = new_matrix
+                updated[id(matrices)] = (matrices, new_matrices)
+            contact_matrices[date] = updated[id(matrices)][1]
+
+
+    def compute_contact_matrices(self, simulation_dates: List[pd.Timestamp]) -> Dict[pd.Timestamp, Dict[str, np.ndarray]]:
+        """
+        Computes the contact matrices for each simulation date, after applying interventions.
+
+        The model is not modified. Dates with the same contacts share the same (read-only) dictionary of matrices, 
+        including the overall contact matrix summed across layers.
+
+        Args:
+            simulation_dates (list of pd.Timestamp): A list of dates over which the simulation is run.
+
+        Returns:
+            dict: A dictionary mapping dates to dictionaries of contact matrices by layer (and "overall").
+        """
+        # All dates initially share the population's contact matrices
+        matrices = {layer: np.copy(matrix) for layer, matrix in self.population.contact_matrices.items()}
+        contact_matrices = {date: matrices for date in simulation_dates}
+
+        # Apply interventions to the contact matrices
+        for intervention in self.interventions:
+            self.apply_intervention(intervention, simulation_dates, contact_matrices)
+
+        # Compute the overall contact matrix for each distinct set of matrices by summing up the contact matrices across layers
+        overall = {}
+        for date, matrices in contact_matrices.items():
+            if id(matrices) not in overall:
+                overall[id(matrices)] = matrices
+                matrices["overall"] = np.sum(np.array(list(matrices.values())), axis=0)
+        return contact_matrices
 
 
     def compute_contact_reductions(self, simulation_dates: List[pd.Timestamp]) -> None:
@@ -549,7 +653,7 @@ class EpiModel:
         Computes the contact reductions for a population over the given simulation dates.
 
         This function applies interventions to the contact matrices and computes the overall contact matrix 
-        for each date in the simulation period.
+        for each date in the simulation period (see `compute_contact_matrices`).
 
         Args:
             simulation_dates (list of pd.Timestamp): A list of dates over which the simulation is run.
@@ -558,17 +662,7 @@ class EpiModel:
             None: The function updates the instance variable `self.Cs` with the contact matrices for each date, 
                 including the overall contact matrix after applying interventions.
         """
-        # Initialize contact matrices for each simulation date, copying the population's initial contact matrices
-        self.Cs = {date: {layer: np.copy(matrix) for layer, matrix in self.population.contact_matrices.items()} 
-                for date in simulation_dates}
-
-        # Apply interventions to the contact matrices
-        for intervention in self.interventions:
-            self.apply_intervention(intervention, simulation_dates)
-
-        # Compute the overall contact matrix for each date by summing up the contact matrices across layers
-        for date in self.Cs:
-            self.Cs[date]["overall"] = np.sum(np.array(list(self.Cs[date].values())), axis=0)
+        self.Cs = self.compute_contact_matrices(simulation_dates)
 
 
     def create_default_initial_conditions(self, percentage_in_agents: float = 0.0005) -> Dict[str, np.ndarray]:
@@ -651,10 +745,18 @@ class EpiModel:
                        resample_frequency: Optional[str] = "D",
                        resample_aggregation_compartments: Optional[Union[str, dict]] = "last",
                        resample_aggregation_transitions: Optional[Union[str, dict]] = "sum",
-                       fill_method: Optional[str] = "ffill") -> SimulationResults:
+                       fill_method: Optional[str] = "ffill",
+                       checkpoints: Optional[List[SimulationCheckpoint]] = None,
+                       return_checkpoint: bool = False,
+                       crn_seed: Optional[int] = None,
+                       workers: int = 1,
+                       profile: bool = False,
+                       step_callback: Optional[Callable[["EpiModel", pd.Timestamp, np.ndarray, np.ndarray], None]] = None) -> SimulationResults:
         """
         Simulates the epidemic model multiple times over the given time period.
 
+        As with `simulate`, the model is not modified (`Cs` and `definitions` are not updated).
+
         Args:
             start_date (str or pd.Timestamp): The start date of the simulation. Default is "2020-01-01".
             end_date (str or pd.Timestamp): The end date of the simulation. Default is "2020-12-31".
@@ -666,6 +768,23 @@ class EpiModel:
             resample_aggregation_compartments (str, optional): The aggregation method to use when resampling the compartments. Default is "last".
             resample_aggregation_transitions (str, optional): The aggregation method to use when resampling the transitions. Default is "sum".
             fill_method (str, optional): Method to fill NaN values after resampling. Default is "ffill".
+            checkpoints (List[SimulationCheckpoint], optional): If provided, simulations are resumed from these checkpoints 
+                up to `end_date`, the i-th simulation starting from `checkpoints[i % len(checkpoints)]`. Random draws of 
+                resumed simulations are independent of the original runs. Default is None.
+            return_checkpoint (bool, optional): If True, the state at the end of each simulation is stored in the 
+                `checkpoint` attribute of its trajectory. Default is False.
+            crn_seed (int, optional): If provided, the i-th simulation draws from the common random numbers streams 
+                of replicate i with this seed (see `RandomStreams`), so that runs with the same seed and different 
+                models or parameters are positively correlated. Default is None (global numpy random state).
+            workers (int, optional): Number of threads running simulations concurrently. With more than one worker, 
+                each simulation draws from its own random generator, seeded from the global numpy random state, so that 
+                results do not depend on thread scheduling. Default is 1 (sequential simulations).
+            profile (bool, optional): If True, per-phase profiling statistics aggregated over all runs are 
+                stored in the `stats` attribute of the results. Memory is not tracked with more than one worker. 
+                Default is False.
+            step_callback (Callable, optional): If provided, called after each time step of each simulation (see 
+                `simulate`). Exceptions raised by the callback abort the run. A `DistanceMonitor` follows a single 
+                simulation, so it must be used with `Nsim=1`. Default is None.
 
         Returns:
             SimulationResults: An object containing all simulation trajectories.
@@ -674,33 +793,410 @@ class EpiModel:
             RuntimeError: If the simulation fails.
         """
         
+        simulation_kwargs = dict(
+            start_date=start_date,
+            end_date=end_date,
+            dt=dt,
+            initial_conditions_dict=initial_conditions_dict,
+            percentage_in_agents=percentage_in_agents,
+            resample_frequency=resample_frequency,
+            resample_aggregation_compartments=resample_aggregation_compartments,
+            resample_aggregation_transitions=resample_aggregation_transitions,
+            fill_method=fill_method,
+            return_checkpoint=return_checkpoint,
+            step_callback=step_callback
+        )
+
         # Run multiple simulations and collect trajectories
         try:
-            trajectories = []
-            for _ in range(Nsim):
-                trajectory = simulate(
-                    self, 
-                    start_date=start_date,
-                    end_date=end_date,
-                    dt=dt,
-                    initial_conditions_dict=initial_conditions_dict,
-                    percentage_in_agents=percentage_in_agents,
-                    resample_frequency=resample_frequency,
-                    resample_aggregation_compartments=resample_aggregation_compartments,
-                    resample_aggregation_transitions=resample_aggregation_transitions,
-                    fill_method=fill_method
-                )
-                trajectories.append(trajectory)
+            compiled_overrides = _compile_overrides(self, simulation_kwargs, checkpoints)
+            if workers <= 1:
+                stats = SimulationStats() if profile else None
+                trajectories = _simulate_replicates(self, range(Nsim), simulation_kwargs, checkpoints=checkpoints, 
+                                                    crn_seed=crn_seed, stats=stats, compiled_overrides=compiled_overrides)
+            else:
+                seeds = _spawn_seeds(Nsim)
+                runs_stats = [SimulationStats(track_memory=False) if profile else None for _ in range(Nsim)]
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    trajectories = list(executor.map(
+                        lambda i: _simulate_replicates(self, [i], simulation_kwargs, checkpoints=checkpoints, crn_seed=crn_seed, 
+                                                       seeds=seeds, stats=runs_stats[i], 
+                                                       compiled_overrides=compiled_overrides)[0], 
+                        range(Nsim)))
+                stats = SimulationStats.aggregate(runs_stats) if profile else None
         except Exception as e:
             raise RuntimeError(f"Simulation failed: {str(e)}") from e
 
         # Return SimulationResults with all trajectories
         return SimulationResults(
             trajectories=trajectories,
-            parameters=self.parameters
+            parameters=self.parameters,
+            stats=stats
         )
 
 
+    def iter_simulations(self, 
+                         Nsim: int = 100, 
+                         chunk_size: Optional[int] = None,
+                         checkpoints: Optional[List[SimulationCheckpoint]] = None,
+                         crn_seed: Optional[int] = None,
+                         **simulation_kwargs) -> Iterator[Union[Trajectory, SimulationResults]]:
+        """
+        Lazily simulates the epidemic model multiple times, yielding trajectories one at a time or in chunks.
+
+        Simulations are only run when the next item is requested, so that the ensemble can be reduced, written 
+        to disk or stopped early without being held in memory. Simulations draw from the global numpy random state, 
+        in the same order as `run_simulations`.
+
+        Args:
+            Nsim (int, optional): The number of simulation runs to perform (default is 100).
+            chunk_size (int, optional): If provided, trajectories are yielded in `SimulationResults` chunks of up to 
+                `chunk_size` simulations. Default is None (trajectories are yielded one at a time).
+            checkpoints (List[SimulationCheckpoint], optional): Checkpoints to resume simulations from (see `run_simulations`).
+            crn_seed (int, optional): Seed of common random numbers streams (see `run_simulations`).
+            **simulation_kwargs: Additional arguments of `simulate` (e.g., start_date, end_date, initial_conditions_dict, dt).
+
+        Yields:
+            Trajectory or SimulationResults: The simulated trajectories, or chunks of trajectories if `chunk_size` is provided.
+        """
+        compiled_overrides = _compile_overrides(self, simulation_kwargs, checkpoints)
+        if chunk_size is None:
+            for i in range(Nsim):
+                yield _simulate_replicates(self, [i], simulation_kwargs, checkpoints=checkpoints, crn_seed=crn_seed, 
+                                           compiled_overrides=compiled_overrides)[0]
+            return
+
+        for start in range(0, Nsim, chunk_size):
+            trajectories = _simulate_replicates(self, range(start, min(start + chunk_size, Nsim)), simulation_kwargs, 
+                                                checkpoints=checkpoints, crn_seed=crn_seed, 
+                                                compiled_overrides=compiled_overrides)
+            yield SimulationResults(trajectories=trajectories, parameters=self.parameters)
+
+
+    def iter_sweep(self, 
+                   parameter_grid: Union[Dict[str, List[Any]], List[Dict[str, Any]]],
+                   Nsim_per_point: int = 10,
+                   start_date: Union[str, pd.Timestamp] = "2020-01-01", 
+                   end_date: Union[str, pd.Timestamp] = "2020-12-31", 
+                   initial_conditions_dict: Optional[Dict[str, np.ndarray]] = None, 
+                   percentage_in_agents: float = 0.0005,
+                   dt: Optional[float] = 1.,
+                   resample_frequency: Optional[str] = "D",
+                   resample_aggregation_compartments: Optional[Union[str, dict]] = "last",
+                   resample_aggregation_transitions: Optional[Union[str, dict]] = "sum",
+                   fill_method: Optional[str] = "ffill",
+                   batch_size: int = 1000,
+                   rng: Optional[np.random.Generator] = None) -> Iterator[SweepResults]:
+        """
+        Lazily simulates the epidemic model for each point of a parameter grid, yielding the results of one batch 
+        of grid points at a time.
+
+        Simulation dates, contact matrices, definitions of the parameters that are not swept and initial conditions 
+        are computed once for the whole sweep. The definitions of the swept parameters are computed per batch, and 
+        the grid points of a batch and their replicates are simulated together, with parameters stacked along the 
+        replicate axis of the engine. Overrides of swept parameters are applied to the value of each grid point. 
+        Only the trajectories of the current batch are held in memory.
+
+        Args:
+            parameter_grid (dict or list of dict): Either a dictionary mapping parameter names to lists of values, 
+                whose cartesian product defines the grid, or a list of dictionaries of parameter values.
+            Nsim_per_point (int, optional): The number of simulations per grid point. Default is 10.
+            start_date (str or pd.Timestamp): The start date of the simulation. Default is "2020-01-01".
+            end_date (str or pd.Timestamp): The end date of the simulation. Default is "2020-12-31".
+            initial_conditions_dict (dict, optional): A dictionary of initial conditions for the simulation.
+            percentage_in_agents (float, optional): The percentage of the population to initialize in the agents compartment.
+            dt (float, optional): The time step for the simulation, expressed in days. Default is 1 (day).
+            resample_frequency (str, optional): The frequency at which to resample the results of grid points. Default is "D" (daily).
+            resample_aggregation_compartments (str, optional): The aggregation method to use when resampling the compartments. Default is "last".
+            resample_aggregation_transitions (str, optional): The aggregation method to use when resampling the transitions. Default is "sum".
+            fill_method (str, optional): Method to fill NaN values after resampling. Default is "ffill".
+            batch_size (int, optional): The maximum number of simulations run together by the engine. Default is 1000.
+            rng (np.random.Generator, optional): If provided, transitions are sampled from this generator instead of the 
+                global numpy random state. Default is None.
+
+        Yields:
+            SweepResults: The results of each batch of grid points. Grid points are addressed by their position 
+                in the batch (e.g. `batch[0]` is the first point of the batch), and the index of `points` gives 
+                their position in the whole grid.
+
+        Raises:
+            ValueError: If the model has no transitions defined, if the grid is empty or if a swept parameter is 
+                neither defined by all grid points nor by the model.
+        """
+        if len(self.transitions_list) == 0:
+            raise ValueError("The model has no transitions defined. Please add transitions before running simulations.")
+
+        points = _grid_points(parameter_grid)
+        if len(points) == 0:
+            raise ValueError("The parameter grid is empty.")
+        swept = list(dict.fromkeys(name for point in points for name in point))
+        for name in swept:
+            if name not in self.parameters and any(name not in point for point in points):
+                raise ValueError(f"Parameter {name} is not defined by all grid points and has no value in the model.")
+
+        # Compute the setup shared by all grid points
+        simulation_dates = compute_simulation_dates(start_date, end_date, dt=dt)
+        T, n_age = len(simulation_dates), len(self.population.Nk)
+        contact_matrices_by_date = self.compute_contact_matrices(simulation_dates)
+        contact_matrices = [contact_matrices_by_date[date] for date in simulation_dates]
+        compiled_overrides = self.get_compiled_overrides(simulation_dates, list(dict.fromkeys(list(self.parameters) + swept)))
+        definitions = create_definitions({name: value for name, value in self.parameters.items() if name not in swept}, T, n_age)
+        definitions = apply_overrides(definitions, self.overrides, simulation_dates, compiled_overrides=compiled_overrides)
+
+        if initial_conditions_dict is None:
+            initial_conditions_dict = self.create_default_initial_conditions(percentage_in_agents=percentage_in_agents)
+        initial_conditions = apply_initial_conditions(self, initial_conditions_dict)
+
+        # Simulate batches of grid points, each replicated Nsim_per_point times along the replicate axis
+        points_per_batch = max(1, batch_size // Nsim_per_point)
+        for start in range(0, len(points), points_per_batch):
+            batch = points[start:start + points_per_batch]
+            parameters = dict(definitions)
+            points_definitions = [
+                apply_overrides(create_definitions({name: point.get(name, self.parameters.get(name)) for name in swept}, T, n_age), 
+                                self.overrides, simulation_dates, compiled_overrides=compiled_overrides)
+                for point in batch
+            ]
+            for name in swept:
+                parameters[name] = stack_parameters([point_definitions[name] for point_definitions in points_definitions], 
+                                                    repeats=Nsim_per_point)
+            compartments_evolution, transitions_evolution = stochastic_simulation(
+                T=T,
+                contact_matrices=contact_matrices,
+                epimodel=self,
+                parameters=parameters,
+                initial_conditions=np.broadcast_to(initial_conditions, (len(batch) * Nsim_per_point,) + initial_conditions.shape),
+                dt=dt,
+                rng=rng
+            )
+            yield SweepResults(points=_points_frame(batch, index=range(start, start + len(batch))), 
+                               compartments=np.moveaxis(compartments_evolution, 1, 0).reshape(
+                                   (len(batch), Nsim_per_point) + compartments_evolution.shape[:1] + compartments_evolution.shape[2:]), 
+                               transitions=np.moveaxis(transitions_evolution, 1, 0).reshape(
+                                   (len(batch), Nsim_per_point) + transitions_evolution.shape[:1] + transitions_evolution.shape[2:]), 
+                               dates=simulation_dates, 
+                               compartment_idx=self.compartments_idx, 
+                               transitions_idx=self.transitions_idx, 
+                               demographics=self.population.Nk_names, 
+                               parameters=self.parameters,
+                               resample_frequency=resample_frequency,
+                               resample_aggregation_compartments=resample_aggregation_compartments,
+                               resample_aggregation_transitions=resample_aggregation_transitions,
+                               fill_method=fill_method,
+                               Nsim_per_point=Nsim_per_point)
+
+
+    def sweep(self, 
+              parameter_grid: Union[Dict[str, List[Any]], List[Dict[str, Any]]],
+              Nsim_per_point: int = 10,
+              outputs: Optional[Dict[str, Callable[[SweepResults], np.ndarray]]] = None,
+              **sweep_kwargs) -> SweepResults:
+        """
+        Simulates the epidemic model for each point of a parameter grid.
+
+        Grid points are simulated in batches with `iter_sweep`. If `outputs` are provided, each batch is reduced to 
+        its outputs before the next one is simulated and trajectories are not stored, so that memory does not grow 
+        with the number of simulations. Otherwise, the trajectories of all grid points are stored, in arrays of 
+        shape (n_points, Nsim_per_point, timesteps, ...): use `outputs` or `iter_sweep` for large sweeps.
+
+        Args:
+            parameter_grid (dict or list of dict): Either a dictionary mapping parameter names to lists of values, 
+                whose cartesian product defines the grid, or a list of dictionaries of parameter values.
+            Nsim_per_point (int, optional): The number of simulations per grid point. Default is 10.
+            outputs (Dict[str, Callable], optional): Dictionary mapping output names to functions that take the 
+                `SweepResults` of a batch and return an array whose first axis is the grid points of the batch 
+                (e.g. peaks of shape (n_points, Nsim_per_point) or quantiles of shape (n_points, n_quantiles, timesteps)). 
+                Default is None (trajectories are stored).
+            **sweep_kwargs: Additional arguments of `iter_sweep` (e.g. start_date, end_date, initial_conditions_dict, 
+                dt, batch_size, rng).
+
+        Returns:
+            SweepResults: The results of the sweep, indexed by grid point, with either the trajectories or the outputs 
+                of all grid points.
+
+        Raises:
+            ValueError: If the model has no transitions defined, if the grid is empty or if a swept parameter is 
+                neither defined by all grid points nor by the model.
+        """
+        points = _grid_points(parameter_grid)
+        compartments, transitions, values = None, None, {}
+        start = 0
+        for batch in self.iter_sweep(points, Nsim_per_point=Nsim_per_point, **sweep_kwargs):
+            stop = start + len(batch)
+            if outputs is not None:
+                for name, output in outputs.items():
+                    values.setdefault(name, []).append(np.asarray(output(batch)))
+            else:
+                # Trajectories of each batch are copied into arrays allocated once, when their shape is known
+                if compartments is None:
+                    compartments = np.empty((len(points),) + batch.compartments.shape[1:])
+                    transitions = np.empty((len(points),) + batch.transitions.shape[1:])
+                compartments[start:stop] = batch.compartments
+                transitions[start:stop] = batch.transitions
+            start = stop
+
+        return replace(batch, 
+                       points=_points_frame(points), 
+                       compartments=compartments, 
+                       transitions=transitions, 
+                       outputs={name: np.concatenate(chunks) for name, chunks in values.items()})
+
+
+    async def aiter_simulations(self, 
+                                Nsim: int = 100, 
+                                chunk_size: int = 10,
+                                max_pending_chunks: Optional[int] = None,
+                                executor: Optional[Executor] = None,
+                                checkpoints: Optional[List[SimulationCheckpoint]] = None,
+                                crn_seed: Optional[int] = None,
+                                **simulation_kwargs) -> AsyncIterator[Trajectory]:
+        """
+        Asynchronously simulates the epidemic model multiple times, yielding trajectories as they complete.
+
+        Simulations are run in chunks in an executor, so that the event loop is not blocked. At most 
+        `max_pending_chunks` chunks are submitted at any time, and new chunks are only submitted when the consumer 
+        requests more trajectories (backpressure). When the iteration is stopped or cancelled, pending chunks are 
+        cancelled and running chunks stop after their current simulation.
+
+        Each simulation draws from its own random generator, seeded from the global numpy random state when the 
+        iteration starts, so that results do not depend on scheduling. Trajectories are yielded in completion order 
+        of their chunks.
+
+        Args:
+            Nsim (int, optional): The number of simulation runs to perform (default is 100).
+            chunk_size (int, optional): The number of simulations per chunk (default is 10).
+            max_pending_chunks (int, optional): The maximum number of chunks submitted at the same time. 
+                Default is None (the number of CPUs).
+            executor (concurrent.futures.Executor, optional): The executor running the chunks. Default is None 
+                (the default executor of the event loop).
+            checkpoints (List[SimulationCheckpoint], optional): Checkpoints to resume simulations from (see `run_simulations`).
+            crn_seed (int, optional): Seed of common random numbers streams (see `run_simulations`).
+            **simulation_kwargs: Additional arguments of `simulate` (e.g., start_date, end_date, initial_conditions_dict, dt).
+
+        Yields:
+            Trajectory: The simulated trajectories.
+        """
+        async for _, trajectories, _ in self._aiter_simulation_chunks(Nsim, chunk_size, max_pending_chunks, executor, 
+                                                                      checkpoints, crn_seed, False, simulation_kwargs):
+            for trajectory in trajectories:
+                yield trajectory
+
+
+    async def arun_simulations(self, 
+                               Nsim: int = 100, 
+                               chunk_size: int = 10,
+                               max_pending_chunks: Optional[int] = None,
+                               executor: Optional[Executor] = None,
+                               checkpoints: Optional[List[SimulationCheckpoint]] = None,
+                               crn_seed: Optional[int] = None,
+                               profile: bool = False,
+                               **simulation_kwargs) -> SimulationResults:
+        """
+        Asynchronous version of `run_simulations`, running simulations in chunks in an executor (see `aiter_simulations`).
+
+        Args:
+            Nsim (int, optional): The number of simulation runs to perform (default is 100).
+            chunk_size (int, optional): The number of simulations per chunk (default is 10).
+            max_pending_chunks (int, optional): The maximum number of chunks submitted at the same time. 
+                Default is None (the number of CPUs).
+            executor (concurrent.futures.Executor, optional): The executor running the chunks. Default is None 
+                (the default executor of the event loop).
+            checkpoints (List[SimulationCheckpoint], optional): Checkpoints to resume simulations from (see `run_simulations`).
+            crn_seed (int, optional): Seed of common random numbers streams (see `run_simulations`).
+            profile (bool, optional): If True, per-phase profiling statistics (without memory tracking) are stored in 
+                the `stats` attribute of the results. Default is False.
+            **simulation_kwargs: Additional arguments of `simulate` (e.g., start_date, end_date, initial_conditions_dict, dt).
+
+        Returns:
+            SimulationResults: An object containing all simulation trajectories, in the order of the simulations.
+
+        Raises:
+            RuntimeError: If the simulation fails.
+        """
+        indexed_trajectories, chunks_stats = [], []
+        try:
+            async for indices, trajectories, chunk_stats in self._aiter_simulation_chunks(
+                    Nsim, chunk_size, max_pending_chunks, executor, checkpoints, crn_seed, profile, simulation_kwargs):
+                indexed_trajectories.extend(zip(indices, trajectories))
+                chunks_stats.append(chunk_stats)
+        except Exception as e:
+            raise RuntimeError(f"Simulation failed: {str(e)}") from e
+
+        return SimulationResults(
+            trajectories=[trajectory for _, trajectory in sorted(indexed_trajectories, key=lambda item: item[0])],
+            parameters=self.parameters,
+            stats=SimulationStats.aggregate(chunks_stats) if profile else None
+        )
+
+
+    async def _aiter_simulation_chunks(self, 
+                                       Nsim: int, 
+                                       chunk_size: int,
+                                       max_pending_chunks: Optional[int],
+                                       executor: Optional[Executor],
+                                       checkpoints: Optional[List[SimulationCheckpoint]],
+                                       crn_seed: Optional[int],
+                                       profile: bool,
+                                       simulation_kwargs: Dict[str, Any]) -> AsyncIterator[Tuple[range, List[Trajectory], Optional[SimulationStats]]]:
+        """
+        Submits chunks of simulations to an executor and yields their indices, trajectories and profiling 
+        statistics as they complete.
+        """
+        loop = asyncio.get_running_loop()
+        if max_pending_chunks is None:
+            max_pending_chunks = os.cpu_count() or 1
+        seeds = _spawn_seeds(Nsim)
+        chunks = [range(start, min(start + chunk_size, Nsim)) for start in range(0, Nsim, chunk_size)]
+        stop_event = threading.Event()
+        compiled_overrides = _compile_overrides(self, simulation_kwargs, checkpoints)
+
+        def run_chunk(indices: range) -> Tuple[List[Trajectory], Optional[SimulationStats]]:
+            chunk_stats = SimulationStats(track_memory=False) if profile else None
+            trajectories = _simulate_replicates(self, indices, simulation_kwargs, checkpoints=checkpoints, crn_seed=crn_seed, 
+                                                seeds=seeds, stats=chunk_stats, stop_event=stop_event, 
+                                                compiled_overrides=compiled_overrides)
+            return trajectories, chunk_stats
+
+        pending = {}
+        next_chunk = 0
+        try:
+            while pending or next_chunk < len(chunks):
+                while next_chunk < len(chunks) and len(pending) < max_pending_chunks:
+                    pending[loop.run_in_executor(executor, run_chunk, chunks[next_chunk])] = chunks[next_chunk]
+                    next_chunk += 1
+                done, _ = await asyncio.wait(pending.keys(), return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    indices = pending.pop(future)
+                    trajectories, chunk_stats = future.result()
+                    yield indices, trajectories, chunk_stats
+        finally:
+            stop_event.set()
+            for future in pending:
+                future.cancel()
+
+
+def _grid_points(parameter_grid: Union[Dict[str, List[Any]], List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """List the parameter sets of a grid, given as lists of values per parameter or as a list of parameter sets."""
+    if isinstance(parameter_grid, dict):
+        names = list(parameter_grid.keys())
+        return [dict(zip(names, values)) for values in itertools.product(*parameter_grid.values())]
+    return [dict(point) for point in parameter_grid]
+
+
+def _points_frame(points: List[Dict[str, Any]], index: Optional[Iterable[int]] = None) -> pd.DataFrame:
+    """
+    Tabulate grid points, one row per point. Integer parameters omitted by some points are stored as nullable 
+    integers, so that their values are not converted to floats.
+    """
+    frame = pd.DataFrame(points, index=index)
+    for name in frame.columns:
+        values = [point[name] for point in points if name in point]
+        if len(values) < len(points) and all(isinstance(value, (int, np.integer)) and not isinstance(value, bool) 
+                                             for value in values):
+            frame[name] = pd.array([point.get(name) for point in points], dtype="Int64")
+    return frame
+
+
 def simulate(epimodel, 
              start_date: Union[str, pd.Timestamp] = "2020-01-01", 
              end_date: Union[str, pd.Timestamp] = "2020-12-31", 
@@ -711,10 +1207,22 @@ def simulate(epimodel,
              resample_aggregation_compartments: Optional[Union[str, dict]] = "last",
              resample_aggregation_transitions: Optional[Union[str, dict]] = "sum",
              fill_method: Optional[str] = "ffill",
+             checkpoint: Optional[SimulationCheckpoint] = None,
+             return_checkpoint: bool = False,
+             restore_random_state: bool = True,
+             random_streams: Optional[RandomStreams] = None,
+             rng: Optional[np.random.Generator] = None,
+             stats: Optional[SimulationStats] = None,
+             step_callback: Optional[Callable[["EpiModel", pd.Timestamp, np.ndarray, np.ndarray], None]] = None,
+             compiled_overrides: Optional[Dict[str, List[Tuple[int, int, np.ndarray]]]] = None,
              **kwargs) -> Trajectory:
     """
     Runs a simulation of the epidemic model over the specified simulation dates.
 
+    The model is not modified, so that simulations can run concurrently. In particular, the contact matrices and 
+    parameter definitions of the run are no longer stored in `epimodel.Cs` and `epimodel.definitions`: call 
+    `EpiModel.compute_contact_reductions` or pass the dates to `plot_spectral_radius` to plot contacts over time.
+
     Args:
         epimodel (EpiModel): The epidemic model instance to simulate.
         start_date (str or pd.Timestamp): The start date of the simulation. Default is "2020-01-01".
@@ -726,71 +1234,210 @@ def simulate(epimodel,
         resample_aggregation_compartments (str, optional): The aggregation method to use when resampling the compartments. Default is "last".
         resample_aggregation_transitions (str, optional): The aggregation method to use when resampling the transitions. Default is "sum".
         fill_method (str, optional): The method to use when filling NaN values after resampling. Default is "ffill".
+        checkpoint (SimulationCheckpoint, optional): If provided, the simulation is resumed from this checkpoint up to 
+            `end_date`, instead of starting from `start_date` with `initial_conditions_dict` (both are ignored). 
+            Time-varying parameters, overrides and interventions stay aligned to the start date of the checkpoint, 
+            and the trajectory only contains the resumed time steps. Default is None.
+        return_checkpoint (bool, optional): If True, the state at the end of the simulation is stored in the 
+            `checkpoint` attribute of the trajectory. Default is False.
+        restore_random_state (bool, optional): If True and a checkpoint is provided, the state of the global numpy 
+            random generator is restored from the checkpoint, so that the resumed run continues the original one exactly. 
+            Set to False to branch independent runs from the same checkpoint. Default is True.
+        random_streams (RandomStreams, optional): If provided, transitions are sampled from common random numbers 
+            streams addressed by replicate, step and compartment, instead of the global numpy random state. 
+            Default is None.
+        rng (np.random.Generator, optional): If provided, transitions are sampled from this generator instead of the 
+            global numpy random state, which makes concurrent simulations independent. Default is None.
+        stats (SimulationStats, optional): If provided, wall-clock time and allocated memory of each phase of the 
+            simulation are accumulated into this object. Default is None (no profiling).
+        step_callback (Callable, optional): If provided, called after each time step with the model, the date of the 
+            step, the compartments of shape (n_compartments, n_groups) and the transitions of shape 
+            (n_transitions, n_groups) of the step. Exceptions raised by the callback abort the simulation 
+            (e.g., `StreamingDistance` monitors in calibration). Default is None.
+        compiled_overrides (dict, optional): The overrides of the model compiled with `EpiModel.get_compiled_overrides` 
+            for the simulation dates, shared by the simulations of an ensemble. Default is None (compiled in this call).
         **kwargs: Additional parameters to overwrite model parameters during the simulation.
 
     Returns:
         Trajectory: The trajectory of the simulation
 
     Raises:
-        ValueError: If the model has no transitions defined.
+        ValueError: If the model has no transitions defined, or if the checkpoint is not compatible with the model, 
+            the time step or the end date.
     """
 
     # check that the model has transitions
     if len(epimodel.transitions_list) == 0:
         raise ValueError("The model has no transitions defined. Please add transitions before running simulations.")
     
-    # Compute the simulation dates
-    simulation_dates = compute_simulation_dates(start_date, end_date, dt=dt)
+    # Resumed simulations are computed on the time axis of the original run, starting after the checkpoint
+    offset = 0
+    if checkpoint is not None:
+        if checkpoint.compartment_idx != epimodel.compartments_idx or \
+                checkpoint.compartments.shape != (len(epimodel.compartments), len(epimodel.population.Nk)):
+            raise ValueError("The checkpoint compartments do not match the model compartments and population.")
+        if checkpoint.dt != dt:
+            raise ValueError(f"The checkpoint was created with dt={checkpoint.dt}, got dt={dt}.")
+        start_date, offset = checkpoint.start_date, checkpoint.step
+
+    with profile_run(stats):
+        # Compute the simulation dates
+        with profile_phase(stats, "dates"):
+            simulation_dates = compute_simulation_dates(start_date, end_date, dt=dt)
+            if checkpoint is not None and (len(simulation_dates) <= offset or simulation_dates[offset - 1] != checkpoint.date):
+                raise ValueError(f"The end date must be after the checkpoint date ({checkpoint.date}).")
+
+        # Compute the contact reductions based on the interventions
+        with profile_phase(stats, "contact_reductions"):
+            contact_matrices_by_date = epimodel.compute_contact_matrices(simulation_dates)
+
+        # Update parameters if any are provided via kwargs (needed for calibration purposes)
+        parameters = epimodel.parameters.copy()
+        parameters.update(kwargs)
+
+        # Compute the definitions and apply overrides
+        with profile_phase(stats, "definitions"):
+            definitions = create_definitions(parameters, len(simulation_dates), epimodel.population.Nk.shape[0])
+            definitions = apply_overrides(definitions, epimodel.overrides, simulation_dates, 
+                                          compiled_overrides=(compiled_overrides if compiled_overrides is not None else 
+                                                              epimodel.get_compiled_overrides(simulation_dates, list(parameters.keys()))))
+            if offset > 0:
+                definitions = {name: values[offset:] for name, values in definitions.items()}
+
+        # Initialize population in different compartments and demographic groups
+        with profile_phase(stats, "initial_conditions"):
+            if checkpoint is not None:
+                initial_conditions = checkpoint.compartments.copy()
+                if restore_random_state and checkpoint.random_state is not None:
+                    np.random.set_state(checkpoint.random_state)
+            else:
+                if initial_conditions_dict is None:
+                    initial_conditions_dict = epimodel.create_default_initial_conditions(percentage_in_agents=percentage_in_agents)
+                initial_conditions = apply_initial_conditions(epimodel, initial_conditions_dict)
+
+        # Run simulation with pre-computed contacts
+        with profile_phase(stats, "step_loop"):
+            contact_matrices = [contact_matrices_by_date[date] for date in simulation_dates[offset:]]
+            engine_callback = None
+            if step_callback is not None:
+                def engine_callback(t, compartments, transitions):
+                    step_callback(epimodel, simulation_dates[offset + t], compartments, transitions)
+            compartments_evolution, transitions_evolution = stochastic_simulation(
+                T=len(simulation_dates) - offset,
+                contact_matrices=contact_matrices,  
+                epimodel=epimodel,
+                parameters=definitions,
+                initial_conditions=initial_conditions,
+                dt=dt,
+                stats=stats,
+                random_streams=random_streams,
+                first_step=offset,
+                rng=rng,
+                step_callback=engine_callback
+            )
+
+        # Format the simulation output
+        with profile_phase(stats, "format_output"):
+            results = format_simulation_output(compartments_evolution, transitions_evolution, 
+                                               epimodel.compartments_idx, epimodel.transitions_idx, 
+                                               epimodel.population.Nk_names)
+            trajectory = Trajectory(compartments=results["compartments"], transitions=results["transitions"], 
+                                    dates=simulation_dates[offset:], compartment_idx=epimodel.compartments_idx, 
+                                    transitions_idx=epimodel.transitions_idx, parameters=definitions)
+            if return_checkpoint:
+                trajectory.checkpoint = SimulationCheckpoint(compartments=compartments_evolution[-1].copy(), 
+                                                             step=len(simulation_dates), 
+                                                             start_date=simulation_dates[0], 
+                                                             date=simulation_dates[-1], 
+                                                             dt=dt,
+                                                             compartment_idx=dict(epimodel.compartments_idx), 
+                                                             random_state=np.random.get_state() if rng is None else None)
+
+        # Only resample if necessary
+        if resample_frequency is not None:
+            with profile_phase(stats, "resampling"):
+                # Check if resampling is needed (simulation dates frequency != requested frequency)
+                sim_freq = pd.infer_freq(simulation_dates)
+                if sim_freq != resample_frequency:
+                    trajectory.resample(resample_frequency, 
+                                        resample_aggregation_compartments, 
+                                        resample_aggregation_transitions, 
+                                        fill_method)
+    return trajectory
 
-    # Compute initial conditions if needed
-    if initial_conditions_dict is None:
-        initial_conditions_dict = epimodel.create_default_initial_conditions(percentage_in_agents=percentage_in_agents)
-        
-    # Compute the contact reductions based on the interventions
-    epimodel.compute_contact_reductions(simulation_dates)
 
-    # Update parameters if any are provided via kwargs (needed for calibration purposes)
-    parameters = epimodel.parameters.copy()
-    parameters.update(kwargs)
+def _spawn_seeds(Nsim: int) -> List[np.random.SeedSequence]:
+    """
+    Spawns one seed sequence per simulation from the global numpy random state.
+    """
+    return np.random.SeedSequence(np.random.randint(np.iinfo(np.int64).max)).spawn(Nsim)
+
+
+def _simulate_replicates(epimodel, 
+                         indices: Iterable[int], 
+                         simulation_kwargs: Dict[str, Any],
+                         checkpoints: Optional[List[SimulationCheckpoint]] = None,
+                         crn_seed: Optional[int] = None,
+                         seeds: Optional[List[np.random.SeedSequence]] = None,
+                         stats: Optional[SimulationStats] = None,
+                         stop_event: Optional[threading.Event] = None,
+                         compiled_overrides: Optional[List[Dict[str, List[Tuple[int, int, np.ndarray]]]]] = None) -> List[Trajectory]:
+    """
+    Runs the simulations with the given indices.
 
-    # Compute the definitions and apply overrides
-    epimodel.definitions = create_definitions(parameters, len(simulation_dates), epimodel.population.Nk.shape[0])
-    epimodel.definitions = apply_overrides(epimodel.definitions, epimodel.overrides, simulation_dates)
+    Args:
+        epimodel (EpiModel): The epidemic model instance to simulate.
+        indices (Iterable[int]): The indices of the simulations, addressing checkpoints, random streams and seeds.
+        simulation_kwargs (dict): Additional arguments of `simulate`.
+        checkpoints (List[SimulationCheckpoint], optional): The i-th simulation resumes from `checkpoints[i % len(checkpoints)]`.
+        crn_seed (int, optional): If provided, the i-th simulation draws from the common random numbers streams of replicate i.
+        seeds (List[np.random.SeedSequence], optional): If provided, the i-th simulation draws from a generator seeded 
+            with `seeds[i]` instead of the global numpy random state.
+        stats (SimulationStats, optional): If provided, profiling statistics are accumulated into this object.
+        stop_event (threading.Event, optional): If provided and set, the remaining simulations are skipped.
+        compiled_overrides (List[dict], optional): The overrides compiled once for all simulations, the i-th simulation 
+            using `compiled_overrides[i % len(compiled_overrides)]` (see `_compile_overrides`).
 
-    # Initialize population in different compartments and demographic groups
-    initial_conditions = apply_initial_conditions(epimodel, initial_conditions_dict)
+    Returns:
+        List[Trajectory]: The trajectories of the simulations that were run.
+    """
+    trajectories = []
+    for i in indices:
+        if stop_event is not None and stop_event.is_set():
+            break
+        trajectories.append(simulate(
+            epimodel,
+            checkpoint=checkpoints[i % len(checkpoints)] if checkpoints else None,
+            restore_random_state=False,
+            random_streams=RandomStreams(crn_seed, i) if crn_seed is not None else None,
+            rng=np.random.default_rng(seeds[i]) if seeds is not None else None,
+            stats=stats,
+            compiled_overrides=compiled_overrides[i % len(compiled_overrides)] if compiled_overrides else None,
+            **simulation_kwargs
+        ))
+    return trajectories
+
+
+def _compile_overrides(epimodel, 
+                       simulation_kwargs: Dict[str, Any], 
+                       checkpoints: Optional[List[SimulationCheckpoint]] = None) -> List[Dict[str, List[Tuple[int, int, np.ndarray]]]]:
+    """
+    Compiles the overrides of the model once for the simulations of an ensemble run with the same arguments of 
+    `simulate`, whose defaults are used for missing dates and time step.
 
-    # Pre-compute contact matrices list
-    contact_matrices = [epimodel.Cs[date] for date in simulation_dates]
-    
-    # Run simulation with pre-computed contacts
-    compartments_evolution, transitions_evolution = stochastic_simulation(
-        T=len(simulation_dates),
-        contact_matrices=contact_matrices,  
-        epimodel=epimodel,
-        parameters=epimodel.definitions,
-        initial_conditions=initial_conditions,
-        dt=dt
-    )
-
-    # Format the simulation output
-    results = format_simulation_output(compartments_evolution, transitions_evolution, 
-                                       epimodel.compartments_idx, epimodel.transitions_idx, 
-                                       epimodel.population.Nk_names)
-    trajectory = Trajectory(compartments=results["compartments"], transitions=results["transitions"], 
-                            dates=simulation_dates, compartment_idx=epimodel.compartments_idx, 
-                            transitions_idx=epimodel.transitions_idx, parameters=epimodel.definitions)
-
-    # Only resample if necessary
-    if resample_frequency is not None:
-        # Check if resampling is needed (simulation dates frequency != requested frequency)
-        sim_freq = pd.infer_freq(simulation_dates)
-        if sim_freq != resample_frequency:
-            trajectory.resample(resample_frequency, 
-                                resample_aggregation_compartments, 
-                                resample_aggregation_transitions, 
-                                fill_method)
-    return trajectory
+    Resumed simulations run on the time axis of their checkpoint, so overrides are compiled from the start date 
+    of each checkpoint (once per distinct start date), the i-th compiled overrides matching `checkpoints[i]`.
+    """
+    defaults = inspect.signature(simulate).parameters
+    get = lambda name: simulation_kwargs.get(name, defaults[name].default)
+    parameter_names = list(epimodel.parameters) + [name for name in simulation_kwargs if name not in defaults]
+    start_dates = [checkpoint.start_date for checkpoint in checkpoints] if checkpoints else [get("start_date")]
+    compiled = {}
+    for start_date in start_dates:
+        if start_date not in compiled:
+            simulation_dates = compute_simulation_dates(start_date, get("end_date"), dt=get("dt"))
+            compiled[start_date] = epimodel.get_compiled_overrides(simulation_dates, parameter_names)
+    return [compiled[start_date] for start_date in start_dates]
 
 
 def stochastic_simulation(T: int,
@@ -798,98 +1445,323 @@ def stochastic_simulation(T: int,
                          epimodel,
                          parameters: Dict,
                          initial_conditions: np.ndarray,
-                         dt: float) -> np.ndarray:
+                         dt: float,
+                         stats: Optional[SimulationStats] = None,
+                         random_streams: Optional[Union[RandomStreams, List[RandomStreams]]] = None,
+                         first_step: int = 0,
+                         rng: Optional[np.random.Generator] = None,
+                         step_callback: Optional[Callable[[int, np.ndarray, np.ndarray], None]] = None) -> np.ndarray:
     """
     Run a stochastic simulation of the epidemic model.
+
+    Multiple replicates can be simulated at once by passing initial conditions of shape 
+    (n_replicates, n_compartments, n_groups). In this case the outputs have an additional replicate axis 
+    after the time axis.
     
     Args:
         T: Number of time steps
         contact_matrices: Pre-computed list of contact matrices dictionaries (key is the layer, value is the contact matrix)
         epimodel: The epidemic model
-        parameters: Model parameters
-        initial_conditions: Initial population distribution
+        parameters: Model parameters definitions, of shape (T, n_groups), or (T, n_replicates, n_groups) for 
+            parameters that differ across replicates
+        initial_conditions: Initial population distribution, of shape (n_compartments, n_groups) or 
+            (n_replicates, n_compartments, n_groups)
         dt: Time step size
+        stats: If provided, the time spent computing transition probabilities (split by transition kind) 
+            and sampling transitions is accumulated into this object
+        random_streams: If provided, transitions are sampled from common random numbers streams instead of the 
+            global numpy random state, with one RandomStreams object per replicate
+        first_step: Index of the first time step, counted from the start date, used to address random streams 
+            of resumed simulations
+        rng: If provided (and random_streams is not), transitions are sampled from this generator instead of the 
+            global numpy random state
+        step_callback: If provided, called after each time step with the step index, the compartments and the 
+            transitions of the step (with the replicate axis if initial conditions are batched). Exceptions raised 
+            by the callback abort the simulation
+
+    Returns:
+        tuple: The evolution of compartments, of shape (T, n_compartments, n_groups), and of transitions, of shape 
+            (T, n_transitions, n_groups). If initial conditions are batched, shapes are (T, n_replicates, ...).
+
+    Raises:
+        ValueError: If the shape of the initial conditions doesn't match the model, or if the number of random 
+            streams doesn't match the number of replicates.
     """
     # Pre-allocate arrays
     N = len(epimodel.population.Nk)
     C = len(epimodel.compartments)
-    
-    compartments_evolution = np.zeros((T + 1, C, N), dtype=np.float64)
-    transitions_evolution = np.zeros((T, epimodel.n_transitions, N), dtype=np.float64)
+
+    initial_conditions = np.asarray(initial_conditions)
+    batched = initial_conditions.ndim == 3
+    if not batched:
+        initial_conditions = initial_conditions[np.newaxis]
+    if initial_conditions.shape[1:] != (C, N):
+        raise ValueError(f"Initial conditions must have shape ({C}, {N}) or (n_replicates, {C}, {N}). Got {initial_conditions.shape[-2:]}")
+    R = initial_conditions.shape[0]
+    if isinstance(random_streams, RandomStreams):
+        random_streams = [random_streams]
+    if random_streams is not None and len(random_streams) != R:
+        raise ValueError(f"One RandomStreams object per replicate is required. Got {len(random_streams)} for {R} replicates")
+
+    compartments_evolution = np.zeros((T + 1, R, C, N), dtype=np.float64)
+    transitions_evolution = np.zeros((T, R, epimodel.n_transitions, N), dtype=np.float64)
     compartments_evolution[0] = initial_conditions
     
     # Pre-compute population sizes and create views for better performance
     pop_sizes = epimodel.population.Nk
     comp_indices = epimodel.compartments_idx
-    
-    # Pre-allocate arrays for probabilities and transitions
-    prob = np.zeros((C, N), dtype=np.float64)
-    new_pop = np.zeros((C, N), dtype=np.float64)
 
     # create a dictionary to store the data needed for the transitions
-    system_data = {
-        "parameters": parameters, 
+    context = {
+        "parameters": parameters,
         "t": 0,
+        "T": T,
         "comp_indices": comp_indices,
         "contact_matrix": None,
-        "pop": None,
+        "contact_matrices": contact_matrices,
         "pop_sizes": pop_sizes,
-        "dt": dt
+        "dt": dt,
+        "expressions": {},
+        "replicate_parameters": None
         }
-    
+
+    # Parameters with a replicate axis (e.g., in sweeps) are split by replicate for scalar transition functions
+    if any(np.ndim(value) == 3 for value in parameters.values()):
+        context["replicate_parameters"] = [
+            {name: value[:, r] if np.ndim(value) == 3 else value for name, value in parameters.items()} for r in range(R)
+        ]
+
+    # Group transitions by source and target compartment. Transitions between the same pair of compartments 
+    # are merged into a single outcome of the multinomial draw
+    transitions_plan = []
+    for comp in epimodel.compartments:
+        targets = {}
+        for tr in epimodel.transitions[comp]:
+            targets.setdefault(tr.target, []).append(tr)
+        if targets:
+            transitions_plan.append((comp_indices[comp], [
+                (comp_indices[target], epimodel.transitions_idx[f"{comp}_to_{target}"], trs) 
+                for target, trs in targets.items()
+            ]))
+
+    # Pre-compute probabilities of transitions with rates defined over the whole horizon
+    precomputed = {}
+    for tr in epimodel.transitions_list:
+        if epimodel.transition_function_modes[tr.kind] == "rate":
+            start_time = time.perf_counter()
+            rates = np.asarray(epimodel.transition_functions[tr.kind](tr.params, context))
+            precomputed[id(tr)] = 1 - np.exp(-rates * dt)
+            if stats is not None:
+                stats.add(f"step_loop:{tr.kind}", time.perf_counter() - start_time)
+
     # Simulate each time step
     for t in range(T):
-        # Update system data with current state
-        system_data.update({
-            "t": t,
-            "contact_matrix": contact_matrices[t],
-            "pop": compartments_evolution[t]
-        })
-
-        new_pop[:] = compartments_evolution[t]
+        # Update context with current state
+        context["t"] = t
+        context["contact_matrix"] = contact_matrices[t]
+        state = compartments_evolution[t]
+        new_state = compartments_evolution[t + 1]
+        new_state[:] = state
         
-        for comp in epimodel.compartments:
-            transitions = epimodel.transitions[comp]
-            if not transitions: 
-                continue
-                
-            prob.fill(0)
-            source_idx = comp_indices[comp]
-            current_pop = compartments_evolution[t, source_idx]
-
+        for source_idx, targets in transitions_plan:
+            current_pop = state[:, source_idx]
             if not np.any(current_pop):
                 continue
 
-            for tr in transitions:
-                target_idx = comp_indices[tr.target]
-                trans_prob = epimodel.transition_functions[tr.kind](
-                    tr.params, system_data
-                )
-                prob[target_idx] += trans_prob
-            
-            # Compute remaining probability
-            prob[source_idx] = 1 - np.sum(prob, axis=0)
-            
-            delta = np.array([
-                multinomial(n, p) if n > 0 else np.zeros(C)
-                for n, p in zip(current_pop, prob.T)
-            ])
-
-            # Store transition counts
-            for tr in transitions:
-                tr_name = f"{tr.source}_to_{tr.target}"
-                tr_idx = epimodel.transitions_idx[tr_name]
-                transitions_evolution[t, tr_idx] += delta[:, epimodel.compartments_idx[tr.target]]
-            
-            # Update populations
-            np.subtract(new_pop[source_idx], np.sum(delta, axis=1), out=new_pop[source_idx])
-            new_pop += delta.T
-        
-        compartments_evolution[t + 1] = new_pop
+            prob = np.zeros((len(targets), R, N), dtype=np.float64)
+            for k, (_, _, trs) in enumerate(targets):
+                for tr in trs:
+                    if stats is None:
+                        prob[k] += compute_transition_probability(tr, epimodel, state, context, precomputed)
+                    else:
+                        start_time = time.perf_counter()
+                        prob[k] += compute_transition_probability(tr, epimodel, state, context, precomputed)
+                        stats.add(f"step_loop:{tr.kind}", time.perf_counter() - start_time)
+
+            start_time = time.perf_counter()
+            if random_streams is None:
+                delta = sample_transitions(current_pop, prob, rng)
+            else:
+                # Replicates draw from their own stream, addressed by step and source compartment
+                delta = np.concatenate([
+                    sample_transitions(current_pop[r:r + 1], prob[:, r:r + 1], streams.generator(first_step + t, source_idx))
+                    for r, streams in enumerate(random_streams)
+                ], axis=1)
+            if stats is not None:
+                stats.add("step_loop:sampling", time.perf_counter() - start_time)
+
+            # Store transition counts and update populations
+            for k, (target_idx, tr_idx, _) in enumerate(targets):
+                transitions_evolution[t, :, tr_idx] += delta[k]
+                new_state[:, target_idx] += delta[k]
+            new_state[:, source_idx] -= np.sum(delta, axis=0)
+
+        if step_callback is not None:
+            step_callback(t, new_state if batched else new_state[0], 
+                          transitions_evolution[t] if batched else transitions_evolution[t, 0])
     
+    if not batched:
+        return compartments_evolution[1:, 0], transitions_evolution[:, 0]
     return compartments_evolution[1:], transitions_evolution
 
 
+def compute_transition_probability(tr: Transition, 
+                                   epimodel, 
+                                   state: np.ndarray, 
+                                   context: Dict[str, Any], 
+                                   precomputed: Dict[int, np.ndarray]) -> np.ndarray:
+    """
+    Computes the probability of a transition at the current time step for all replicates, dispatching on the 
+    form of the registered transition function.
+
+    Args:
+        tr (Transition): The transition.
+        epimodel (EpiModel): The epidemic model.
+        state (np.ndarray): The current batch state, of shape (n_replicates, n_compartments, n_groups).
+        context (dict): The context of the simulation at the current time step.
+        precomputed (dict): Probabilities of rate transitions over the whole horizon, keyed by transition id.
+
+    Returns:
+        np.ndarray: The transition probabilities, broadcastable to (n_replicates, n_groups).
+    """
+    mode = epimodel.transition_function_modes[tr.kind]
+    if mode == "rate":
+        return at_step(precomputed[id(tr)], context["t"])
+    
+    function = epimodel.transition_functions[tr.kind]
+    if mode == "vectorized":
+        return function(tr.params, state, context)
+
+    # Scalar transition functions are called once per replicate
+    data = {
+        "parameters": context["parameters"], 
+        "t": context["t"],
+        "comp_indices": context["comp_indices"],
+        "contact_matrix": context["contact_matrix"],
+        "pop": None,
+        "pop_sizes": context["pop_sizes"],
+        "dt": context["dt"]
+    }
+    probabilities = []
+    for r, pop in enumerate(state):
+        data["pop"] = pop
+        if context.get("replicate_parameters") is not None:
+            data["parameters"] = context["replicate_parameters"][r]
+        probabilities.append(np.broadcast_to(function(tr.params, data), (state.shape[-1],)))
+    return np.array(probabilities)
+
+
+def sample_transitions(current_pop: np.ndarray, prob: np.ndarray, rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    """
+    Samples the number of individuals leaving a compartment towards each target compartment.
+
+    The multinomial draw is decomposed into a sequence of conditional binomial draws, which are vectorized 
+    over replicates and demographic groups.
+
+    Args:
+        current_pop (np.ndarray): The population in the source compartment, of shape (n_replicates, n_groups).
+        prob (np.ndarray): The transition probabilities towards each target, of shape (n_targets, n_replicates, n_groups).
+        rng (np.random.Generator, optional): The random generator to draw from. Default is None (global numpy random state).
+
+    Returns:
+        np.ndarray: The number of transitions towards each target, of shape (n_targets, n_replicates, n_groups).
+
+    Raises:
+        ValueError: If the transition probabilities out of the compartment sum to more than 1.
+    """
+    total_prob = prob.sum(axis=0)
+    if np.any(total_prob > 1 + 1e-8):
+        raise ValueError(f"The transition probabilities out of a compartment sum to {total_prob.max()}, which exceeds 1. "
+                         "Check the transition rates or reduce the time step.")
+    binomial = np.random.binomial if rng is None else rng.binomial
+    delta = np.zeros(prob.shape, dtype=np.float64)
+    remaining = current_pop.astype(np.int64)
+    prob_left = np.ones(current_pop.shape, dtype=np.float64)
+    for k in range(prob.shape[0]):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            conditional_prob = np.where(prob_left > 0, prob[k] / prob_left, 0.)
+        draws = binomial(remaining, np.clip(conditional_prob, 0., 1.))
+        delta[k] = draws
+        remaining -= draws
+        prob_left -= prob[k]
+    return delta
+
+
+def at_step(values: np.ndarray, t: int) -> np.ndarray:
+    """
+    Returns the values of an array whose first axis is time at the given time step. 
+    Scalars and arrays with a time axis of length 1 are treated as constant over time.
+
+    Args:
+        values (np.ndarray): The array of values.
+        t (int): The time step.
+
+    Returns:
+        np.ndarray: The values at time step t.
+    """
+    if values.ndim == 0:
+        return values
+    return values[t] if values.shape[0] > 1 else values[0]
+
+
+def evaluate_parameter(expr: Any, context: Dict[str, Any]) -> np.ndarray:
+    """
+    Evaluates a transition parameter over the whole simulation horizon.
+
+    String expressions are evaluated against the model parameters once per simulation and cached in the context. 
+    Expressions are evaluated on the compact representation of the parameters, so the result keeps a length 1 
+    time axis when no parameter in the expression varies over time. Numeric values are returned with a time axis 
+    of length 1.
+
+    Args:
+        expr (Any): The parameter expression (e.g., "beta" or "r*beta") or a numeric value.
+        context (dict): The context of the simulation.
+
+    Returns:
+        np.ndarray: The parameter values, with time as first axis.
+    """
+    if not isinstance(expr, str):
+        return np.asarray(expr)[np.newaxis]
+    
+    cache = context["expressions"]
+    if expr not in cache:
+        env = {name: compact_parameter(value) for name, value in context["parameters"].items()}
+        cache[expr] = np.asarray(evaluate(expr=expr, env=env))
+    return cache[expr]
+
+
+def compute_spontaneous_transition_rate(params, context):
+    """
+    Compute the rate of a spontaneous transition over the whole simulation horizon.
+
+    Args:
+        params: The parameters of the transition
+        context: The context of the simulation
+    """
+    return evaluate_parameter(params, context)
+
+
+def compute_mediated_transition_probabilities(params, state, context):
+    """
+    Compute the probability of a mediated transition for all replicates at once.
+
+    Args:
+        params: The parameters of the transition. params[0] is the rate, params[1] is the agent compartment
+        state: The current state of the system, of shape (n_replicates, n_compartments, n_groups)
+        context: A dictionary containing the context of the simulation. 
+            - parameters: The model parameters
+            - t: The current time step
+            - comp_indices: The indices of the compartments
+            - contact_matrix: The contact matrix
+            - pop_sizes: The population sizes
+            - dt: The time step size
+    """
+    rate_eval = at_step(evaluate_parameter(params[0], context), context["t"])
+    agent_idx = context["comp_indices"][params[1]]
+    interaction = (state[:, agent_idx] / context["pop_sizes"]) @ context["contact_matrix"]["overall"].T
+    return 1 - np.exp(-rate_eval * interaction * context["dt"])
+
+
 def compute_spontaneous_transition_probability(params, data): 
     """
     Compute the probability of a spontaneous transition.
@@ -934,32 +1806,35 @@ def compute_mediated_transition_probability(params, data):
     return 1 - np.exp(-rate_eval * interaction * data["dt"])
 
 
-def validate_transition_function(func: Callable) -> None:
+def validate_transition_function(func: Callable, mode: str = "scalar") -> None:
     """
     Validates that a transition function has the correct signature and parameters.
     
     Args:
         func: The transition function to validate
+        mode: The form of the transition function, one of "scalar", "vectorized" or "rate"
         
     Raises:
-        ValueError: If the function signature doesn't match requirements
+        ValueError: If the mode is not supported or the function signature doesn't match requirements
     """
+    if mode not in TRANSITION_FUNCTION_SIGNATURES:
+        raise ValueError(f"Unknown transition function mode: {mode}. Must be one of {list(TRANSITION_FUNCTION_SIGNATURES.keys())}")
+
     # Get function signature
     sig = inspect.signature(func)
     params = sig.parameters
+    expected_params = TRANSITION_FUNCTION_SIGNATURES[mode]
     
     # Check number of parameters
-    if len(params) != 2:
+    if len(params) != len(expected_params):
         raise ValueError(
-            f"Transition function must take exactly 2 parameters. Got {len(params)}: {list(params.keys())}"
+            f"Transition function must take exactly {len(expected_params)} parameters. Got {len(params)}: {list(params.keys())}"
         )
     
     # Check parameter names
-    expected_params = ['params', 'data']
     actual_params = list(params.keys())
     
     if actual_params != expected_params:
         raise ValueError(
             f"Transition function must have parameters named {expected_params}. Got {actual_params}"
         )
-    
\ No newline at end of file
@@ -0,0 +1,47 @@
+from dataclasses import dataclass
+import numpy as np
+
+
+@dataclass(frozen=True)
+class RandomStreams:
+    """
+    Class to address counter-based random streams for common random numbers.
+
+    Each (replicate, step, compartment) triple is mapped to an independent `Philox` stream, whose key is
+    derived from the seed and the replicate and whose counter is derived from the step and the source compartment.
+    Simulations using the same seed and replicate therefore draw the same random numbers for the transitions
+    leaving a compartment at a given step, whatever happened before. This makes the replicate i of different
+    scenarios use common random numbers, reducing the variance of scenario differences, and makes runs resumed
+    from checkpoints independent of the global random state.
+
+    Attributes:
+        seed (int): The seed shared by all replicates
+        replicate (int): The index of the replicate. Default is 0
+    """
+    seed: int
+    replicate: int = 0
+
+    def generator(self, step: int, compartment: int) -> np.random.Generator:
+        """
+        Returns the random generator of a step and source compartment.
+
+        Args:
+            step (int): The time step, counted from the start date of the simulation
+            compartment (int): The index of the source compartment
+
+        Returns:
+            np.random.Generator: A generator positioned at the start of the stream
+        """
+        return np.random.Generator(np.random.Philox(key=[self.seed, self.replicate], counter=[0, 0, step, compartment]))
+
+    def for_replicate(self, replicate: int) -> "RandomStreams":
+        """
+        Returns the streams of another replicate with the same seed.
+
+        Args:
+            replicate (int): The index of the replicate
+
+        Returns:
+            RandomStreams: The streams of the replicate
+        """
+        return RandomStreams(self.seed, replicate)
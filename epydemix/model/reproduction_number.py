@@ -0,0 +1,319 @@
+from typing import Callable, Dict, List, Optional, Union
+import numpy as np
+import pandas as pd
+from ..utils.utils import create_definitions, apply_overrides
+from .epimodel import EpiModel, evaluate_parameter
+
+
+# Spectral radii cached by a content key of the matrix or of the inputs it is computed from
+_MAX_CACHED_RADII = 4096
+_spectral_radii: Dict[tuple, float] = {}
+
+
+def _cached_spectral_radius(key: tuple, compute_matrix: Callable[[], np.ndarray]) -> float:
+    """
+    Returns the cached spectral radius of the matrix with the given key, computing the matrix on a cache miss.
+    """
+    rho = _spectral_radii.get(key)
+    if rho is None:
+        rho = float(np.max(np.abs(np.linalg.eigvals(compute_matrix()))))
+        if len(_spectral_radii) >= _MAX_CACHED_RADII:
+            _spectral_radii.pop(next(iter(_spectral_radii)))
+        _spectral_radii[key] = rho
+    return rho
+
+
+def _hashable(value) -> tuple:
+    """
+    Returns a hashable representation of a parameter value or array, based on its content.
+    """
+    if isinstance(value, str):
+        return ("str", value)
+    array = np.ascontiguousarray(value)
+    if array.dtype == object:
+        return ("object", repr(value))
+    return (array.tobytes(), array.shape, array.dtype.str)
+
+
+def spectral_radius(matrix: np.ndarray) -> float:
+    """
+    Computes the spectral radius (largest absolute eigenvalue) of a square matrix.
+
+    Results are cached by matrix content, so repeated calls on identical matrices (e.g., contact matrices
+    of dates without interventions) only compute eigenvalues once.
+
+    Args:
+        matrix (np.ndarray): The square matrix.
+
+    Returns:
+        float: The spectral radius of the matrix.
+    """
+    matrix = np.asarray(matrix, dtype=np.float64)
+    return _cached_spectral_radius(("matrix", _hashable(matrix)), lambda: matrix)
+
+
+def spectral_radii(matrices: np.ndarray) -> np.ndarray:
+    """
+    Computes the spectral radius of a batch of square matrices.
+
+    Eigenvalues are computed once per distinct matrix of the batch.
+
+    Args:
+        matrices (np.ndarray): Array of square matrices, of shape (..., m, m).
+
+    Returns:
+        np.ndarray: The spectral radii, of shape (...).
+    """
+    matrices = np.asarray(matrices, dtype=np.float64)
+    batch_shape, m = matrices.shape[:-2], matrices.shape[-1]
+    flat = matrices.reshape(-1, m * m)
+    unique, inverse = np.unique(flat, axis=0, return_inverse=True)
+    radii = np.max(np.abs(np.linalg.eigvals(unique.reshape(-1, m, m))), axis=-1)
+    return radii[inverse.reshape(-1)].reshape(batch_shape)
+
+
+def get_infected_compartments(epimodel: EpiModel) -> List[str]:
+    """
+    Returns the infected compartments of a model.
+
+    Infected compartments are the compartments reachable through spontaneous transitions from the targets of
+    mediated transitions, from which an agent compartment (i.e., a compartment mediating transitions) can be reached.
+    Sources of mediated transitions are never infected.
+
+    Args:
+        epimodel (EpiModel): The epidemic model.
+
+    Returns:
+        List[str]: The infected compartments, in the order of the model compartments.
+    """
+    mediated = [tr for tr in epimodel.transitions_list if tr.kind == "mediated"]
+    sources = {tr.source for tr in mediated}
+    agents = {tr.params[1] for tr in mediated}
+    edges = {}
+    for tr in epimodel.transitions_list:
+        if tr.kind == "spontaneous":
+            edges.setdefault(tr.source, set()).add(tr.target)
+
+    def reachable(start: set) -> set:
+        visited, stack = set(start), list(start)
+        while stack:
+            for target in edges.get(stack.pop(), ()):
+                if target not in visited and target not in sources:
+                    visited.add(target)
+                    stack.append(target)
+        return visited
+
+    exposed = reachable({tr.target for tr in mediated} - sources)
+    return [comp for comp in epimodel.compartments
+            if comp in exposed and (comp in agents or reachable({comp}) & agents)]
+
+
+def compute_next_generation_matrices(epimodel: EpiModel,
+                                     parameters: Dict[str, np.ndarray],
+                                     contact_matrices: np.ndarray,
+                                     susceptibles: Optional[Dict[str, np.ndarray]] = None) -> np.ndarray:
+    """
+    Computes the next-generation matrices K = F V^-1 of the model over time.
+
+    F contains the rates of new infections generated by mediated transitions, and V the rates of spontaneous
+    transitions out of and between infected compartments. Rows and columns index infected compartments
+    (see `get_infected_compartments`) and demographic groups, as `comp_idx * n_groups + group_idx`.
+    Transitions of other kinds are not included.
+
+    Args:
+        epimodel (EpiModel): The epidemic model.
+        parameters (Dict[str, np.ndarray]): The parameter definitions, of shape (T, n_groups) (see `create_definitions`).
+        contact_matrices (np.ndarray): The overall contact matrices, of shape (T, n_groups, n_groups) or (1, n_groups, n_groups).
+        susceptibles (Dict[str, np.ndarray], optional): Dictionary mapping the sources of mediated transitions to their
+            population, of shape (..., T, n_groups), e.g. with a replicate axis. Default is None (disease-free
+            equilibrium, with the whole population in the source of mediated transitions).
+
+    Returns:
+        np.ndarray: The next-generation matrices, of shape (..., T, n_infected * n_groups, n_infected * n_groups).
+
+    Raises:
+        ValueError: If susceptibles are not provided and mediated transitions have multiple sources, or if an
+            infected compartment has no outgoing spontaneous transition.
+    """
+    infected = get_infected_compartments(epimodel)
+    infected_idx = {comp: i for i, comp in enumerate(infected)}
+    mediated = [tr for tr in epimodel.transitions_list if tr.kind == "mediated" and tr.target in infected_idx]
+    spontaneous = [tr for tr in epimodel.transitions_list if tr.kind == "spontaneous" and tr.source in infected_idx]
+
+    pop_sizes = np.asarray(epimodel.population.Nk, dtype=np.float64)
+    N, m = len(pop_sizes), len(infected) * len(pop_sizes)
+    if susceptibles is None:
+        sources = {tr.source for tr in mediated}
+        if len(sources) > 1:
+            raise ValueError(f"Susceptibles must be provided for models with multiple sources of mediated transitions: {sorted(sources)}")
+        susceptibles = {source: pop_sizes for source in sources}
+
+    contact_matrices = np.asarray(contact_matrices, dtype=np.float64)
+    context = {"parameters": parameters, "expressions": {}}
+    T = max([len(contact_matrices)] + [np.asarray(value).shape[0] for value in parameters.values() if np.ndim(value) > 0])
+    batch_shape = np.broadcast_shapes(*[np.shape(value)[:-2] for value in susceptibles.values()])
+
+    # New infections in group i of the target, per infected individual of group j in the agent compartment
+    inv_pop_sizes = np.divide(1., pop_sizes, out=np.zeros_like(pop_sizes), where=pop_sizes > 0)
+    F = np.zeros(batch_shape + (T, m, m))
+    for tr in mediated:
+        rate = np.broadcast_to(evaluate_parameter(tr.params[0], context), (T, N))
+        block = (rate * np.asarray(susceptibles[tr.source], dtype=np.float64))[..., :, np.newaxis] * contact_matrices * inv_pop_sizes
+        row, col = infected_idx[tr.target] * N, infected_idx[tr.params[1]] * N
+        F[..., row:row + N, col:col + N] += block
+
+    # Spontaneous transitions out of (diagonal) and between (off-diagonal) infected compartments
+    V = np.zeros((T, m, m))
+    groups = np.arange(N)
+    for tr in spontaneous:
+        rate = np.broadcast_to(evaluate_parameter(tr.params, context), (T, N))
+        source = infected_idx[tr.source] * N + groups
+        V[:, source, source] += rate
+        if tr.target in infected_idx:
+            V[:, infected_idx[tr.target] * N + groups, source] -= rate
+
+    if np.any(np.all(V == 0, axis=-2)):
+        raise ValueError("Each infected compartment must have an outgoing spontaneous transition with a positive rate.")
+    return F @ np.linalg.inv(V)
+
+
+def compute_R0(epimodel: EpiModel,
+               parameters: Optional[Dict[str, np.ndarray]] = None,
+               contact_matrix: Optional[np.ndarray] = None,
+               susceptibles: Optional[Dict[str, np.ndarray]] = None) -> float:
+    """
+    Computes the basic reproduction number of the model, as the spectral radius of the next-generation matrix.
+
+    Args:
+        epimodel (EpiModel): The epidemic model.
+        parameters (Dict[str, Any], optional): The model parameters. Time-varying parameters are evaluated at the
+            first time step. Default is None (the model parameters).
+        contact_matrix (np.ndarray, optional): The overall contact matrix. Default is None (sum of the contact
+            matrices of the population, without interventions).
+        susceptibles (Dict[str, np.ndarray], optional): Dictionary mapping the sources of mediated transitions to their
+            population by group. Default is None (disease-free equilibrium).
+
+    Returns:
+        float: The basic reproduction number.
+    """
+    K = _compute_initial_next_generation_matrix(epimodel, parameters, contact_matrix, susceptibles)
+    return spectral_radius(K)
+
+
+def compute_transmission_rate(epimodel: EpiModel,
+                              R0: Union[float, np.ndarray],
+                              parameter: str = "transmission_rate",
+                              parameters: Optional[Dict[str, np.ndarray]] = None,
+                              contact_matrix: Optional[np.ndarray] = None,
+                              susceptibles: Optional[Dict[str, np.ndarray]] = None) -> Union[float, np.ndarray]:
+    """
+    Computes the value of a transmission rate parameter giving a target basic reproduction number.
+
+    The basic reproduction number is assumed to be proportional to the parameter, which holds when the rates of
+    all mediated transitions are proportional to it (e.g., "transmission_rate" and "r*transmission_rate").
+    The spectral radius of the next-generation matrix computed with a unit parameter is cached by model
+    transitions, parameters, contact matrix, population and susceptibles, so repeated conversions with the
+    same inputs only divide the target by the cached value.
+
+    Args:
+        epimodel (EpiModel): The epidemic model.
+        R0 (float or np.ndarray): The target basic reproduction number(s).
+        parameter (str, optional): The name of the transmission rate parameter. Default is "transmission_rate".
+        parameters (Dict[str, Any], optional): The model parameters. Default is None (the model parameters).
+        contact_matrix (np.ndarray, optional): The overall contact matrix. Default is None (sum of the contact
+            matrices of the population, without interventions).
+        susceptibles (Dict[str, np.ndarray], optional): Dictionary mapping the sources of mediated transitions to their
+            population by group. Default is None (disease-free equilibrium).
+
+    Returns:
+        float or np.ndarray: The transmission rate(s) giving the target R0.
+
+    Raises:
+        ValueError: If the parameter is not defined or does not generate any infection.
+    """
+    parameters = dict(epimodel.parameters if parameters is None else parameters)
+    if parameter not in parameters:
+        raise ValueError(f"Parameter {parameter} is not defined.")
+    parameters[parameter] = 1.
+    if contact_matrix is None:
+        contact_matrix = np.sum(np.array(list(epimodel.population.contact_matrices.values())), axis=0)
+
+    # The spectral radius at unit parameter only depends on the inputs of the next-generation matrix
+    key = ("next_generation_matrix",
+           tuple((tr.source, tr.target, tr.kind, repr(tr.params)) for tr in epimodel.transitions_list),
+           tuple(sorted((name, _hashable(value)) for name, value in parameters.items())),
+           _hashable(contact_matrix),
+           _hashable(epimodel.population.Nk),
+           None if susceptibles is None else tuple(sorted((name, _hashable(value)) for name, value in susceptibles.items())))
+    rho = _cached_spectral_radius(
+        key, lambda: _compute_initial_next_generation_matrix(epimodel, parameters, contact_matrix, susceptibles))
+    if rho == 0:
+        raise ValueError(f"Parameter {parameter} does not generate any infection.")
+    return R0 / rho
+
+
+def compute_Rt(epimodel: EpiModel,
+               dates: List[pd.Timestamp],
+               susceptibles: Optional[Dict[str, np.ndarray]] = None,
+               parameters: Optional[Dict[str, np.ndarray]] = None) -> np.ndarray:
+    """
+    Computes the reproduction number over time, accounting for interventions, overrides and time-varying parameters.
+
+    Next-generation matrices are computed for all dates (and replicates) at once, and eigenvalues are only
+    computed once per distinct matrix.
+
+    Args:
+        epimodel (EpiModel): The epidemic model.
+        dates (List[pd.Timestamp]): The simulation dates (see `compute_simulation_dates`).
+        susceptibles (Dict[str, np.ndarray], optional): Dictionary mapping the sources of mediated transitions to their
+            population, of shape (..., n_dates, n_groups), e.g. (Nsim, n_dates, n_groups) to compute Rt for each
+            replicate (see `get_susceptibles`). Default is None (disease-free equilibrium).
+        parameters (Dict[str, np.ndarray], optional): The parameter definitions over the dates, e.g. the `parameters`
+            of a trajectory. Default is None (the model parameters with overrides, as in `simulate`).
+
+    Returns:
+        np.ndarray: The reproduction number, of shape (..., n_dates).
+    """
+    n_groups = len(epimodel.population.Nk)
+    if parameters is None:
+        parameters = create_definitions(epimodel.parameters, len(dates), n_groups)
+        parameters = apply_overrides(parameters, epimodel.overrides, dates)
+    contact_matrices_by_date = epimodel.compute_contact_matrices(dates)
+    contact_matrices = np.array([contact_matrices_by_date[date]["overall"] for date in dates])
+    return spectral_radii(compute_next_generation_matrices(epimodel, parameters, contact_matrices, susceptibles))
+
+
+def get_susceptibles(epimodel: EpiModel, results) -> Dict[str, np.ndarray]:
+    """
+    Extracts the population of the sources of mediated transitions from simulation results.
+
+    Args:
+        epimodel (EpiModel): The epidemic model.
+        results (SimulationResults): The simulation results.
+
+    Returns:
+        Dict[str, np.ndarray]: Dictionary mapping the sources of mediated transitions to their population,
+            of shape (Nsim, n_dates, n_groups).
+    """
+    stacked = results.get_stacked_compartments()
+    sources = {tr.source for tr in epimodel.transitions_list if tr.kind == "mediated"}
+    return {source: np.stack([stacked[f"{source}_{group}"] for group in epimodel.population.Nk_names], axis=-1)
+            for source in sources}
+
+
+def _compute_initial_next_generation_matrix(epimodel: EpiModel,
+                                            parameters: Optional[Dict[str, np.ndarray]],
+                                            contact_matrix: Optional[np.ndarray],
+                                            susceptibles: Optional[Dict[str, np.ndarray]]) -> np.ndarray:
+    """
+    Computes the next-generation matrix at the first time step.
+    """
+    n_groups = len(epimodel.population.Nk)
+    parameters = epimodel.parameters if parameters is None else parameters
+    parameters = create_definitions({name: np.asarray(value)[:1] if np.ndim(value) > 0 else value
+                                     for name, value in parameters.items()}, 1, n_groups)
+    if contact_matrix is None:
+        contact_matrix = np.sum(np.array(list(epimodel.population.contact_matrices.values())), axis=0)
+    if susceptibles is not None:
+        susceptibles = {source: np.asarray(values)[np.newaxis] for source, values in susceptibles.items()}
+    return compute_next_generation_matrices(epimodel, parameters, np.asarray(contact_matrix)[np.newaxis], susceptibles)[0]
@@ -0,0 +1,100 @@
+from typing import Dict, Optional, Union
+import numpy as np
+import pandas as pd
+from .epimodel import EpiModel, simulate
+from .simulation_results import SimulationResults
+from .random_streams import RandomStreams
+
+
+def run_scenarios(base_model: EpiModel,
+                  scenarios: Dict[str, EpiModel],
+                  branch_date: Union[str, pd.Timestamp],
+                  Nsim: int = 100,
+                  start_date: Union[str, pd.Timestamp] = "2020-01-01",
+                  end_date: Union[str, pd.Timestamp] = "2020-12-31",
+                  initial_conditions_dict: Optional[Dict[str, np.ndarray]] = None,
+                  percentage_in_agents: float = 0.0005,
+                  dt: Optional[float] = 1.,
+                  resample_frequency: Optional[str] = "D",
+                  resample_aggregation_compartments: Optional[Union[str, dict]] = "last",
+                  resample_aggregation_transitions: Optional[Union[str, dict]] = "sum",
+                  fill_method: Optional[str] = "ffill",
+                  crn_seed: Optional[int] = None) -> Dict[str, SimulationResults]:
+    """
+    Simulates multiple scenarios that share the same dynamics up to a branch date.
+
+    Each replicate is simulated once with the base model up to the branch date (excluded), and then resumed
+    from the same state with the model of every scenario up to the end date. The common prefix is therefore
+    computed once per replicate instead of once per replicate and scenario. Interventions and overrides of
+    the scenarios only take effect from the branch date.
+
+    Args:
+        base_model (EpiModel): The model used to simulate the common prefix
+        scenarios (Dict[str, EpiModel]): Dictionary mapping scenario names to models. All models must have the
+            same compartments and population as the base model
+        branch_date (str or pd.Timestamp): The first date simulated with the scenario models
+        Nsim (int, optional): The number of replicates of each scenario. Default is 100.
+        start_date (str or pd.Timestamp): The start date of the simulation. Default is "2020-01-01".
+        end_date (str or pd.Timestamp): The end date of the simulation. Default is "2020-12-31".
+        initial_conditions_dict (dict, optional): A dictionary of initial conditions for the simulation.
+        percentage_in_agents (float, optional): The percentage of the population to initialize in the agents compartment.
+        dt (float, optional): The time step for the simulation, expressed in days. Default is 1 (day).
+        resample_frequency (str, optional): The frequency at which to resample the simulation results. Default is "D" (daily).
+        resample_aggregation_compartments (str, optional): The aggregation method to use when resampling the compartments. Default is "last".
+        resample_aggregation_transitions (str, optional): The aggregation method to use when resampling the transitions. Default is "sum".
+        fill_method (str, optional): Method to fill NaN values after resampling. Default is "ffill".
+        crn_seed (int, optional): If provided, the replicate i of every scenario draws from the same common random 
+            numbers streams (see `RandomStreams`), which reduces the variance of differences between scenarios. 
+            Default is None (global numpy random state).
+
+    Returns:
+        Dict[str, SimulationResults]: Dictionary mapping scenario names to their simulation results, spanning
+            from the start date to the end date
+
+    Raises:
+        ValueError: If the branch date is not after the start date or is after the end date, or if a scenario
+            model is not compatible with the base model.
+        RuntimeError: If the simulation fails.
+    """
+    start_date, end_date, branch_date = pd.Timestamp(start_date), pd.Timestamp(end_date), pd.Timestamp(branch_date)
+    prefix_end_date = branch_date - pd.Timedelta(days=dt)
+    if prefix_end_date < start_date or branch_date > end_date:
+        raise ValueError("The branch date must be after the start date and not after the end date.")
+
+    trajectories = {name: [] for name in scenarios}
+    for i in range(Nsim):
+        random_streams = RandomStreams(crn_seed, i) if crn_seed is not None else None
+        prefix = simulate(base_model,
+                          start_date=start_date,
+                          end_date=prefix_end_date,
+                          initial_conditions_dict=initial_conditions_dict,
+                          percentage_in_agents=percentage_in_agents,
+                          dt=dt,
+                          resample_frequency=None,
+                          return_checkpoint=True,
+                          random_streams=random_streams)
+
+        for name, model in scenarios.items():
+            try:
+                branch = simulate(model,
+                                  end_date=end_date,
+                                  dt=dt,
+                                  resample_frequency=None,
+                                  checkpoint=prefix.checkpoint,
+                                  restore_random_state=False,
+                                  random_streams=random_streams)
+            except ValueError as e:
+                raise ValueError(f"Scenario {name} cannot be resumed from the base model: {str(e)}") from e
+            except Exception as e:
+                raise RuntimeError(f"Simulation of scenario {name} failed: {str(e)}") from e
+
+            trajectory = prefix.concatenate(branch)
+            if resample_frequency is not None and pd.infer_freq(pd.DatetimeIndex(trajectory.dates)) != resample_frequency:
+                trajectory.resample(resample_frequency,
+                                    resample_aggregation_compartments,
+                                    resample_aggregation_transitions,
+                                    fill_method)
+            trajectories[name].append(trajectory)
+
+    return {name: SimulationResults(trajectories=trajectories[name], parameters=model.parameters)
+            for name, model in scenarios.items()}
@@ -1,8 +1,33 @@
 from dataclasses import dataclass
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
 import pandas as pd
 import numpy as np
 
+@dataclass
+class SimulationCheckpoint:
+    """
+    Class to store the state of a simulation at the end of a run, from which the simulation can be resumed.
+
+    Attributes:
+        compartments (np.ndarray): Population in each compartment and demographic group, of shape (n_compartments, n_groups)
+        step (int): Number of time steps simulated since the start date
+        start_date (pd.Timestamp): Start date of the simulation, to which time-varying parameters, overrides and 
+            interventions are aligned
+        date (pd.Timestamp): Date of the last simulated time step
+        dt (float): Time step of the simulation, expressed in days
+        compartment_idx (Dict[str, int]): Dictionary mapping compartment names to indices
+        random_state (Tuple, optional): State of the global numpy random generator at the end of the run 
+            (see `np.random.get_state`), or None if the run did not use the global random generator
+    """
+    compartments: np.ndarray
+    step: int
+    start_date: pd.Timestamp
+    date: pd.Timestamp
+    dt: float
+    compartment_idx: Dict[str, int]
+    random_state: Optional[Tuple]
+
+
 @dataclass
 class Trajectory:
     """
@@ -15,6 +40,7 @@ class Trajectory:
         compartment_idx (Dict[str, int]): Dictionary mapping compartment names to indices
         transitions_idx (Dict[str, int]): Dictionary mapping transition names to indices
         parameters (Dict[str, Any]): Dictionary of parameters used in the simulation
+        checkpoint (SimulationCheckpoint, optional): State at the end of the simulation, if requested
     """
     compartments: Dict[str, np.ndarray]
     transitions: Dict[str, np.ndarray]
@@ -22,6 +48,7 @@ class Trajectory:
     compartment_idx: Dict[str, int]
     transitions_idx: Dict[str, int]
     parameters: Dict[str, Any]
+    checkpoint: Optional[SimulationCheckpoint] = None
 
     def resample(self, freq: str, method_compartments: str = 'last', method_transitions: str = 'sum', fill_method: str = 'ffill') -> None:
         """
@@ -65,3 +92,36 @@ class Trajectory:
         self.compartments = {k: np.array(v) for k, v in df_comp_resampled.items()}
         self.transitions = {k: np.array(v) for k, v in df_trans_resampled.items()}
         self.dates = df_comp_resampled.index.tolist()
+
+    def concatenate(self, other: "Trajectory") -> "Trajectory":
+        """
+        Concatenate this trajectory with a trajectory continuing it (e.g., resumed from its checkpoint).
+
+        Args:
+            other (Trajectory): The trajectory continuing this one. Its dates must follow the dates of this trajectory
+
+        Returns:
+            Trajectory: A new trajectory spanning the dates of both trajectories, with the checkpoint of `other`
+
+        Raises:
+            ValueError: If the trajectories have different compartments or transitions, or if the dates of `other` 
+                do not follow the dates of this trajectory
+        """
+        if self.compartments.keys() != other.compartments.keys() or self.transitions.keys() != other.transitions.keys():
+            raise ValueError("Trajectories must have the same compartments and transitions to be concatenated.")
+        if len(self.dates) > 0 and len(other.dates) > 0 and other.dates[0] <= self.dates[-1]:
+            raise ValueError("The dates of the trajectory to concatenate must follow the dates of this trajectory.")
+
+        # Parameters defined in both trajectories are concatenated, the others are taken from the continuation
+        parameters = dict(other.parameters)
+        for name, values in other.parameters.items():
+            if name in self.parameters and np.ndim(values) > 0 and np.ndim(self.parameters[name]) == np.ndim(values):
+                parameters[name] = np.concatenate([self.parameters[name], values])
+
+        return Trajectory(compartments={k: np.concatenate([v, other.compartments[k]]) for k, v in self.compartments.items()},
+                          transitions={k: np.concatenate([v, other.transitions[k]]) for k, v in self.transitions.items()},
+                          dates=list(self.dates) + list(other.dates),
+                          compartment_idx=self.compartment_idx,
+                          transitions_idx=self.transitions_idx,
+                          parameters=parameters,
+                          checkpoint=other.checkpoint)
@@ -3,6 +3,7 @@ from typing import List, Dict, Any, Optional
 import pandas as pd
 import numpy as np
 from .simulation_output import Trajectory
+from .simulation_stats import SimulationStats
 
 @dataclass
 class SimulationResults:
@@ -12,9 +13,11 @@ class SimulationResults:
     Attributes:
         trajectories (List[Trajectory]): List of simulation trajectories
         parameters (Dict[str, Any]): Dictionary of parameters used in the simulations
+        stats (Optional[SimulationStats]): Per-phase profiling statistics of the simulations, if collected
     """
     trajectories: List[Trajectory]
     parameters: Dict[str, Any]
+    stats: Optional[SimulationStats] = None
 
     @property
     def Nsim(self) -> int:
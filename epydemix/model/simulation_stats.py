@@ -0,0 +1,172 @@
+from dataclasses import dataclass, field
+from contextlib import contextmanager, nullcontext
+from typing import ContextManager, Dict, Iterable, Iterator, Optional
+import time
+import tracemalloc
+import pandas as pd
+
+
+@dataclass
+class PhaseStats:
+    """
+    Class to store the profiling statistics of a simulation phase.
+
+    Attributes:
+        wall_time (float): Total wall-clock time spent in the phase, in seconds
+        allocated_bytes (int): Total peak memory allocated during the phase, in bytes
+        calls (int): Number of times the phase was executed
+    """
+    wall_time: float = 0.
+    allocated_bytes: int = 0
+    calls: int = 0
+
+
+@dataclass
+class SimulationStats:
+    """
+    Class to collect per-phase profiling statistics of simulations.
+
+    The same object can be passed to multiple simulations to accumulate statistics across runs,
+    and statistics collected separately can be combined with `merge`.
+
+    Memory is tracked with `tracemalloc`, which slows down the simulation. Set `track_memory` to False
+    to measure wall-clock times only.
+
+    Attributes:
+        phases (Dict[str, PhaseStats]): Dictionary mapping phase names to their statistics
+        n_runs (int): Number of simulations profiled
+        track_memory (bool): Whether to track memory allocations. Default is True
+    """
+    phases: Dict[str, PhaseStats] = field(default_factory=dict)
+    n_runs: int = 0
+    track_memory: bool = True
+
+    def add(self, name: str, wall_time: float, allocated_bytes: int = 0, calls: int = 1) -> None:
+        """
+        Adds measurements to the statistics of a phase.
+
+        Args:
+            name (str): The name of the phase
+            wall_time (float): Wall-clock time spent in the phase, in seconds
+            allocated_bytes (int): Memory allocated during the phase, in bytes. Default is 0
+            calls (int): Number of executions of the phase. Default is 1
+        """
+        phase = self.phases.setdefault(name, PhaseStats())
+        phase.wall_time += wall_time
+        phase.allocated_bytes += allocated_bytes
+        phase.calls += calls
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        Context manager measuring wall-clock time and peak memory allocated in a phase.
+
+        Args:
+            name (str): The name of the phase
+        """
+        track_memory = self.track_memory and tracemalloc.is_tracing()
+        if track_memory:
+            if hasattr(tracemalloc, "reset_peak"):
+                tracemalloc.reset_peak()
+            start_memory = tracemalloc.get_traced_memory()[0]
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            wall_time = time.perf_counter() - start_time
+            allocated_bytes = max(0, tracemalloc.get_traced_memory()[1] - start_memory) if track_memory else 0
+            self.add(name, wall_time, allocated_bytes)
+
+    @contextmanager
+    def run(self) -> Iterator[None]:
+        """
+        Context manager delimiting a profiled simulation run. Starts memory tracing if needed.
+        """
+        start_tracing = self.track_memory and not tracemalloc.is_tracing()
+        if start_tracing:
+            tracemalloc.start()
+        try:
+            yield
+            self.n_runs += 1
+        finally:
+            if start_tracing:
+                tracemalloc.stop()
+
+    def merge(self, other: "SimulationStats") -> "SimulationStats":
+        """
+        Combines the statistics with the ones of another object.
+
+        Args:
+            other (SimulationStats): The statistics to combine
+
+        Returns:
+            SimulationStats: A new object with the combined statistics
+        """
+        return SimulationStats.aggregate([self, other])
+
+    def __add__(self, other: "SimulationStats") -> "SimulationStats":
+        return self.merge(other)
+
+    @classmethod
+    def aggregate(cls, stats: Iterable["SimulationStats"]) -> "SimulationStats":
+        """
+        Combines the statistics of multiple objects (e.g., collected in different processes).
+
+        Args:
+            stats (Iterable[SimulationStats]): The statistics to combine
+
+        Returns:
+            SimulationStats: A new object with the combined statistics
+        """
+        stats = list(stats)
+        combined = cls(track_memory=any(s.track_memory for s in stats))
+        for s in stats:
+            combined.n_runs += s.n_runs
+            for name, phase in s.phases.items():
+                combined.add(name, phase.wall_time, phase.allocated_bytes, phase.calls)
+        return combined
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """
+        Returns the statistics as a DataFrame with one row per phase.
+
+        Returns:
+            pd.DataFrame: DataFrame with columns `wall_time`, `allocated_bytes`, `calls`,
+                `wall_time_per_run` and `allocated_bytes_per_run`, indexed by phase name
+        """
+        df = pd.DataFrame({
+            "wall_time": [p.wall_time for p in self.phases.values()],
+            "allocated_bytes": [p.allocated_bytes for p in self.phases.values()],
+            "calls": [p.calls for p in self.phases.values()]
+        }, index=pd.Index(list(self.phases.keys()), name="phase"))
+        n_runs = max(self.n_runs, 1)
+        df["wall_time_per_run"] = df["wall_time"] / n_runs
+        df["allocated_bytes_per_run"] = df["allocated_bytes"] / n_runs
+        return df
+
+
+def profile_phase(stats: Optional[SimulationStats], name: str) -> ContextManager:
+    """
+    Returns a context manager profiling a phase if statistics are collected, or a no-op context manager otherwise.
+
+    Args:
+        stats (SimulationStats, optional): The statistics to update
+        name (str): The name of the phase
+
+    Returns:
+        ContextManager: The context manager
+    """
+    return stats.phase(name) if stats is not None else nullcontext()
+
+
+def profile_run(stats: Optional[SimulationStats]) -> ContextManager:
+    """
+    Returns a context manager delimiting a profiled run if statistics are collected, or a no-op context manager otherwise.
+
+    Args:
+        stats (SimulationStats, optional): The statistics to update
+
+    Returns:
+        ContextManager: The context manager
+    """
+    return stats.run() if stats is not None else nullcontext()
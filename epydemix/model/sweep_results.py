@@ -0,0 +1,122 @@
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional, Union
+import pandas as pd
+import numpy as np
+from .simulation_output import Trajectory
+from .simulation_results import SimulationResults
+from ..utils.utils import format_simulation_output
+
+
+@dataclass
+class SweepResults:
+    """
+    Class to store the results of a parameter sweep, indexed by grid point.
+
+    Grid points are addressed by their position in these results (e.g. `results[0]`). For the batches of 
+    `EpiModel.iter_sweep`, the index of `points` gives the position of each grid point in the whole grid.
+
+    Attributes:
+        points (pd.DataFrame): The parameter values of each grid point, one row per point, missing where a point 
+            does not define a swept parameter
+        compartments (np.ndarray, optional): Compartments evolution, of shape (n_points, Nsim_per_point, timesteps, n_compartments, n_groups), 
+            or None if only outputs are stored
+        transitions (np.ndarray, optional): Transitions evolution, of shape (n_points, Nsim_per_point, timesteps, n_transitions, n_groups), 
+            or None if only outputs are stored
+        dates (List[pd.Timestamp]): List of simulation dates
+        compartment_idx (Dict[str, int]): Dictionary mapping compartment names to indices
+        transitions_idx (Dict[str, int]): Dictionary mapping transition names to indices
+        demographics (List[str]): Names of the demographic groups
+        parameters (Dict[str, Any]): Dictionary of the model parameters shared by all grid points
+        resample_frequency (str, optional): The frequency at which trajectories are resampled. Default is "D" (daily)
+        resample_aggregation_compartments (str, optional): Aggregation method of compartments when resampling. Default is "last"
+        resample_aggregation_transitions (str, optional): Aggregation method of transitions when resampling. Default is "sum"
+        fill_method (str, optional): Method to fill NaN values after resampling. Default is "ffill"
+        Nsim_per_point (int): Number of simulations per grid point. Default is 1
+        outputs (Dict[str, np.ndarray]): Outputs of the grid points computed by `EpiModel.sweep(outputs=...)`, whose 
+            first axis is the grid points
+    """
+    points: pd.DataFrame
+    compartments: Optional[np.ndarray]
+    transitions: Optional[np.ndarray]
+    dates: List[pd.Timestamp]
+    compartment_idx: Dict[str, int]
+    transitions_idx: Dict[str, int]
+    demographics: List[str]
+    parameters: Dict[str, Any]
+    resample_frequency: Optional[str] = "D"
+    resample_aggregation_compartments: Optional[Union[str, dict]] = "last"
+    resample_aggregation_transitions: Optional[Union[str, dict]] = "sum"
+    fill_method: Optional[str] = "ffill"
+    Nsim_per_point: int = 1
+    outputs: Dict[str, np.ndarray] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        """Number of grid points."""
+        return len(self.points)
+
+    def __getitem__(self, point: int) -> SimulationResults:
+        return self.get_results(point)
+
+    def get_point_parameters(self, point: int) -> Dict[str, Any]:
+        """
+        Get the parameters of a grid point.
+
+        Args:
+            point (int): The position of the grid point in these results
+
+        Returns:
+            Dict[str, Any]: The model parameters, updated with the values of the grid point. Parameters that the 
+                grid point does not define keep their model value, as in the simulation.
+        """
+        # Values are read by column, so that integer columns are not converted to floats
+        values = {}
+        for name in self.points.columns:
+            value = self.points[name].iloc[point]
+            if np.ndim(value) == 0 and pd.isna(value):
+                continue
+            values[name] = value.item() if isinstance(value, np.generic) else value
+        return {**self.parameters, **values}
+
+    def get_totals(self, compartment: str) -> np.ndarray:
+        """
+        Get the evolution of a compartment summed over demographic groups, at the simulation dates.
+
+        Args:
+            compartment (str): The name of the compartment
+
+        Returns:
+            np.ndarray: Array of shape (n_points, Nsim_per_point, timesteps)
+        """
+        self._check_trajectories()
+        return self.compartments[..., self.compartment_idx[compartment], :].sum(axis=-1)
+
+    def get_results(self, point: int) -> SimulationResults:
+        """
+        Get the simulation results of a grid point, with trajectories resampled as in `simulate`.
+
+        Args:
+            point (int): The position of the grid point in these results
+
+        Returns:
+            SimulationResults: The simulation results of the grid point
+        """
+        self._check_trajectories()
+        trajectories = []
+        for compartments, transitions in zip(self.compartments[point], self.transitions[point]):
+            results = format_simulation_output(compartments, transitions, self.compartment_idx,
+                                               self.transitions_idx, self.demographics)
+            trajectory = Trajectory(compartments=results["compartments"], transitions=results["transitions"],
+                                    dates=self.dates, compartment_idx=self.compartment_idx,
+                                    transitions_idx=self.transitions_idx, parameters=self.get_point_parameters(point))
+            if self.resample_frequency is not None and pd.infer_freq(pd.DatetimeIndex(self.dates)) != self.resample_frequency:
+                trajectory.resample(self.resample_frequency,
+                                    self.resample_aggregation_compartments,
+                                    self.resample_aggregation_transitions,
+                                    self.fill_method)
+            trajectories.append(trajectory)
+        return SimulationResults(trajectories=trajectories, parameters=self.get_point_parameters(point))
+
+    def _check_trajectories(self) -> None:
+        """Raise an error if the trajectories were not stored."""
+        if self.compartments is None:
+            raise ValueError("Trajectories were not stored by the sweep, only its outputs are available.")
@@ -1,16 +1,24 @@
 # epydemix/utils/__init__.py
 
 from .utils import compute_days, compute_simulation_dates, convert_to_2Darray, combine_simulation_outputs
-from .abc_smc_utils import sample_prior, compute_effective_sample_size, weighted_quantile, Perturbation, DefaultPerturbationDiscrete, DefaultPerturbationContinuous
+from .abc_smc_utils import sample_prior, PriorSampler, compute_effective_sample_size, weighted_quantile, Perturbation, DefaultPerturbationDiscrete, DefaultPerturbationContinuous, JointPerturbation, ComponentwisePerturbation, MultivariateNormalPerturbation, LocalPerturbation, KNearestNeighboursPerturbation, OLCMPerturbation, NearestNeighboursScreening
 __all__ = [
     'compute_days',
     'compute_simulation_dates',
     'convert_to_2Darray',
     'sample_prior',
+    'PriorSampler',
     'compute_effective_sample_size',
     'weighted_quantile',
     'Perturbation',
     'DefaultPerturbationDiscrete',
     'DefaultPerturbationContinuous',
+    'JointPerturbation',
+    'ComponentwisePerturbation',
+    'MultivariateNormalPerturbation',
+    'LocalPerturbation',
+    'KNearestNeighboursPerturbation',
+    'OLCMPerturbation',
+    'NearestNeighboursScreening',
     'combine_simulation_outputs'
 ]
\ No newline at end of file
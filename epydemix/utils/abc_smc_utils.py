@@ -1,22 +1,40 @@
 import numpy as np 
 from scipy.stats import norm
+from scipy.linalg import cholesky, solve_triangular
+from scipy.spatial import cKDTree
 from typing import Dict, List, Tuple, Optional, Union, Any
 from abc import ABC, abstractmethod
+import inspect
 
 class Perturbation(ABC):
     def __init__(self, param_name):
         self.param_name = param_name
 
     @abstractmethod
-    def propose(self, x):
-        """Propose a new value based on the current value."""
+    def propose(self, x, rng=None):
+        """Propose a new value based on the current value, drawing from rng if provided."""
         pass
 
+    def propose_batch(self, x, rng=None):
+        """Propose new values for an array of current values.
+        Kernels should override this method with a vectorized implementation, the default calls propose elementwise.
+        """
+        if rng is not None and "rng" in inspect.signature(self.propose).parameters:
+            return np.array([self.propose(value, rng=rng) for value in x], dtype=float)
+        return np.array([self.propose(value) for value in x], dtype=float)
+
     @abstractmethod
     def pdf(self, x, center):
         """Evaluate the PDF of the kernel."""
         pass
 
+    def logpdf(self, x, center):
+        """Evaluate the log-PDF of the kernel, broadcasting arrays of values and centers.
+        Kernels should override this method with a vectorized implementation, the default evaluates pdf elementwise.
+        """
+        with np.errstate(divide="ignore"):
+            return np.log(np.vectorize(self.pdf, otypes=[float])(x, center))
+
     @abstractmethod
     def update(self, particles, weights, param_names):
         """Update the kernel parameters based on particles and weights."""
@@ -31,14 +49,24 @@ class DefaultPerturbationContinuous(Perturbation):
         super().__init__(param_name)
         self.std = 0.1  
 
-    def propose(self, x):
+    def propose(self, x, rng=None):
         """Propose a new value based on the current value."""
-        return np.random.normal(x, self.std)
+        rng = np.random if rng is None else rng
+        return rng.normal(x, self.std)
+
+    def propose_batch(self, x, rng=None):
+        """Propose new values for an array of current values."""
+        return self.propose(np.asarray(x, dtype=float), rng=rng)
 
     def pdf(self, x, center):
         """Evaluate the PDF of the kernel."""
         return norm.pdf(x, center, self.std)
 
+    def logpdf(self, x, center):
+        """Evaluate the log-PDF of the kernel, broadcasting arrays of values and centers."""
+        z = (np.asarray(x) - np.asarray(center)) / self.std
+        return -0.5 * z**2 - np.log(self.std) - 0.5 * np.log(2 * np.pi)
+
     def update(self, particles, weights, param_names):
         """Update the standard deviation based on previous generation variance."""
         index = param_names.index(self.param_name)
@@ -48,21 +76,38 @@ class DefaultPerturbationContinuous(Perturbation):
 
 
 class DefaultPerturbationDiscrete(Perturbation):
-    def __init__(self, param_name, prior, jump_probability=0.3):
+    def __init__(self, param_name, prior, jump_probability=0.3, support=None):
         super().__init__(param_name)
         self.prior = prior  
-        self.jump_probability = jump_probability
-        self.support = np.arange(self.prior.support()[0], self.prior.support()[1]+1)
+        # The support must be sorted for the index arithmetic of propose_batch
+        if support is None:
+            support = np.arange(self.prior.support()[0], self.prior.support()[1]+1)
+        self.support = np.unique(support)
+        # With a single value in the support, the kernel never moves
+        self.jump_probability = jump_probability if len(self.support) > 1 else 0.
 
-    def propose(self, x):
+    def propose(self, x, rng=None):
         """Propose a new value for the discrete parameter."""
-        if np.random.rand() < self.jump_probability:
+        rng = np.random if rng is None else rng
+        if len(self.support) > 1 and rng.random() < self.jump_probability:
             proposed = x
             while proposed == x:
-                proposed = np.random.choice(self.support)
+                proposed = rng.choice(self.support)
             return proposed
         return x 
 
+    def propose_batch(self, x, rng=None):
+        """Propose new values for an array of current values."""
+        rng = np.random if rng is None else rng
+        x = np.asarray(x, dtype=float)
+        if len(self.support) == 1:
+            return x.copy()
+        jump = rng.random(len(x)) < self.jump_probability
+        # Draw uniformly among the other values of the support, skipping the index of the current value
+        index = rng.integers(0, len(self.support) - 1, size=len(x))
+        index += index >= np.searchsorted(self.support, x)
+        return np.where(jump, self.support[np.minimum(index, len(self.support) - 1)], x)
+
     def pdf(self, x, center):
         """Transition probability for the discrete parameter."""
         if x == center:
@@ -71,18 +116,351 @@ class DefaultPerturbationDiscrete(Perturbation):
             return self.jump_probability / (len(self.support) - 1)
         return 0
 
+    def logpdf(self, x, center):
+        """Log transition probability, broadcasting arrays of values and centers."""
+        x, center = np.broadcast_arrays(x, center)
+        with np.errstate(divide="ignore"):
+            return np.where(x == center, np.log(1 - self.jump_probability),
+                            np.where(np.isin(x, self.support), np.log(self.jump_probability / max(len(self.support) - 1, 1)), -np.inf))
+
     def update(self, particles, weights, param_names):
         """Update jump_probability or other characteristics if needed."""
         pass 
 
 
-def sample_prior(priors, param_names):
+class JointPerturbation(ABC):
+    """
+    Perturbation kernel acting on all parameters jointly, on arrays of shape (n, n_parameters).
+    """
+    @abstractmethod
+    def propose_batch(self, x, rng=None, indices=None):
+        """Propose new parameter sets for an array of current parameter sets of shape (n, n_parameters).
+        indices are the positions of the current parameter sets in the particles of the last update, 
+        used by kernels whose shape depends on the center.
+        """
+        pass
+
+    @abstractmethod
+    def logpdf(self, x, centers):
+        """Evaluate the log-PDF of the kernel for each pair of parameter sets and centers, as an array of shape (n, m)."""
+        pass
+
+    @abstractmethod
+    def update(self, particles, weights, param_names, distances=None, epsilon=None):
+        """Update the kernel parameters based on particles and weights.
+        distances are the distances of the particles and epsilon the threshold of the next generation.
+        """
+        pass
+
+
+class ComponentwisePerturbation(JointPerturbation):
+    """
+    Joint perturbation kernel made of independent per-parameter kernels.
+    """
+    def __init__(self, perturbations: List[Perturbation]):
+        self.perturbations = perturbations
+
+    def propose_batch(self, x, rng=None, indices=None):
+        """Propose new parameter sets by perturbing each parameter with its kernel."""
+        return np.column_stack([perturbation.propose_batch(x[:, i], rng=rng) for i, perturbation in enumerate(self.perturbations)])
+
+    def logpdf(self, x, centers):
+        """Sum the log-PDFs of the per-parameter kernels for each pair of parameter sets and centers."""
+        log_kernel = np.zeros((len(x), len(centers)))
+        for i, perturbation in enumerate(self.perturbations):
+            log_kernel += perturbation.logpdf(x[:, i][:, None], centers[:, i][None, :])
+        return log_kernel
+
+    def update(self, particles, weights, param_names, distances=None, epsilon=None):
+        """Update each per-parameter kernel."""
+        for perturbation in self.perturbations:
+            perturbation.update(particles, weights, param_names)
+
+
+class MultivariateNormalPerturbation(JointPerturbation):
+    """
+    Multivariate normal perturbation kernel with covariance equal to twice the weighted covariance of the 
+    previous generation (Beaumont et al. (2009), Filippi et al. (2013)). Unlike component-wise kernels, 
+    it follows correlations between parameters. It is only suited to continuous parameters.
+    """
+    def __init__(self, scale: float = 2.0):
+        self.scale = scale
+        self.cov = None
+        self._cholesky = None
+
+    def propose_batch(self, x, rng=None, indices=None):
+        """Propose new parameter sets for an array of current parameter sets of shape (n, n_parameters)."""
+        if self._cholesky is None:
+            raise ValueError("The kernel must be updated with a generation of particles before proposing.")
+        rng = np.random if rng is None else rng
+        x = np.asarray(x, dtype=float)
+        return x + rng.standard_normal(x.shape) @ self._cholesky.T
+
+    def logpdf(self, x, centers):
+        """Evaluate the log-PDF of the kernel for each pair of parameter sets and centers, as an array of shape (n, m)."""
+        # Whiten parameter sets and centers, then expand the squared distances as |x|^2 + |c|^2 - 2 x.c
+        x_white = solve_triangular(self._cholesky, np.asarray(x, dtype=float).T, lower=True).T
+        centers_white = solve_triangular(self._cholesky, np.asarray(centers, dtype=float).T, lower=True).T
+        squared_distances = (np.sum(x_white**2, axis=1)[:, None] + np.sum(centers_white**2, axis=1)[None, :] 
+                             - 2 * x_white @ centers_white.T)
+        log_normalization = np.sum(np.log(np.diag(self._cholesky))) + 0.5 * len(self.cov) * np.log(2 * np.pi)
+        return -0.5 * np.maximum(squared_distances, 0) - log_normalization
+
+    def update(self, particles, weights, param_names, distances=None, epsilon=None):
+        """Update the covariance based on the weighted covariance of the previous generation."""
+        cov = np.atleast_2d(np.cov(particles, rowvar=False, aweights=weights)) if len(particles) > 1 \
+            else np.zeros((particles.shape[1], particles.shape[1]))
+        self.cov = self.scale * cov
+        # Regularize degenerate covariances (e.g. identical particles) so that the kernel stays proper
+        jitter = 1e-12 * max(np.trace(self.cov) / len(self.cov), 1e-12)
+        while True:
+            try:
+                self._cholesky = cholesky(self.cov + jitter * np.eye(len(self.cov)), lower=True)
+                break
+            except np.linalg.LinAlgError:
+                jitter *= 100
+
+
+class LocalPerturbation(JointPerturbation):
+    """
+    Base class of multivariate normal kernels with one covariance matrix per particle of the previous generation.
+
+    Subclasses implement `local_covariances`. Since the kernel depends on its center, `propose_batch` requires 
+    the indices of the resampled particles and `logpdf` requires the centers to be the particles of the last update. 
+    Like `MultivariateNormalPerturbation`, these kernels are only suited to continuous parameters.
+    """
+    def __init__(self):
+        self.particles = None
+        self.covs = None
+        self._cholesky = None
+        self._inverse_cholesky = None
+
+    @abstractmethod
+    def local_covariances(self, particles, weights, distances=None, epsilon=None):
+        """Compute the covariance matrix of each particle, as an array of shape (n_particles, n_parameters, n_parameters)."""
+        pass
+
+    def update(self, particles, weights, param_names, distances=None, epsilon=None):
+        """Update the local covariances based on the previous generation."""
+        self.particles = np.asarray(particles, dtype=float)
+        weights = np.asarray(weights, dtype=float)
+        self.covs = self.local_covariances(self.particles, weights / weights.sum(), distances=distances, epsilon=epsilon)
+        self._cholesky = _batched_cholesky(self.covs)
+        self._inverse_cholesky = np.linalg.inv(self._cholesky)
+
+    def propose_batch(self, x, rng=None, indices=None):
+        """Propose new parameter sets around the particles at the given indices."""
+        if self._cholesky is None:
+            raise ValueError("The kernel must be updated with a generation of particles before proposing.")
+        if indices is None:
+            raise ValueError("Local kernels need the indices of the resampled particles.")
+        rng = np.random if rng is None else rng
+        x = np.asarray(x, dtype=float)
+        return x + np.einsum("npq,nq->np", self._cholesky[indices], rng.standard_normal(x.shape))
+
+    def logpdf(self, x, centers):
+        """Evaluate the log-PDF of the kernel centered on each particle of the last update, as an array of shape (n, m)."""
+        centers = np.asarray(centers, dtype=float)
+        if self.particles is None or centers.shape != self.particles.shape:
+            raise ValueError("The centers of local kernels must be the particles of the last update.")
+        differences = np.asarray(x, dtype=float)[:, None, :] - centers[None, :, :]
+        white = np.einsum("mpq,nmq->nmp", self._inverse_cholesky, differences)
+        log_normalization = (np.sum(np.log(np.diagonal(self._cholesky, axis1=1, axis2=2)), axis=1) 
+                             + 0.5 * centers.shape[1] * np.log(2 * np.pi))
+        return -0.5 * np.sum(white**2, axis=2) - log_normalization[None, :]
+
+
+class KNearestNeighboursPerturbation(LocalPerturbation):
+    """
+    Locally adaptive multivariate normal kernel whose covariance at each particle is the weighted covariance 
+    of its k nearest neighbours (Filippi et al. (2013)). Unlike `OLCMPerturbation`, the spread is measured 
+    around the mean of the neighbours rather than around the particle. Neighbours are found with a k-d tree 
+    on standardized parameters, built once per generation.
+    """
+    def __init__(self, n_neighbours: Optional[int] = None, fraction: float = 0.25):
+        super().__init__()
+        self.n_neighbours = n_neighbours
+        self.fraction = fraction
+
+    def local_covariances(self, particles, weights, distances=None, epsilon=None):
+        """Compute the weighted covariance of the k nearest neighbours of each particle."""
+        n_particles, n_parameters = particles.shape
+        k = self.n_neighbours if self.n_neighbours is not None else int(np.ceil(self.fraction * n_particles))
+        k = min(max(k, n_parameters + 1), n_particles)
+        scale = particles.std(axis=0)
+        tree = cKDTree(particles / np.where(scale > 0, scale, 1))
+        _, neighbours = tree.query(tree.data, k=k)
+        neighbours = neighbours.reshape(n_particles, k)
+        neighbour_weights = weights[neighbours]
+        neighbour_weights /= neighbour_weights.sum(axis=1, keepdims=True)
+        neighbour_particles = particles[neighbours]
+        means = np.einsum("nk,nkp->np", neighbour_weights, neighbour_particles)
+        differences = neighbour_particles - means[:, None, :]
+        return np.einsum("nk,nkp,nkq->npq", neighbour_weights, differences, differences)
+
+
+class OLCMPerturbation(LocalPerturbation):
+    """
+    Locally adaptive multivariate normal kernel with the optimal local covariance matrix (OLCM, Filippi et al. 
+    (2013)). The covariance at each particle is the weighted second moment, around it, of the particles of the 
+    previous generation whose distance is below the threshold of the next generation.
+    """
+    def local_covariances(self, particles, weights, distances=None, epsilon=None):
+        """Compute the optimal local covariance of each particle."""
+        selected = np.ones(len(particles), dtype=bool)
+        if distances is not None and epsilon is not None:
+            selected = np.asarray(distances) < epsilon
+            if not np.any(selected):
+                selected = np.ones(len(particles), dtype=bool)
+        selected_particles, selected_weights = particles[selected], weights[selected] / weights[selected].sum()
+        mean = selected_weights @ selected_particles
+        centered = selected_particles - mean
+        # Second moment around each particle = covariance of selected particles + squared offset of the particle
+        cov = np.einsum("k,kp,kq->pq", selected_weights, centered, centered)
+        offsets = mean[None, :] - particles
+        return cov[None, :, :] + np.einsum("np,nq->npq", offsets, offsets)
+
+
+class NearestNeighboursScreening:
+    """
+    Surrogate pre-screening of ABC-SMC proposals. Before each generation, a k-nearest-neighbours classifier is 
+    fitted on all (parameters, distance) pairs simulated so far, and each proposal is simulated only with its 
+    predicted probability of acceptance (floored at `min_probability`). The importance weights of accepted 
+    particles are divided by this probability, so that the target distribution is unchanged.
+
+    Attributes:
+        n_neighbours (int): Number of neighbours used to predict the probability of acceptance. Default is 20.
+        min_probability (float): Minimum probability of simulating a proposal. It bounds the importance weights, 
+            and regions wrongly predicted as rejected are still explored. Default is 0.05.
+    """
+    def __init__(self, n_neighbours: int = 20, min_probability: float = 0.05):
+        if n_neighbours < 1:
+            raise ValueError("The number of neighbours must be at least 1.")
+        if not 0 < min_probability <= 1:
+            raise ValueError("The minimum probability must be in (0, 1].")
+        self.n_neighbours = n_neighbours
+        self.min_probability = min_probability
+        self.tree = None
+        self.scale = None
+        self.accepted = None
+
+    def update(self, parameters: np.ndarray, distances: np.ndarray, epsilon: float) -> None:
+        """
+        Fit the classifier on simulated parameters, labelled as accepted if their distance is below epsilon. 
+        Screening is disabled until at least `n_neighbours` simulations are available.
+
+        Args:
+            parameters (np.ndarray): Simulated parameters, of shape (n_simulations, n_parameters)
+            distances (np.ndarray): Distances of the simulations, of shape (n_simulations,)
+            epsilon (float): Acceptance threshold of the next generation
+        """
+        if len(parameters) < self.n_neighbours:
+            self.tree = None
+            return
+        scale = parameters.std(axis=0)
+        self.scale = np.where(scale > 0, scale, 1)
+        self.tree = cKDTree(parameters / self.scale)
+        self.accepted = np.asarray(distances) < epsilon
+
+    def acceptance_probability(self, x: np.ndarray) -> np.ndarray:
+        """
+        Probability of simulating each proposal, i.e. the smoothed fraction of its nearest simulated neighbours 
+        that were accepted, floored at `min_probability`.
+
+        Args:
+            x (np.ndarray): Proposals, of shape (n, n_parameters)
+
+        Returns:
+            np.ndarray: Probabilities of shape (n,)
+        """
+        if self.tree is None:
+            return np.ones(len(x))
+        _, neighbours = self.tree.query(x / self.scale, k=self.n_neighbours)
+        n_accepted = self.accepted[neighbours.reshape(len(x), self.n_neighbours)].sum(axis=1)
+        return np.maximum((n_accepted + 1) / (self.n_neighbours + 2), self.min_probability)
+
+
+def _batched_cholesky(covs: np.ndarray) -> np.ndarray:
+    """
+    Cholesky factors of a stack of covariance matrices, with a jitter added to degenerate matrices.
+    """
+    n_parameters = covs.shape[-1]
+    scale = np.maximum(np.trace(covs, axis1=-2, axis2=-1) / n_parameters, 1e-12)
+    jitter = 1e-12
+    while True:
+        try:
+            return np.linalg.cholesky(covs + (jitter * scale)[:, None, None] * np.eye(n_parameters))
+        except np.linalg.LinAlgError:
+            jitter *= 100
+
+
+def sample_prior(priors, param_names, random_state=None):
     """Samples a parameter set from the given prior distributions.
     priors: dictionary mapping parameter names to scipy.stats distributions
     param_names: list of parameter names to maintain consistent order
+    random_state: optional numpy Generator (or seed) used to draw the samples
     Returns: list of sampled parameter values in the order of param_names
     """
-    return [priors[param].rvs() for param in param_names]
+    return [priors[param].rvs(random_state=random_state) for param in param_names]
+
+
+class PriorSampler:
+    """
+    Draws parameter sets from prior distributions in buffered blocks.
+
+    Each refill draws a block of samples per parameter with a single `rvs(size=n, random_state=rng)` call, 
+    which amortizes the fixed overhead of scipy.stats sampling. Samples are then handed out from the buffer 
+    in order, so the sequence of samples does not depend on how many are requested at a time. Samples are 
+    stored as floats, including those of discrete priors.
+
+    Attributes:
+        priors (Dict[str, Any]): Dictionary mapping parameter names to scipy.stats distributions
+        param_names (List[str]): Parameter names, defining the column order of samples
+        random_state (np.random.Generator, optional): Generator used to draw the samples. Default is None 
+            (the global numpy random state)
+        buffer_size (int): Number of samples drawn per refill. Default is 1024
+    """
+    def __init__(self, 
+                 priors: Dict[str, Any], 
+                 param_names: List[str], 
+                 random_state: Optional[np.random.Generator] = None, 
+                 buffer_size: int = 1024):
+        if buffer_size < 1:
+            raise ValueError("The buffer size must be at least 1.")
+        self.priors = priors
+        self.param_names = param_names
+        self.random_state = random_state
+        self.buffer_size = buffer_size
+        self._buffer = np.empty((0, len(param_names)))
+        self._position = 0
+
+    def sample(self, n: int = 1) -> np.ndarray:
+        """
+        Returns the next n parameter sets.
+
+        Args:
+            n (int): Number of parameter sets. Default is 1.
+
+        Returns:
+            np.ndarray: Array of shape (n, n_parameters), with columns ordered as param_names
+        """
+        blocks, n_missing = [], n
+        while n_missing > 0:
+            if self._position == len(self._buffer):
+                self._refill()
+            block = self._buffer[self._position:self._position + n_missing]
+            self._position += len(block)
+            n_missing -= len(block)
+            blocks.append(block)
+        return np.concatenate(blocks) if blocks else np.empty((0, len(self.param_names)))
+
+    def _refill(self) -> None:
+        """Draw a new block of samples from the priors."""
+        self._buffer = np.column_stack([
+            np.asarray(self.priors[param].rvs(size=self.buffer_size, random_state=self.random_state), dtype=float)
+            for param in self.param_names
+        ]).reshape(self.buffer_size, len(self.param_names))
+        self._position = 0
 
 
 def compute_effective_sample_size(weights: np.ndarray) -> float:
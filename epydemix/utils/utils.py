@@ -65,6 +65,10 @@ def resize_parameter(
     """
     Resizes the input value to have the shape (T, n_age).
 
+    The resized array is a read-only broadcast view of the input value, so that scalars and parameters that vary 
+    only over time or only over demographic groups are not materialized into full (T, n_age) arrays. 
+    Use `np.array` to obtain a writable copy.
+
     Args:
         value (Union[np.ndarray, int, float]): The value to be resized, which can be a NumPy array or a scalar.
         T (int): The length of the first dimension.
@@ -74,19 +78,61 @@ def resize_parameter(
         np.ndarray: A 2D array with shape (T, n_age).
     """ 
     if is_scalar(value): # Scalar value
-        return np.full((T, n_age), value)
+        return np.broadcast_to(np.asarray(value), (T, n_age))
 
     value = np.array(value)
 
     if value.ndim == 1:  # 1D array
-        return np.tile(value, (n_age, 1)).T
+        return np.broadcast_to(value[:, np.newaxis], (len(value), n_age))
 
     elif value.ndim == 2:  # 2D array
         if value.shape[0] == 1:  # If the first dimension is 1, repeat it to match T
-            return np.tile(value, (T, 1))
+            return np.broadcast_to(value, (T, n_age))
         return value
+
+
+def compact_parameter(value: np.ndarray) -> np.ndarray:
+    """
+    Returns the compact representation of a parameter array, collapsing to length 1 the dimensions 
+    along which the array is a broadcast view. 
+
+    The compact array broadcasts back to the shape of the input value.
+
+    Args:
+        value (np.ndarray): The parameter array, possibly a broadcast view.
+
+    Returns:
+        np.ndarray: A view of the input value without broadcast dimensions.
+    """
+    value = np.asarray(value)
+    index = tuple(slice(0, 1) if stride == 0 and dim > 1 else slice(None) 
+                  for stride, dim in zip(value.strides, value.shape))
+    return value[index]
     
 
+def stack_parameters(values: List[np.ndarray], repeats: int = 1) -> np.ndarray:
+    """
+    Stacks parameter arrays along a new batch axis, after the time axis.
+
+    The stacked array is a read-only broadcast view: only the dimensions along which the parameters vary 
+    are materialized (see `compact_parameter`).
+
+    Args:
+        values (List[np.ndarray]): The parameter arrays, of shape (T, n_age) or longer along the time axis.
+        repeats (int, optional): The number of times each parameter is repeated along the batch axis. Defaults to 1.
+
+    Returns:
+        np.ndarray: A 3D array with shape (T, len(values) * repeats, n_age), where T is the shortest time axis.
+    """
+    T = min(value.shape[0] for value in values)
+    n_age = values[0].shape[1]
+    compact = [compact_parameter(value[:T]) for value in values]
+    T_compact = max(value.shape[0] for value in compact)
+    n_age_compact = max(value.shape[1] for value in compact)
+    stacked = np.stack([np.broadcast_to(value, (T_compact, n_age_compact)) for value in compact], axis=1)
+    return np.broadcast_to(np.repeat(stacked, repeats, axis=1), (T, len(values) * repeats, n_age))
+
+
 def create_definitions(
         parameters: Dict[str, Any],
         T: int,
@@ -101,7 +147,8 @@ def create_definitions(
         n_age (int): The length of the second dimension of the arrays to be created.
 
     Returns:
-        Dict[str, np.ndarray]: A dictionary where keys are the same as in `parameters` and values are 2D arrays of shape `(T, n_age)`.
+        Dict[str, np.ndarray]: A dictionary where keys are the same as in `parameters` and values are 2D arrays of shape `(T, n_age)`. 
+            Arrays are read-only broadcast views of the parameters (see `resize_parameter`).
 
     Raises:
         ValueError: If any parameter value does not meet the required shape criteria.
@@ -166,10 +213,49 @@ def str_to_date(date_str: str) -> datetime.date:
     return datetime.datetime.strptime(date_str, "%Y-%m-%d").date()
 
 
+def compile_overrides(
+        overrides: Dict[str, List[Dict[str, Any]]],
+        dates: List[datetime.date],
+        n_age: int
+    ) -> Dict[str, List[Tuple[int, int, np.ndarray]]]:
+    """
+    Compiles parameter overrides into integer index ranges over the simulation dates.
+
+    Args:
+        overrides (dict): A dictionary where keys are parameter names and values are lists of override
+                          specifications (see `apply_overrides`).
+        dates (list): The simulation dates, sorted in increasing order.
+        n_age (int): The number of demographic groups.
+
+    Returns:
+        dict: A dictionary where keys are parameter names and values are lists of `(start, stop, value)` tuples, 
+              where `value` is the override value resized to shape `(stop - start, n_age)`.
+
+    Raises:
+        ValueError: If the `override` values do not match the expected shape for the specified date ranges.
+    """
+    dates = np.asarray(dates, dtype="datetime64[ns]")
+    
+    compiled = {}
+    for name, parameter_overrides in overrides.items():
+        compiled[name] = []
+        for override in parameter_overrides:
+            start = int(np.searchsorted(dates, pd.Timestamp(override["start_date"]).to_datetime64(), side="left"))
+            stop = int(np.searchsorted(dates, pd.Timestamp(override["end_date"]).to_datetime64(), side="right"))
+            stop = max(start, stop)
+
+            # validate and resize override value
+            validate_parameter_shape(name, override["value"], T=stop - start, n_age=n_age)
+            compiled[name].append((start, stop, resize_parameter(override["value"], T=stop - start, n_age=n_age)))
+
+    return compiled
+
+
 def apply_overrides(
         definitions: Dict[str, np.ndarray],
         overrides: Dict[str, List[Dict[str, Any]]],
-        dates: List[datetime.date]
+        dates: List[datetime.date],
+        compiled_overrides: Optional[Dict[str, List[Tuple[int, int, np.ndarray]]]] = None
     ) -> Dict[str, np.ndarray]:
     """
     Applies parameter overrides to the definitions based on the specified date ranges.
@@ -183,9 +269,12 @@ def apply_overrides(
                           - 'end_date' (str): The end date of the override period in 'YYYY-MM-DD' format.
                           - 'value' (np.ndarray or scalar): The value to override within the specified date range.
         dates (list): A list of `datetime.date` objects corresponding to the time steps in the definitions arrays.
+        compiled_overrides (dict, optional): The overrides already compiled with `compile_overrides` for these dates. 
+                          If None, overrides are compiled from `overrides`.
 
     Returns:
         dict: A dictionary with the same keys as `definitions`, but with values updated according to the overrides.
+              Definitions are not modified in place.
 
     Raises:
         ValueError: If the `override` values do not match the expected shape for the specified date ranges.
@@ -193,36 +282,21 @@ def apply_overrides(
     if not overrides:
         return definitions
     
+    if compiled_overrides is None:
+        n_age = next(iter(definitions.values())).shape[1] if definitions else 0
+        compiled_overrides = compile_overrides(
+            {name: parameter_overrides for name, parameter_overrides in overrides.items() if name in definitions}, 
+            dates, n_age)
+    
     result = definitions.copy()
     
-    for name, overrides in overrides.items():
-        if name not in definitions:
+    for name, parameter_overrides in compiled_overrides.items():
+        if name not in definitions or not parameter_overrides:
             continue
-        #values = definitions[name]
-        for override in overrides:
-            #start_date = str_to_date(override["start_date"])
-            #end_date = str_to_date(override["end_date"])
-            start_date = pd.Timestamp(override["start_date"])
-            end_date = pd.Timestamp(override["end_date"])
-            override_value = override["value"]
-
-            # Convert dates to pandas timestamps for comparison
-            dates_pd = pd.DatetimeIndex(dates)
-
-            # validate override value
-            T = sum((dates_pd >= start_date) & (dates_pd <= end_date))
-            n_age = definitions[name].shape[1]
-            validate_parameter_shape(name, override_value, T=T, n_age=n_age)
-
-            # resize override value
-            override_array = resize_parameter(override_value, T=T, n_age=n_age)
-
-            # override
-            #override_idxs = [i for i, date in enumerate(dates) if start_date <= date.date() <= end_date]
-            #values[override_idxs] = override_value
-            # Apply override
-            mask = (dates_pd >= start_date) & (dates_pd <= end_date)
-            result[name][mask] = override_array
+        # Materialize the parameter (definitions may be read-only broadcast views)
+        result[name] = np.array(definitions[name])
+        for start, stop, value in parameter_overrides:
+            result[name][start:stop] = value
 
     return result
 
@@ -278,7 +352,7 @@ def evaluate(expr: str, env: dict) -> any:
                        operation or an undefined variable.
     """
     eval_model = base_eval_model
-    eval_model.nodes.extend(['Mult', 'Pow'])
+    eval_model.nodes.extend([node for node in ['Mult', 'Pow'] if node not in eval_model.nodes])
     return Expr(expr, model=eval_model).eval(env)
 
 
@@ -4,6 +4,8 @@ import seaborn as sns
 import pandas as pd
 from typing import List, Optional, Union, Any, Tuple, Dict
 import matplotlib.dates as mdates
+from ..model.reproduction_number import spectral_radius
+from ..utils.utils import compute_simulation_dates
 
 
 def get_black_to_grey(n):
@@ -671,10 +673,15 @@ def plot_spectral_radius(epimodel: Any,
                         xlabel: str = "Date",
                         grid: bool = True,
                         alpha: float = 0.2,
-                        legend_loc: str = "upper left") -> plt.Axes:
+                        legend_loc: str = "upper left",
+                        start_date: Optional[Union[str, pd.Timestamp]] = None,
+                        end_date: Optional[Union[str, pd.Timestamp]] = None) -> plt.Axes:
     """
     Plots the spectral radius of the contact matrices over time.
 
+    Contact matrices are computed with interventions over the dates from `start_date` to `end_date` if provided, 
+    otherwise those stored by `EpiModel.compute_contact_reductions` are used. Simulations do not store them.
+
     Args:
         epimodel: The EpiModel object containing contact matrices and interventions
         ax: Matplotlib axes to plot on. Creates new figure if None
@@ -693,6 +700,8 @@ def plot_spectral_radius(epimodel: Any,
         grid: Whether to show grid lines
         alpha: Transparency for intervention highlights
         legend_loc: Location of the legend
+        start_date: Start date of the contact matrices to compute. If None, uses the stored contact matrices
+        end_date: End date of the contact matrices to compute. If None, uses the stored contact matrices
 
     Returns:
         plt.Axes: The matplotlib axes object
@@ -700,8 +709,15 @@ def plot_spectral_radius(epimodel: Any,
     Raises:
         ValueError: If no contact matrices are defined or layer doesn't exist
     """
-    if len(epimodel.Cs) == 0:
-        raise ValueError("No contact matrices defined over time")
+    if (start_date is None) != (end_date is None):
+        raise ValueError("Both start_date and end_date must be provided to compute the contact matrices.")
+    if start_date is not None:
+        contact_matrices = epimodel.compute_contact_matrices(compute_simulation_dates(start_date, end_date))
+    else:
+        contact_matrices = epimodel.Cs
+    if len(contact_matrices) == 0:
+        raise ValueError("No contact matrices defined over time. Provide start_date and end_date, "
+                         "or call compute_contact_reductions on the model.")
     
     if layer not in epimodel.population.layers + ["overall"]:
         raise ValueError(f"Layer '{layer}' not found. Available layers: {epimodel.population.layers + ['overall']}")
@@ -710,9 +726,14 @@ def plot_spectral_radius(epimodel: Any,
     if ax is None:
         _, ax = plt.subplots(figsize=(10, 6), dpi=300)
 
-    # Compute spectral radius
-    dates = list(epimodel.Cs.keys())
-    rho = [np.linalg.eigvals(epimodel.Cs[date][layer]).max().real for date in dates]
+    # Compute spectral radius, once per distinct contact matrix (dates without interventions share their matrices)
+    dates = list(contact_matrices.keys())
+    radii = {}
+    for date in dates:
+        matrix = contact_matrices[date][layer]
+        if id(matrix) not in radii:
+            radii[id(matrix)] = spectral_radius(matrix)
+    rho = [radii[id(contact_matrices[date][layer])] for date in dates]
     
     # Normalize if requested
     if normalize:
@@ -6,10 +6,20 @@ import pandas as pd
 from datetime import timedelta
 from scipy import stats
 from epydemix.calibration.abc import ABCSampler
+from epydemix.calibration.streaming import StreamingDistance, SimulationAborted
 from epydemix.model.predefined_models import create_sir
 from epydemix.population import Population
 from epydemix.model import simulate
 
+def stochastic_simulation_function(params):
+    """Noisy exponential decay, defined at module level so that it can be run in worker processes"""
+    t = np.arange(10)
+    return {"data": 100 * np.exp(-params["beta"] * params["gamma"] * t) + np.random.normal(0, 1, size=10)}
+
+def simulate_infected(params):
+    """Simulation of the total number of infected, forwarding the step callback of streaming distances"""
+    return {"data": simulate(**params).compartments["Infected_total"]}
+
 @pytest.fixture
 def mock_simulation_function():
     """Fixture providing a simple mock simulation function"""
@@ -170,4 +180,345 @@ def test_abc_runtime_limits(basic_abc_sampler):
         total_simulations_budget=100,
         verbose=False
     )
-    assert len(results.posterior_distributions) > 0 
\ No newline at end of file
+    assert len(results.posterior_distributions) > 0 
+
+def test_abc_parallel_reproducibility():
+    """Test that calibrations with a fixed seed do not depend on the number of workers"""
+    from concurrent.futures import ProcessPoolExecutor
+    priors = {"beta": stats.uniform(0.1, 0.5), "gamma": stats.uniform(0.05, 0.2)}
+    observed_data = np.array([90, 82, 75, 68, 62, 57, 52, 48, 44, 40])
+
+    def calibrate(strategy, **kwargs):
+        sampler = ABCSampler(simulation_function=stochastic_simulation_function, priors=priors, parameters={}, 
+                             observed_data=observed_data, seed=42, **kwargs)
+        if strategy == "smc":
+            return sampler.calibrate(strategy="smc", num_particles=20, num_generations=3, verbose=False)
+        return sampler.calibrate(strategy="rejection", epsilon=20., num_particles=20, verbose=False)
+
+    for strategy in ["smc", "rejection"]:
+        sequential = calibrate(strategy)
+        with ProcessPoolExecutor(max_workers=3) as executor:
+            pooled = calibrate(strategy, executor=executor, batch_size=4, max_pending=6)
+        processes = calibrate(strategy, workers=2, batch_size=3)
+        for results in [pooled, processes]:
+            for gen in sequential.posterior_distributions:
+                pd.testing.assert_frame_equal(results.posterior_distributions[gen], sequential.posterior_distributions[gen])
+                np.testing.assert_array_equal(results.distances[gen], sequential.distances[gen])
+                np.testing.assert_array_equal(results.weights[gen], sequential.weights[gen])
+
+    with pytest.raises(ValueError):
+        ABCSampler(simulation_function=stochastic_simulation_function, priors=priors, parameters={}, 
+                   observed_data=observed_data, workers=0)
+
+    # Early stops are checked before proposals are submitted, so simulation budgets are exact
+    from concurrent.futures import ThreadPoolExecutor
+    sampler = ABCSampler(simulation_function=stochastic_simulation_function, priors=priors, parameters={}, 
+                         observed_data=observed_data, seed=0, batch_size=4)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        for pool in [None, executor]:
+            run = sampler._run_proposals(sampler._sample_parameters, lambda distance: False, 1000, 
+                                         executor=pool, stop=lambda n_simulations: n_simulations >= 25)
+            assert run["n_simulations"] == len(run["simulated_distances"]) == 25
+
+def test_abc_smc_weights(basic_abc_sampler):
+    """Test vectorized importance weights against the direct formula"""
+    from epydemix.utils import DefaultPerturbationContinuous, DefaultPerturbationDiscrete, ComponentwisePerturbation
+    priors = {"beta": stats.uniform(0.1, 0.5), "n": stats.randint(1, 6)}
+    sampler = ABCSampler(simulation_function=stochastic_simulation_function, priors=priors, parameters={}, 
+                         observed_data=np.zeros(10), seed=0)
+    rng = np.random.default_rng(0)
+    particles = np.column_stack([rng.uniform(0.1, 0.6, 30), rng.integers(1, 6, 30)])
+    new_particles = np.column_stack([rng.uniform(0.1, 0.6, 20), rng.integers(1, 6, 20)])
+    weights = rng.uniform(size=30)
+    kernels = [DefaultPerturbationContinuous("beta"), DefaultPerturbationDiscrete("n", priors["n"])]
+    kernels[0].update(particles, weights, ["beta", "n"])
+
+    expected = np.array([
+        priors["beta"].pdf(x[0]) * priors["n"].pmf(x[1]) / 
+        np.sum([w * kernels[0].pdf(x[0], p[0]) * kernels[1].pdf(x[1], p[1]) for p, w in zip(particles, weights)])
+        for x in new_particles
+    ])
+    np.testing.assert_allclose(sampler._compute_weights(new_particles, particles, weights, ComponentwisePerturbation(kernels)), 
+                               expected / expected.sum())
+
+    # Screened proposals are reweighted by the inverse probability of passing the screening
+    probabilities = rng.uniform(0.1, 1, size=20)
+    expected /= probabilities
+    np.testing.assert_allclose(sampler._compute_weights(new_particles, particles, weights, ComponentwisePerturbation(kernels), 
+                                                        screening_probabilities=probabilities), 
+                               expected / expected.sum())
+
+def test_perturbation_propose_batch():
+    """Test vectorized proposals of perturbation kernels"""
+    from epydemix.utils import DefaultPerturbationContinuous, DefaultPerturbationDiscrete, Perturbation
+    rng = np.random.default_rng(0)
+    kernel = DefaultPerturbationDiscrete("n", stats.randint(1, 6), jump_probability=0.5)
+    proposed = kernel.propose_batch(np.full(10000, 3.), rng=rng)
+    values, counts = np.unique(proposed, return_counts=True)
+    np.testing.assert_array_equal(values, [1, 2, 3, 4, 5])
+    np.testing.assert_allclose(counts / 10000, [0.125, 0.125, 0.5, 0.125, 0.125], atol=0.02)
+
+    # Unsorted supports are sorted, and single-valued supports never move
+    kernel = DefaultPerturbationDiscrete("n", stats.randint(1, 6), jump_probability=0.5, support=[5, 1, 3])
+    proposed = kernel.propose_batch(np.full(1000, 3.), rng=rng)
+    assert set(proposed) == {1, 3, 5}
+    kernel = DefaultPerturbationDiscrete("n", stats.randint(2, 3))
+    np.testing.assert_array_equal(kernel.propose_batch(np.full(5, 2.), rng=rng), np.full(5, 2.))
+    assert kernel.propose(2., rng=rng) == 2.
+    np.testing.assert_array_equal(kernel.logpdf(np.array([2.]), np.array([2.])), [0.])
+
+    kernel = DefaultPerturbationContinuous("beta")
+    assert kernel.propose_batch(np.zeros(5), rng=rng).shape == (5,)
+
+    # Kernels without a vectorized implementation fall back to elementwise proposals
+    class ShiftPerturbation(Perturbation):
+        def propose(self, x):
+            return x + 1
+        def pdf(self, x, center):
+            return float(x == center + 1)
+        def update(self, particles, weights, param_names):
+            pass
+    np.testing.assert_array_equal(ShiftPerturbation("beta").propose_batch(np.arange(3.), rng=rng), [1., 2., 3.])
+
+def test_abc_discrete_parameters():
+    """Test that parameters with discrete priors are passed to the simulation as integers"""
+    def simulate_discrete(params):
+        assert isinstance(params["n"], int) and isinstance(params["beta"], float)
+        return {"data": np.full(10, params["n"] * params["beta"])}
+
+    sampler = ABCSampler(simulation_function=simulate_discrete, priors={"beta": stats.uniform(0.1, 0.5), "n": stats.randint(1, 6)}, 
+                         parameters={}, observed_data=np.ones(10), seed=0)
+    results = sampler.calibrate(strategy="smc", num_particles=20, num_generations=2, verbose=False)
+    assert set(results.get_posterior_distribution()["n"]) <= {1, 2, 3, 4, 5}
+
+    # Continuous joint kernels would only propose values outside the support of discrete priors
+    from epydemix.utils import MultivariateNormalPerturbation
+    with pytest.raises(ValueError):
+        sampler.calibrate(strategy="smc", num_particles=20, num_generations=2, verbose=False, 
+                          perturbations=MultivariateNormalPerturbation())
+
+    # Stopping conditions are checked even if no candidate is ever proposed
+    calls = []
+    results = sampler._run_proposals(lambda rng, n: np.empty((0, 2)), lambda distance: True, num_particles=1, 
+                                     stop=lambda n_simulations: calls.append(n_simulations) or len(calls) > 3)
+    assert results["n_simulations"] == 0 and len(calls) == 4
+
+def test_prior_sampler():
+    """Test buffered prior sampling"""
+    from epydemix.utils import PriorSampler
+    priors = {"beta": stats.uniform(0.1, 0.5), "n": stats.randint(1, 6)}
+    sampler = PriorSampler(priors, ["beta", "n"], random_state=np.random.default_rng(0), buffer_size=7)
+    samples = np.concatenate([sampler.sample(n) for n in [1, 5, 10, 0, 3]])
+    assert samples.shape == (19, 2)
+    assert np.all((samples[:, 0] >= 0.1) & (samples[:, 0] <= 0.6))
+    assert set(samples[:, 1]) <= {1, 2, 3, 4, 5}
+
+    # The sequence of samples does not depend on the number of samples requested at a time
+    sampler = PriorSampler(priors, ["beta", "n"], random_state=np.random.default_rng(0), buffer_size=7)
+    np.testing.assert_array_equal(sampler.sample(19), samples)
+
+
+def test_multivariate_normal_perturbation():
+    """Test the multivariate normal kernel and its use in ABC-SMC"""
+    from epydemix.utils import MultivariateNormalPerturbation
+    rng = np.random.default_rng(0)
+    particles = rng.multivariate_normal([0.3, 0.1], [[1e-3, 4e-4], [4e-4, 2e-4]], size=2000)
+    weights = rng.uniform(size=2000)
+    kernel = MultivariateNormalPerturbation()
+    with pytest.raises(ValueError):
+        kernel.propose_batch(particles, rng=rng)
+    kernel.update(particles, weights, ["beta", "gamma"])
+    np.testing.assert_allclose(kernel.cov, 2 * np.cov(particles, rowvar=False, aweights=weights))
+
+    # Proposals follow the covariance of the kernel
+    proposed = kernel.propose_batch(np.zeros((20000, 2)), rng=rng)
+    np.testing.assert_allclose(np.cov(proposed, rowvar=False), kernel.cov, rtol=0.05)
+
+    # Log-densities match scipy for each pair of values and centers
+    x, centers = particles[:5], particles[5:8]
+    expected = np.array([[stats.multivariate_normal.logpdf(xi, c, kernel.cov) for c in centers] for xi in x])
+    np.testing.assert_allclose(kernel.logpdf(x, centers), expected)
+
+    sampler = ABCSampler(simulation_function=stochastic_simulation_function, 
+                         priors={"beta": stats.uniform(0.1, 0.5), "gamma": stats.uniform(0.05, 0.2)}, 
+                         parameters={}, observed_data=np.array([90, 82, 75, 68, 62, 57, 52, 48, 44, 40]), seed=1)
+    results = sampler.calibrate(strategy="smc", num_particles=20, num_generations=3, verbose=False,
+                                perturbations=MultivariateNormalPerturbation())
+    final_posterior = results.get_posterior_distribution()
+    assert len(final_posterior) == 20
+    assert np.all((0.1 <= final_posterior["beta"]) & (final_posterior["beta"] <= 0.6))
+    np.testing.assert_allclose(results.weights[2].sum(), 1.)
+
+    with pytest.raises(ValueError):
+        sampler.calibrate(strategy="smc", num_particles=20, num_generations=2, verbose=False, perturbations=[])
+
+@pytest.mark.parametrize("kernel_class", ["KNearestNeighboursPerturbation", "OLCMPerturbation"])
+def test_local_perturbations(kernel_class):
+    """Test locally adaptive kernels and their use in ABC-SMC"""
+    import epydemix.utils as utils
+    rng = np.random.default_rng(0)
+    # Bimodal particles, each mode with its own correlation
+    particles = np.concatenate([rng.multivariate_normal([0.2, 0.1], [[1e-4, 8e-5], [8e-5, 1e-4]], size=100),
+                                rng.multivariate_normal([0.5, 0.2], [[1e-4, -8e-5], [-8e-5, 1e-4]], size=100)])
+    weights, distances = rng.uniform(size=200), rng.uniform(size=200)
+    kernel = getattr(utils, kernel_class)()
+    kernel.update(particles, weights, ["beta", "gamma"], distances=distances, epsilon=0.5)
+    assert kernel.covs.shape == (200, 2, 2)
+    with pytest.raises(ValueError):
+        kernel.propose_batch(particles[:3], rng=rng)
+
+    # Log-densities match scipy with the covariance of each center
+    x = particles[[0, 150]] + 0.01
+    expected = np.array([[stats.multivariate_normal.logpdf(xi, c, cov) for c, cov in zip(particles, kernel.covs)] for xi in x])
+    np.testing.assert_allclose(kernel.logpdf(x, particles), expected, rtol=1e-6)
+
+    # Proposals around a particle follow its covariance
+    proposed = kernel.propose_batch(np.repeat(particles[:1], 20000, axis=0), rng=rng, indices=np.zeros(20000, dtype=int))
+    np.testing.assert_allclose(np.cov(proposed, rowvar=False), kernel.covs[0], rtol=0.1, atol=1e-6)
+    if kernel_class == "KNearestNeighboursPerturbation":
+        # Covariances follow the local correlation of each mode
+        assert kernel.covs[0][0, 1] > 0 and kernel.covs[150][0, 1] < 0
+
+    sampler = ABCSampler(simulation_function=stochastic_simulation_function, 
+                         priors={"beta": stats.uniform(0.1, 0.5), "gamma": stats.uniform(0.05, 0.2)}, 
+                         parameters={}, observed_data=np.array([90, 82, 75, 68, 62, 57, 52, 48, 44, 40]), seed=1)
+    results = sampler.calibrate(strategy="smc", num_particles=20, num_generations=3, verbose=False,
+                                perturbations=getattr(utils, kernel_class)())
+    assert len(results.get_posterior_distribution()) == 20
+    np.testing.assert_allclose(results.weights[2].sum(), 1.)
+
+
+def test_local_covariances():
+    """Test that k-nearest-neighbours kernels use the covariance of the neighbours and OLCM the second moment"""
+    from epydemix.utils import KNearestNeighboursPerturbation, OLCMPerturbation
+    particles = np.column_stack([[0., 1., 2., 3., 10.], np.zeros(5)])
+    weights = np.full(5, 0.2)
+    knn = KNearestNeighboursPerturbation(n_neighbours=3).local_covariances(particles, weights)
+    # Neighbours of the first particle are 0, 1 and 2, with mean 1
+    np.testing.assert_allclose(knn[0], [[2 / 3, 0.], [0., 0.]])
+    olcm = OLCMPerturbation().local_covariances(particles, weights)
+    np.testing.assert_allclose(olcm[0, 0, 0], np.var(particles[:, 0]) + particles[:, 0].mean() ** 2)
+
+
+def test_streaming_distance():
+    """Test early rejection with a streaming distance on a real model"""
+    model = create_sir(transmission_rate=0.3, recovery_rate=0.1)
+    pop = Population()
+    pop.add_population([10000])
+    pop.add_contact_matrix(np.array([[1.0]]))
+    model.set_population(pop)
+    initial_conditions = {"Susceptible": np.array([9900]), "Infected": np.array([100]), "Recovered": np.array([0])}
+    observed = simulate(epimodel=model, start_date="2023-01-01", end_date="2023-01-20", 
+                        initial_conditions_dict=initial_conditions)
+    streaming_distance = StreamingDistance(observed.compartments["Infected_total"], observed.dates, 
+                                           compartment="Infected")
+
+    # The lower bound reached at the end of the simulation is the final distance
+    monitor = streaming_distance.monitor(np.inf)
+    np.random.seed(1)
+    simulated = simulate(epimodel=model, start_date="2023-01-01", end_date="2023-01-20", 
+                         initial_conditions_dict=initial_conditions, transmission_rate=0.4, step_callback=monitor)
+    errors = observed.compartments["Infected_total"] - simulated.compartments["Infected_total"]
+    np.testing.assert_allclose(monitor.errors, errors)
+    assert np.isclose(streaming_distance.lower_bound(np.array(monitor.errors), np.array(monitor.observed)), 
+                      np.sqrt(np.mean(errors ** 2)))
+
+    # Sub-daily steps are aggregated by day, and run_simulations forwards the monitor
+    monitor = streaming_distance.monitor(np.inf)
+    model.run_simulations(Nsim=1, start_date="2023-01-01", end_date="2023-01-20", dt=0.5, resample_frequency=None, 
+                          initial_conditions_dict=initial_conditions, step_callback=monitor)
+    assert monitor.n_steps == 39 and len(monitor.errors) == 19
+
+    with pytest.raises(SimulationAborted):
+        simulate(epimodel=model, start_date="2023-01-01", end_date="2023-01-20", 
+                 initial_conditions_dict=initial_conditions, transmission_rate=0.6, 
+                 step_callback=streaming_distance.monitor(10.))
+
+    with pytest.raises(ValueError):
+        StreamingDistance([1., 2.], ["2023-01-01", "2023-01-02"])
+    with pytest.raises(ValueError):
+        StreamingDistance([1., 2.], ["2023-01-01", "2023-01-02"], compartment="Infected", metric="unknown")
+
+    # Accepted particles do not depend on early rejection
+    def run(streaming):
+        sampler = ABCSampler(
+            simulation_function=simulate_infected,
+            priors={"transmission_rate": stats.uniform(0.1, 0.5), "recovery_rate": stats.uniform(0.05, 0.2)},
+            parameters=dict(epimodel=model, start_date="2023-01-01", end_date="2023-01-20", 
+                            initial_conditions_dict=initial_conditions),
+            observed_data=observed.compartments["Infected_total"],
+            seed=5,
+            streaming_distance=streaming_distance if streaming else None
+        )
+        return sampler.calibrate(strategy="rejection", epsilon=100, num_particles=5, verbose=False)
+
+    results, streamed = run(False), run(True)
+    pd.testing.assert_frame_equal(results.get_posterior_distribution(), streamed.get_posterior_distribution())
+    np.testing.assert_array_equal(results.get_distances(), streamed.get_distances())
+
+    # Simulation functions must forward the monitor
+    sampler = ABCSampler(simulation_function=lambda params: {"data": observed.compartments["Infected_total"]}, 
+                         priors={"transmission_rate": stats.uniform(0.1, 0.5)}, parameters={}, 
+                         observed_data=observed.compartments["Infected_total"], streaming_distance=streaming_distance)
+    with pytest.raises(ValueError, match="step_callback"):
+        sampler.calibrate(strategy="rejection", epsilon=100, num_particles=5, verbose=False)
+
+
+def test_nearest_neighbours_screening(basic_abc_sampler):
+    """Test surrogate pre-screening of ABC-SMC proposals"""
+    from epydemix.utils import NearestNeighboursScreening
+    screening = NearestNeighboursScreening(n_neighbours=10, min_probability=0.1)
+    assert np.all(screening.acceptance_probability(np.zeros((3, 2))) == 1)
+
+    rng = np.random.default_rng(0)
+    parameters = rng.uniform(size=(1000, 2))
+    screening.update(parameters, parameters[:, 0], epsilon=0.5)
+    probabilities = screening.acceptance_probability(np.array([[0.1, 0.5], [0.9, 0.5]]))
+    np.testing.assert_allclose(probabilities, [11 / 12, 0.1])
+
+    with pytest.raises(ValueError):
+        NearestNeighboursScreening(min_probability=0)
+
+    results = basic_abc_sampler.calibrate(strategy="smc", num_particles=50, num_generations=3, 
+                                          screening=NearestNeighboursScreening(), verbose=False)
+    assert len(results.posterior_distributions) == 3
+    weights = np.array(results.get_weights())
+    assert np.all(weights > 0) and np.isclose(weights.sum(), 1)
+
+
+def test_abc_smc_checkpoint(basic_abc_sampler, mock_simulation_function, tmp_path):
+    """Test that a resumed ABC-SMC run continues exactly where it stopped"""
+    def make_sampler():
+        return ABCSampler(simulation_function=mock_simulation_function, priors=basic_abc_sampler.priors, 
+                          parameters={}, observed_data=basic_abc_sampler.observed_data["data"], seed=3)
+
+    kwargs = dict(strategy="smc", num_particles=30, verbose=False)
+    full = make_sampler().calibrate(num_generations=4, **kwargs)
+    make_sampler().calibrate(num_generations=2, checkpoint_dir=str(tmp_path), **kwargs)
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["generation_0.npz", "generation_1.npz"]
+
+    resumed = make_sampler().calibrate(num_generations=4, resume_from=str(tmp_path), **kwargs)
+    assert list(resumed.posterior_distributions) == [0, 1, 2, 3]
+    for gen in range(4):
+        pd.testing.assert_frame_equal(resumed.get_posterior_distribution(gen), full.get_posterior_distribution(gen))
+        np.testing.assert_array_equal(resumed.get_weights(gen), full.get_weights(gen))
+    np.testing.assert_array_equal(resumed.get_selected_trajectories(1)[0]["data"], 
+                                  full.get_selected_trajectories(1)[0]["data"])
+
+    with pytest.raises(ValueError):
+        make_sampler().calibrate(resume_from=str(tmp_path / "missing"), **kwargs)
+
+
+def test_abc_results_not_copied(basic_abc_sampler):
+    """Test that results are returned without copying the calibration history"""
+    results = basic_abc_sampler.calibrate(strategy="rejection", epsilon=100, num_particles=5, verbose=False)
+    assert results is basic_abc_sampler.results
+    assert basic_abc_sampler.calibrate(strategy="rejection", epsilon=100, num_particles=5, verbose=False, 
+                                       copy=True) is not basic_abc_sampler.results
+
+    baseline = basic_abc_sampler.run_projections({}, iterations=3)
+    scenario = basic_abc_sampler.run_projections({}, iterations=2, scenario_id="scenario")
+    assert scenario.selected_trajectories is baseline.selected_trajectories
+    assert list(baseline.projections) == ["baseline"]
+    assert list(scenario.projections) == ["baseline", "scenario"]
+    assert len(scenario.projection_parameters["scenario"]) == 2
@@ -4,7 +4,9 @@ matplotlib.use("Agg")  # Use non-GUI backend before importing pyplot
 import numpy as np
 from datetime import datetime
 from pandas import Timestamp
-from epydemix.model.epimodel import EpiModel, stochastic_simulation
+from epydemix.model.epimodel import EpiModel, stochastic_simulation, simulate, sample_transitions
+from epydemix.model import SimulationStats
+from epydemix.utils import compute_simulation_dates
 from epydemix.population import Population
 
 # filepath: epydemix/tests/test_epimodel.py
@@ -171,4 +173,333 @@ def test_stochastic_simulation_invalid_initial_conditions(mock_epimodel):
             parameters=parameters,
             initial_conditions=initial_conditions,
             dt=dt
-        )
\ No newline at end of file
+        )
+
+def test_sample_transitions():
+    """Test conditional binomial sampling of transitions out of a compartment"""
+    rng = np.random.default_rng(0)
+    current_pop = np.array([[1000, 500]])
+    delta = sample_transitions(current_pop, np.array([[[0.5, 0.2]], [[0.5, 0.3]]]), rng)
+    assert delta.shape == (2, 1, 2)
+    assert delta[:, 0, 0].sum() == 1000
+    assert np.all(delta.sum(axis=0) <= current_pop)
+
+    # Probabilities summing to more than 1 are rejected, up to rounding errors
+    sample_transitions(current_pop, np.array([[[0.7, 0.1]], [[0.3 + 1e-12, 0.1]]]), rng)
+    with pytest.raises(ValueError):
+        sample_transitions(current_pop, np.array([[[0.7, 0.1]], [[0.7, 0.1]]]), rng)
+
+def test_register_transition_kind_modes(basic_model):
+    """Test registration of vectorized and rate transition functions"""
+    def vectorized_probability(params, state, context):
+        return np.full((state.shape[0], state.shape[2]), 0.1)
+
+    def seasonal_rate(params, context):
+        return 0.1 * (1 + np.sin(np.arange(context["T"]))[:, np.newaxis])
+
+    basic_model.register_transition_kind("vectorized_kind", vectorized_probability, mode="vectorized")
+    basic_model.register_transition_kind("rate_kind", seasonal_rate, mode="rate")
+    assert basic_model.transition_function_modes["vectorized_kind"] == "vectorized"
+    assert basic_model.transition_function_modes["rate_kind"] == "rate"
+
+    # Signature must match the mode
+    with pytest.raises(ValueError):
+        basic_model.register_transition_kind("invalid", vectorized_probability)
+    with pytest.raises(ValueError):
+        basic_model.register_transition_kind("invalid", seasonal_rate, mode="vectorized")
+    with pytest.raises(ValueError):
+        basic_model.register_transition_kind("invalid", seasonal_rate, mode="unknown")
+
+def test_stochastic_simulation_custom_kinds(mock_epimodel):
+    """Test simulation with vectorized and rate transition kinds on a batch of replicates"""
+    def waning_rate(params, context):
+        return np.linspace(0, 0.2, context["T"])
+
+    def vectorized_probability(params, state, context):
+        return 1 - np.exp(-params * context["dt"]) * np.ones((state.shape[0], 1))
+
+    mock_epimodel.register_transition_kind("waning", waning_rate, mode="rate")
+    mock_epimodel.register_transition_kind("vectorized_recovery", vectorized_probability, mode="vectorized")
+    mock_epimodel.add_transition("Recovered", "Susceptible", "waning", None)
+    mock_epimodel.add_transition("Infected", "Recovered", "vectorized_recovery", 0.05)
+
+    T, R = 10, 4
+    contact_matrices = [{"overall": mock_epimodel.population.contact_matrices["all"]} for _ in range(T)]
+    initial_conditions = np.tile(np.array([[990, 990, 990], [10, 10, 10], [0, 0, 0]]), (R, 1, 1))
+    parameters = {"transmission_rate": np.full(T, 0.3), "recovery_rate": np.full(T, 0.1)}
+
+    compartments_evolution, transitions_evolution = stochastic_simulation(
+        T=T,
+        contact_matrices=contact_matrices,
+        epimodel=mock_epimodel,
+        parameters=parameters,
+        initial_conditions=initial_conditions,
+        dt=1.0
+    )
+
+    assert compartments_evolution.shape == (T, R, 3, 3)
+    assert transitions_evolution.shape == (T, R, mock_epimodel.n_transitions, 3)
+    assert np.allclose(compartments_evolution.sum(axis=(2, 3)), initial_conditions.sum(axis=(1, 2)))
+    assert np.all(compartments_evolution >= 0)
+
+def test_compiled_overrides(mock_epimodel):
+    """Test that overrides are compiled per run and reflect changes to overrides"""
+    mock_epimodel.override_parameter("2020-01-05", "2020-01-10", "transmission_rate", 0.1)
+    dates = compute_simulation_dates("2020-01-01", "2020-01-31")
+    compiled = mock_epimodel.get_compiled_overrides(dates)
+    assert compiled["transmission_rate"][0][:2] == (4, 10)
+
+    mock_epimodel.override_parameter("2020-01-20", "2020-01-25", "transmission_rate", 0.2)
+    compiled = mock_epimodel.get_compiled_overrides(dates)
+    assert len(compiled["transmission_rate"]) == 2
+
+    trajectory = simulate(mock_epimodel, start_date="2020-01-01", end_date="2020-01-31")
+    assert np.allclose(trajectory.parameters["transmission_rate"][4:10], 0.1)
+    assert np.allclose(trajectory.parameters["transmission_rate"][19:25], 0.2)
+    assert np.allclose(trajectory.parameters["transmission_rate"][10:19], 0.3)
+
+    # Overrides modified in place are applied by the next run
+    mock_epimodel.overrides["transmission_rate"][0]["value"] = 0.05
+    results = mock_epimodel.run_simulations(Nsim=2, start_date="2020-01-01", end_date="2020-01-31", workers=2)
+    assert all(np.allclose(trajectory.parameters["transmission_rate"][4:10], 0.05) for trajectory in results.trajectories)
+
+def test_simulation_profiling(mock_epimodel):
+    """Test per-phase profiling of simulations"""
+    results = mock_epimodel.run_simulations(start_date="2020-01-01", end_date="2020-01-31", Nsim=3, profile=True)
+    df_stats = results.stats.to_dataframe()
+    assert results.stats.n_runs == 3
+    for phase in ["dates", "contact_reductions", "definitions", "initial_conditions", "step_loop", 
+                  "step_loop:mediated", "step_loop:spontaneous", "step_loop:sampling", "format_output"]:
+        assert phase in df_stats.index
+    assert df_stats.loc["step_loop", "calls"] == 3
+    assert df_stats.loc["step_loop", "allocated_bytes"] > 0
+
+    # Statistics can be accumulated and combined across runs
+    stats = SimulationStats(track_memory=False)
+    simulate(mock_epimodel, start_date="2020-01-01", end_date="2020-01-31", stats=stats)
+    combined = stats + results.stats
+    assert combined.n_runs == 4
+    assert combined.phases["step_loop"].calls == 4
+    assert stats.phases["step_loop"].allocated_bytes == 0
+
+
+def test_simulation_checkpoint(mock_epimodel):
+    """Test that resuming from a checkpoint continues the original simulation"""
+    n_days = len(compute_simulation_dates("2020-01-01", "2020-03-01"))
+    mock_epimodel.add_parameter("transmission_rate", np.linspace(0.2, 0.4, n_days))
+    mock_epimodel.override_parameter("2020-02-01", "2020-02-10", "recovery_rate", 0.2)
+    initial_conditions = {"Susceptible": np.array([990, 990, 990]), "Infected": np.array([10, 10, 10])}
+
+    np.random.seed(0)
+    full = simulate(mock_epimodel, start_date="2020-01-01", end_date="2020-03-01", initial_conditions_dict=initial_conditions)
+
+    np.random.seed(0)
+    prefix = simulate(mock_epimodel, start_date="2020-01-01", end_date="2020-01-20", 
+                      initial_conditions_dict=initial_conditions, return_checkpoint=True)
+    checkpoint = prefix.checkpoint
+    assert checkpoint.step == 20
+    assert checkpoint.date == Timestamp("2020-01-20")
+    np.random.seed(1)
+    resumed = simulate(mock_epimodel, end_date="2020-03-01", checkpoint=checkpoint)
+
+    assert resumed.dates[0] == Timestamp("2020-01-21")
+    assert list(resumed.dates) == list(full.dates[20:])
+    for name, values in full.compartments.items():
+        np.testing.assert_array_equal(resumed.compartments[name], values[20:])
+
+    # Incompatible checkpoints are rejected
+    with pytest.raises(ValueError):
+        simulate(mock_epimodel, end_date="2020-01-10", checkpoint=checkpoint)
+    with pytest.raises(ValueError):
+        simulate(mock_epimodel, end_date="2020-03-01", checkpoint=checkpoint, dt=0.5)
+
+    # Replicates branched from checkpoints start from their state
+    results = mock_epimodel.run_simulations(end_date="2020-03-01", checkpoints=[checkpoint], Nsim=3)
+    for trajectory in results.trajectories:
+        assert trajectory.dates[0] == Timestamp("2020-01-21")
+
+
+def test_checkpoint_overrides_in_ensembles(mock_epimodel):
+    """Test that ensembles resumed from checkpoints apply overrides on the time axis of the checkpoint"""
+    mock_epimodel.override_parameter("2021-02-01", "2021-02-10", "recovery_rate", 0.9)
+    initial_conditions = {"Susceptible": np.array([990, 990, 990]), "Infected": np.array([10, 10, 10])}
+    checkpoint = simulate(mock_epimodel, start_date="2021-01-01", end_date="2021-01-20", 
+                          initial_conditions_dict=initial_conditions, return_checkpoint=True).checkpoint
+
+    np.random.seed(1)
+    expected = simulate(mock_epimodel, end_date="2021-03-01", checkpoint=checkpoint, restore_random_state=False)
+    np.random.seed(1)
+    results = mock_epimodel.run_simulations(Nsim=1, end_date="2021-03-01", checkpoints=[checkpoint])
+    np.random.seed(1)
+    resumed = next(mock_epimodel.iter_simulations(Nsim=1, end_date="2021-03-01", checkpoints=[checkpoint]))
+    for trajectory in [results.trajectories[0], resumed]:
+        assert list(trajectory.dates) == list(expected.dates)
+        for name, values in expected.compartments.items():
+            np.testing.assert_array_equal(trajectory.compartments[name], values)
+
+def test_common_random_numbers(mock_epimodel):
+    """Test that simulations with the same random streams are reproducible and independent of the global state"""
+    from epydemix.model import RandomStreams
+    initial_conditions = {"Susceptible": np.array([990, 990, 990]), "Infected": np.array([10, 10, 10])}
+    kwargs = dict(start_date="2020-01-01", end_date="2020-03-01", initial_conditions_dict=initial_conditions)
+
+    np.random.seed(0)
+    first = simulate(mock_epimodel, random_streams=RandomStreams(seed=7, replicate=0), **kwargs)
+    np.random.seed(1)
+    second = simulate(mock_epimodel, random_streams=RandomStreams(seed=7, replicate=0), **kwargs)
+    other = simulate(mock_epimodel, random_streams=RandomStreams(seed=7, replicate=1), **kwargs)
+    np.testing.assert_array_equal(first.compartments["Infected_total"], second.compartments["Infected_total"])
+    assert not np.array_equal(first.compartments["Infected_total"], other.compartments["Infected_total"])
+
+    # Streams are addressed by absolute step, so resumed runs continue the original one
+    prefix = simulate(mock_epimodel, random_streams=RandomStreams(7), return_checkpoint=True, 
+                      start_date="2020-01-01", end_date="2020-01-20", initial_conditions_dict=initial_conditions)
+    resumed = simulate(mock_epimodel, end_date="2020-03-01", checkpoint=prefix.checkpoint, 
+                       restore_random_state=False, random_streams=RandomStreams(7))
+    np.testing.assert_array_equal(resumed.compartments["Infected_total"], first.compartments["Infected_total"][20:])
+
+    results = mock_epimodel.run_simulations(Nsim=2, crn_seed=7, **kwargs)
+    np.testing.assert_array_equal(results.trajectories[0].compartments["Infected_total"], first.compartments["Infected_total"])
+    np.testing.assert_array_equal(results.trajectories[1].compartments["Infected_total"], other.compartments["Infected_total"])
+
+
+def test_simulate_does_not_mutate_model(mock_epimodel):
+    """Test that simulations leave the model unchanged and can run concurrently"""
+    mock_epimodel.add_intervention(layer_name="all", start_date="2020-01-10", end_date="2020-01-20", reduction_factor=0.5)
+    initial_conditions = {"Susceptible": np.array([990, 990, 990]), "Infected": np.array([10, 10, 10])}
+    kwargs = dict(start_date="2020-01-01", end_date="2020-03-01", initial_conditions_dict=initial_conditions)
+
+    simulate(mock_epimodel, **kwargs)
+    assert mock_epimodel.Cs == {}
+    assert mock_epimodel.definitions == {}
+
+    # Contact matrices are shared by dates with the same contacts
+    dates = compute_simulation_dates("2020-01-01", "2020-01-31")
+    contact_matrices = mock_epimodel.compute_contact_matrices(dates)
+    assert contact_matrices[dates[0]] is contact_matrices[dates[-1]]
+    np.testing.assert_array_equal(contact_matrices[dates[12]]["overall"], 0.5 * contact_matrices[dates[0]]["overall"])
+    np.testing.assert_array_equal(mock_epimodel.population.contact_matrices["all"], np.ones((3, 3)))
+
+    # Thread-pool simulations are reproducible
+    np.random.seed(0)
+    first = mock_epimodel.run_simulations(Nsim=8, workers=4, **kwargs)
+    np.random.seed(0)
+    second = mock_epimodel.run_simulations(Nsim=8, workers=2, **kwargs)
+    np.testing.assert_array_equal(first.get_stacked_compartments()["Infected_total"], 
+                                  second.get_stacked_compartments()["Infected_total"])
+
+
+def test_async_simulations(mock_epimodel):
+    """Test running simulations inside an event loop"""
+    import asyncio
+    from concurrent.futures import ThreadPoolExecutor
+    kwargs = dict(start_date="2020-01-01", end_date="2020-02-01", 
+                  initial_conditions_dict={"Susceptible": np.array([990, 990, 990]), "Infected": np.array([10, 10, 10])})
+
+    async def collect(**options):
+        np.random.seed(0)
+        return await mock_epimodel.arun_simulations(Nsim=7, **options, **kwargs)
+
+    first = asyncio.run(collect(chunk_size=2, profile=True))
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        second = asyncio.run(collect(chunk_size=3, executor=executor))
+    assert first.Nsim == 7
+    assert first.stats.n_runs == 7
+    np.testing.assert_array_equal(first.get_stacked_compartments()["Infected_total"], 
+                                  second.get_stacked_compartments()["Infected_total"])
+
+    async def stream(n_stop):
+        trajectories = []
+        simulations = mock_epimodel.aiter_simulations(Nsim=20, chunk_size=2, max_pending_chunks=1, **kwargs)
+        async for trajectory in simulations:
+            trajectories.append(trajectory)
+            if len(trajectories) == n_stop:
+                break
+        await simulations.aclose()
+        return trajectories
+
+    assert len(asyncio.run(stream(n_stop=None))) == 20
+    assert len(asyncio.run(stream(n_stop=3))) == 3
+
+
+def test_iter_simulations(mock_epimodel):
+    """Test lazily iterating over simulations"""
+    kwargs = dict(start_date="2020-01-01", end_date="2020-02-01", 
+                  initial_conditions_dict={"Susceptible": np.array([990, 990, 990]), "Infected": np.array([10, 10, 10])})
+    np.random.seed(0)
+    results = mock_epimodel.run_simulations(Nsim=5, **kwargs)
+
+    np.random.seed(0)
+    trajectories = list(mock_epimodel.iter_simulations(Nsim=5, **kwargs))
+    np.random.seed(0)
+    chunks = list(mock_epimodel.iter_simulations(Nsim=5, chunk_size=2, **kwargs))
+    assert [chunk.Nsim for chunk in chunks] == [2, 2, 1]
+    for i, trajectory in enumerate(trajectories):
+        np.testing.assert_array_equal(trajectory.compartments["Infected_total"], results.trajectories[i].compartments["Infected_total"])
+        np.testing.assert_array_equal(chunks[i // 2].trajectories[i % 2].compartments["Infected_total"], 
+                                      results.trajectories[i].compartments["Infected_total"])
+
+    # Simulations are only run when requested
+    simulations = mock_epimodel.iter_simulations(Nsim=1000, **kwargs)
+    assert isinstance(next(simulations).compartments["Infected_total"], np.ndarray)
+
+
+def test_sweep(mock_epimodel):
+    """Test batched parameter sweeps"""
+    from epydemix.model import SweepResults
+    mock_epimodel.override_parameter("2020-01-20", "2020-01-31", "transmission_rate", 0.)
+    initial_conditions = {"Susceptible": np.array([990, 990, 990]), "Infected": np.array([10, 10, 10])}
+    grid = {"transmission_rate": [0., 0.3, 0.6], "recovery_rate": [0.1, 0.2]}
+    results = mock_epimodel.sweep(grid, Nsim_per_point=4, start_date="2020-01-01", end_date="2020-01-31", 
+                                  initial_conditions_dict=initial_conditions, batch_size=10)
+
+    assert isinstance(results, SweepResults)
+    assert len(results) == 6
+    assert results.Nsim_per_point == 4
+    assert list(results.points.columns) == ["transmission_rate", "recovery_rate"]
+    assert results.compartments.shape == (6, 4, 31, 3, 3)
+
+    # Points without transmission have no new infections, and overrides of swept parameters are applied
+    new_infections = results.transitions[..., mock_epimodel.transitions_idx["Susceptible_to_Infected"], :].sum(axis=-1)
+    assert np.all(new_infections[:2] == 0)
+    assert np.all(new_infections[2:, :, :19].sum(axis=-1) > 0)
+    assert np.all(new_infections[:, :, 19:] == 0)
+
+    # Results of a grid point are available as SimulationResults
+    point = results[5]
+    assert point.Nsim == 4
+    assert point.parameters["transmission_rate"] == 0.6
+    np.testing.assert_array_equal(point.get_stacked_compartments()["Infected_total"], results.get_totals("Infected")[5])
+
+    # Lists of parameter sets are supported
+    results = mock_epimodel.sweep([{"transmission_rate": 0.3}, {"transmission_rate": 0.5}], Nsim_per_point=2, 
+                                  start_date="2020-01-01", end_date="2020-01-31", initial_conditions_dict=initial_conditions)
+    assert len(results) == 2
+
+    # Batches of grid points are simulated lazily, and outputs are stored without trajectories
+    kwargs = dict(start_date="2020-01-01", end_date="2020-01-31", initial_conditions_dict=initial_conditions, batch_size=8)
+    batches = list(mock_epimodel.iter_sweep(grid, Nsim_per_point=4, **kwargs))
+    assert [list(batch.points.index) for batch in batches] == [[0, 1], [2, 3], [4, 5]]
+    assert batches[1].compartments.shape == (2, 4, 31, 3, 3)
+    peaks = lambda batch: batch.get_totals("Infected").max(axis=-1)
+    results = mock_epimodel.sweep(grid, Nsim_per_point=4, outputs={"peak": peaks}, **kwargs)
+    assert results.compartments is None and results.outputs["peak"].shape == (6, 4)
+    assert np.all(results.outputs["peak"][:2] <= 30) and np.all(results.outputs["peak"][4:] > 30)
+    with pytest.raises(ValueError):
+        results.get_results(0)
+
+    # Grid points of a batch are addressed by their position in the batch
+    assert batches[1][0].parameters["transmission_rate"] == 0.3
+    np.testing.assert_array_equal(batches[1][1].get_stacked_compartments()["Infected_total"], 
+                                  batches[1].get_totals("Infected")[1])
+
+    # Parameters omitted by a grid point keep their model value, and integers stay integers
+    mock_epimodel.add_parameter("n_contacts", 2)
+    results = mock_epimodel.sweep([{"transmission_rate": 0.3, "recovery_rate": 0.2, "n_contacts": 3}, 
+                                   {"transmission_rate": 0.5}], Nsim_per_point=1, **kwargs)
+    assert results.get_point_parameters(0) == {"transmission_rate": 0.3, "recovery_rate": 0.2, "n_contacts": 3}
+    assert isinstance(results.get_point_parameters(0)["n_contacts"], int)
+    assert results.get_point_parameters(1) == {"transmission_rate": 0.5, "recovery_rate": 0.1, "n_contacts": 2}
+
+    with pytest.raises(ValueError, match="unknown_rate"):
+        mock_epimodel.sweep([{"transmission_rate": 0.3}, {"unknown_rate": 0.5}], **kwargs)
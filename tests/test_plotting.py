@@ -314,4 +314,57 @@ def test_plot_distance_distribution(mock_distance_data):
     total_area = sum(patch.get_height() * patch.get_width() for patch in ax.patches)
     assert np.isclose(total_area, 1.0, rtol=1e-2)  # Should be normalized to 1
     
-    plt.close()
\ No newline at end of file
+    plt.close()
+def test_plot_spectral_radius(monkeypatch):
+    """Test that the spectral radius is computed once per distinct contact matrix"""
+    from epydemix.model import EpiModel, reproduction_number
+    from epydemix.utils import compute_simulation_dates
+    from epydemix.visualization.plotting import plot_spectral_radius
+    population = Population()
+    population.add_population([1000, 2000])
+    population.add_contact_matrix(np.array([[2., 1.], [1., 3.]]), "home")
+    population.add_contact_matrix(np.array([[1., 0.5], [0.5, 1.]]), "work")
+    model = EpiModel(compartments=["S", "I", "R"], parameters={"transmission_rate": 0.3, "recovery_rate": 0.1})
+    model.set_population(population)
+    model.add_intervention(layer_name="work", start_date="2023-01-10", end_date="2023-01-20", reduction_factor=0.5)
+    model.compute_contact_reductions(compute_simulation_dates("2023-01-01", "2023-01-31"))
+
+    calls = []
+    eigvals = np.linalg.eigvals
+    monkeypatch.setattr(np.linalg, "eigvals", lambda matrix: calls.append(matrix) or eigvals(matrix))
+    reproduction_number._spectral_radii.clear()
+    ax = plot_spectral_radius(model)
+    assert len(calls) == 2
+
+    rho = ax.get_lines()[0].get_ydata()
+    expected = [eigvals(model.Cs[date]["overall"]).max().real for date in model.Cs]
+    np.testing.assert_allclose(rho, expected)
+    plt.close()
+
+def test_plot_spectral_radius_dates():
+    """Test that contact matrices are computed on demand when dates are provided"""
+    from epydemix.model import EpiModel
+    from epydemix.visualization.plotting import plot_spectral_radius
+    population = Population()
+    population.add_population([1000, 2000])
+    population.add_contact_matrix(np.array([[2., 1.], [1., 3.]]), "home")
+    model = EpiModel(compartments=["S", "I", "R"], parameters={"transmission_rate": 0.3, "recovery_rate": 0.1})
+    model.set_population(population)
+    model.add_transition("S", "I", "mediated", ("transmission_rate", "I"))
+    model.add_transition("I", "R", "spontaneous", "recovery_rate")
+    model.add_intervention(layer_name="home", start_date="2023-01-10", end_date="2023-01-20", reduction_factor=0.5)
+    model.run_simulations(start_date="2023-01-01", end_date="2023-01-31", Nsim=2)
+
+    # Simulations do not store contact matrices in the model
+    with pytest.raises(ValueError):
+        plot_spectral_radius(model)
+    with pytest.raises(ValueError):
+        plot_spectral_radius(model, start_date="2023-01-01")
+
+    ax = plot_spectral_radius(model, start_date="2023-01-01", end_date="2023-01-31")
+    rho = ax.get_lines()[0].get_ydata()
+    assert len(rho) == 31
+    rho_home = (5 + np.sqrt(5)) / 2
+    np.testing.assert_allclose(rho[[0, 12, 25]], [rho_home, rho_home / 2, rho_home])
+    assert model.Cs == {}
+    plt.close()
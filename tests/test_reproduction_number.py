@@ -0,0 +1,82 @@
+import pytest
+import numpy as np
+from epydemix.model import EpiModel, compute_R0, compute_Rt, compute_transmission_rate
+from epydemix.model.reproduction_number import spectral_radius, spectral_radii, get_infected_compartments, get_susceptibles
+from epydemix.population import Population
+from epydemix.utils import compute_simulation_dates
+
+
+@pytest.fixture
+def population():
+    population = Population()
+    population.add_population([1000, 3000, 2000])
+    population.add_contact_matrix(np.array([[3., 1., 0.5], [1., 4., 1.], [0.5, 1., 2.]]))
+    return population
+
+
+@pytest.fixture
+def seir_model(population):
+    model = EpiModel(compartments=["S", "E", "I", "R"], 
+                     parameters={"transmission_rate": 0.05, "latent_rate": 0.25, "recovery_rate": 0.1})
+    model.add_transition("S", "E", "mediated", ("transmission_rate", "I"))
+    model.add_transition("E", "I", "spontaneous", "latent_rate")
+    model.add_transition("I", "R", "spontaneous", "recovery_rate")
+    model.set_population(population)
+    return model
+
+
+def test_spectral_radius():
+    matrix = np.array([[2., 1.], [1., 2.]])
+    assert spectral_radius(matrix) == pytest.approx(3.)
+    radii = spectral_radii(np.stack([matrix, 2 * matrix, matrix]))
+    np.testing.assert_allclose(radii, [3., 6., 3.])
+
+
+def test_compute_R0(seir_model, population):
+    assert get_infected_compartments(seir_model) == ["E", "I"]
+
+    # For SEIR models R0 is the spectral radius of beta * diag(N) C diag(1/N) / gamma
+    Nk, C = population.Nk, population.contact_matrices["all"]
+    expected = spectral_radius(0.05 * (Nk[:, None] * C / Nk[None, :]) / 0.1)
+    assert compute_R0(seir_model) == pytest.approx(expected)
+
+    beta = compute_transmission_rate(seir_model, 2.5)
+    assert compute_R0(seir_model, parameters={**seir_model.parameters, "transmission_rate": beta}) == pytest.approx(2.5)
+    np.testing.assert_allclose(compute_transmission_rate(seir_model, np.array([1.5, 3.])), [1.5 * beta / 2.5, 3. * beta / 2.5])
+
+
+
+def test_compute_transmission_rate_cache(seir_model, monkeypatch):
+    from epydemix.model import reproduction_number
+    calls = []
+    compute_ngm = reproduction_number._compute_initial_next_generation_matrix
+    monkeypatch.setattr(reproduction_number, "_compute_initial_next_generation_matrix",
+                        lambda *args: calls.append(args) or compute_ngm(*args))
+    reproduction_number._spectral_radii.clear()
+
+    beta = compute_transmission_rate(seir_model, 2.5)
+    assert compute_transmission_rate(seir_model, 5.) == pytest.approx(2 * beta)
+    assert len(calls) == 1
+
+    # Other inputs of the next-generation matrix are part of the key
+    parameters = {**seir_model.parameters, "recovery_rate": 0.2}
+    assert compute_transmission_rate(seir_model, 2.5, parameters=parameters) == pytest.approx(2 * beta)
+    assert compute_transmission_rate(seir_model, 2.5, contact_matrix=2 * seir_model.population.contact_matrices["all"]) == pytest.approx(beta / 2)
+    assert len(calls) == 3
+
+def test_compute_Rt(seir_model):
+    dates = compute_simulation_dates("2020-01-01", "2020-02-29")
+    seir_model.add_intervention(layer_name="all", start_date="2020-02-01", end_date="2020-02-29", reduction_factor=0.5)
+    Rt = compute_Rt(seir_model, dates)
+    assert Rt.shape == (len(dates),)
+    assert Rt[0] == pytest.approx(compute_R0(seir_model))
+    assert Rt[-1] == pytest.approx(0.5 * Rt[0])
+
+    # Rt for each replicate and date, accounting for the depletion of susceptibles
+    results = seir_model.run_simulations(start_date="2020-01-01", end_date="2020-02-29", Nsim=3, 
+                                         initial_conditions_dict={"S": np.array([990, 2990, 1990]), "I": np.array([10, 10, 10])})
+    susceptibles = get_susceptibles(seir_model, results)
+    assert susceptibles["S"].shape == (3, len(dates), 3)
+    Rt_replicates = compute_Rt(seir_model, dates, susceptibles=susceptibles)
+    assert Rt_replicates.shape == (3, len(dates))
+    assert np.all(Rt_replicates <= Rt + 1e-9)
@@ -0,0 +1,75 @@
+import copy
+import pytest
+import numpy as np
+from pandas import Timestamp
+from epydemix.model import EpiModel, run_scenarios
+from epydemix.population import Population
+
+
+@pytest.fixture
+def base_model():
+    model = EpiModel(
+        compartments=["Susceptible", "Infected", "Recovered"],
+        parameters={"transmission_rate": 0.3, "recovery_rate": 0.1}
+    )
+    model.add_transition("Susceptible", "Infected", "mediated", ("transmission_rate", "Infected"))
+    model.add_transition("Infected", "Recovered", "spontaneous", "recovery_rate")
+
+    population = Population()
+    population.add_population([10000, 10000])
+    population.add_contact_matrix(np.ones((2, 2)))
+    model.set_population(population)
+    return model
+
+
+def test_run_scenarios(base_model):
+    """Test that scenarios share the prefix and differ after the branch date"""
+    lockdown = copy.deepcopy(base_model)
+    lockdown.override_parameter("2020-02-01", "2020-03-31", "transmission_rate", 0.)
+
+    initial_conditions = {"Susceptible": np.array([9900, 9900]), "Infected": np.array([100, 100])}
+    results = run_scenarios(base_model, {"baseline": base_model, "lockdown": lockdown}, branch_date="2020-02-01", 
+                            Nsim=5, start_date="2020-01-01", end_date="2020-03-31", 
+                            initial_conditions_dict=initial_conditions)
+
+    assert set(results.keys()) == {"baseline", "lockdown"}
+    baseline, lockdown = results["baseline"], results["lockdown"]
+    assert baseline.Nsim == lockdown.Nsim == 5
+    assert Timestamp(baseline.dates[0]) == Timestamp("2020-01-01")
+    assert Timestamp(baseline.dates[-1]) == Timestamp("2020-03-31")
+    assert len(baseline.dates) == len(lockdown.dates) == 91
+
+    n_prefix = 31
+    for tr_baseline, tr_lockdown in zip(baseline.trajectories, lockdown.trajectories):
+        np.testing.assert_array_equal(tr_baseline.compartments["Infected_total"][:n_prefix], 
+                                      tr_lockdown.compartments["Infected_total"][:n_prefix])
+        # No new infections once the transmission rate is set to zero
+        assert np.all(tr_lockdown.transitions["Susceptible_to_Infected_total"][n_prefix:] == 0)
+        assert tr_lockdown.parameters["transmission_rate"].shape[0] == 91
+
+
+def test_run_scenarios_invalid_branch_date(base_model):
+    with pytest.raises(ValueError):
+        run_scenarios(base_model, {"baseline": base_model}, branch_date="2020-01-01", Nsim=1, 
+                      start_date="2020-01-01", end_date="2020-03-31")
+    with pytest.raises(ValueError):
+        run_scenarios(base_model, {"baseline": base_model}, branch_date="2020-04-01", Nsim=1, 
+                      start_date="2020-01-01", end_date="2020-03-31")
+
+
+def test_run_scenarios_common_random_numbers(base_model):
+    """Test that common random numbers reduce the variance of differences between scenarios"""
+    reduced = copy.deepcopy(base_model)
+    reduced.override_parameter("2020-01-15", "2020-03-31", "transmission_rate", 0.27)
+    scenarios = {"baseline": base_model, "reduced": reduced}
+    kwargs = dict(branch_date="2020-01-15", Nsim=30, start_date="2020-01-01", end_date="2020-03-31",
+                  initial_conditions_dict={"Susceptible": np.array([9990, 9990]), "Infected": np.array([10, 10])})
+
+    def difference_variance(results):
+        final_size = {name: res.get_stacked_compartments()["Recovered_total"][:, -1] for name, res in results.items()}
+        return np.var(final_size["baseline"] - final_size["reduced"])
+
+    np.random.seed(0)
+    independent = run_scenarios(base_model, scenarios, **kwargs)
+    common = run_scenarios(base_model, scenarios, crn_seed=0, **kwargs)
+    assert difference_variance(common) < difference_variance(independent)
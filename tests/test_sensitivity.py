@@ -0,0 +1,99 @@
+import pytest
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from epydemix.model import EpiModel
+from epydemix.population import Population
+from epydemix.analysis import (sobol_sample, sobol_indices, morris_sample, morris_indices, run_sobol_analysis,
+                               run_morris_analysis, attack_rate, peak_incidence, SensitivityResults)
+
+
+@pytest.fixture
+def mock_epimodel():
+    model = EpiModel(
+        compartments=["Susceptible", "Infected", "Recovered"],
+        parameters={"transmission_rate": 0.3, "recovery_rate": 0.1}
+    )
+    model.add_transition("Susceptible", "Infected", "mediated", ("transmission_rate", "Infected"))
+    model.add_transition("Infected", "Recovered", "spontaneous", "recovery_rate")
+
+    population = Population()
+    population.add_population([1000, 1000, 1000])
+    population.add_contact_matrix(np.ones((3, 3)))
+    model.set_population(population)
+    return model
+
+
+@pytest.fixture
+def ishigami_bounds():
+    return {"x1": (-np.pi, np.pi), "x2": (-np.pi, np.pi), "x3": (-np.pi, np.pi)}
+
+
+def test_sobol_indices(ishigami_bounds):
+    """Test Sobol indices against the analytical values of the Ishigami function"""
+    samples = sobol_sample(ishigami_bounds, 4096, seed=1)
+    assert samples.shape == (4096 * 5, 3)
+    assert np.all(samples.abs() <= np.pi)
+
+    x = samples.to_numpy()
+    y = np.sin(x[:, 0]) + 7 * np.sin(x[:, 1]) ** 2 + 0.1 * x[:, 2] ** 4 * np.sin(x[:, 0])
+    first_order, total = sobol_indices(y, 3)
+    np.testing.assert_allclose(first_order, [0.314, 0.442, 0.], atol=0.02)
+    np.testing.assert_allclose(total, [0.558, 0.442, 0.244], atol=0.02)
+
+    with pytest.raises(ValueError):
+        sobol_sample({"x1": (1., 0.)}, 8)
+
+
+def test_morris_indices(ishigami_bounds):
+    """Test elementary effects of a function with known effects"""
+    samples = morris_sample(ishigami_bounds, 20, seed=2)
+    assert samples.shape == (20 * 4, 3)
+
+    x = samples.to_numpy()
+    mu, mu_star, sigma = morris_indices(samples, 2 * x[:, 0] + x[:, 2] ** 2, ishigami_bounds)
+    # Effects are computed on the unit scale, where x1 has slope 2 * 2pi
+    np.testing.assert_allclose(mu[:2], [4 * np.pi, 0.], atol=1e-10)
+    np.testing.assert_allclose(sigma[:2], [0., 0.], atol=1e-10)
+    assert mu_star[2] > 0 and sigma[2] > 0
+
+
+def test_run_sobol_analysis(mock_epimodel):
+    """Test Sobol analysis of model outputs"""
+    bounds = {"transmission_rate": (0.2, 0.5), "recovery_rate": (0.1, 0.2)}
+    outputs = {"peak": peak_incidence("Susceptible_to_Infected"), "attack_rate": attack_rate("Susceptible_to_Infected")}
+    initial_conditions = {"Susceptible": np.array([990, 990, 990]), "Infected": np.array([10, 10, 10])}
+    kwargs = dict(start_date="2020-01-01", end_date="2020-03-31", initial_conditions_dict=initial_conditions, 
+                  n=16, seed=3, chunk_size=20)
+    results = run_sobol_analysis(mock_epimodel, bounds, outputs, **kwargs)
+
+    assert isinstance(results, SensitivityResults)
+    assert results.method == "sobol"
+    assert results.outputs.shape == (16 * 4, 2)
+    assert np.all((results.outputs["attack_rate"] >= 0) & (results.outputs["attack_rate"] <= 1))
+    assert list(results.get_indices("peak").index) == ["transmission_rate", "recovery_rate"]
+    assert results.get_indices("peak").loc["transmission_rate", "ST"] > results.get_indices("peak").loc["recovery_rate", "ST"]
+
+    # Results do not depend on the executor
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        parallel = run_sobol_analysis(mock_epimodel, bounds, outputs, executor=executor, **kwargs)
+    np.testing.assert_array_equal(parallel.outputs.to_numpy(), results.outputs.to_numpy())
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        parallel = run_sobol_analysis(mock_epimodel, bounds, outputs, executor=executor, **kwargs)
+    np.testing.assert_array_equal(parallel.outputs.to_numpy(), results.outputs.to_numpy())
+
+    with pytest.raises(ValueError):
+        run_sobol_analysis(mock_epimodel, bounds, {"peak": peak_incidence("Unknown")}, **kwargs)
+
+
+def test_run_morris_analysis(mock_epimodel):
+    """Test Morris screening of model outputs"""
+    bounds = {"transmission_rate": (0.2, 0.5), "recovery_rate": (0.1, 0.2)}
+    initial_conditions = {"Susceptible": np.array([990, 990, 990]), "Infected": np.array([10, 10, 10])}
+    results = run_morris_analysis(mock_epimodel, bounds, {"attack_rate": attack_rate("Susceptible_to_Infected")},
+                                  n_trajectories=5, seed=4, start_date="2020-01-01", end_date="2020-03-31", 
+                                  initial_conditions_dict=initial_conditions)
+    assert results.method == "morris"
+    assert len(results.samples) == 15
+    indices = results.get_indices("attack_rate")
+    assert indices.loc["transmission_rate", "mu"] > 0
+    assert indices.loc["recovery_rate", "mu"] < 0
@@ -0,0 +1,62 @@
+import pytest
+import numpy as np
+import pandas as pd
+from epydemix.utils.utils import (
+    resize_parameter,
+    compact_parameter,
+    create_definitions,
+    apply_overrides,
+    compile_overrides,
+    compute_simulation_dates
+)
+
+def test_resize_parameter_broadcast():
+    """Test that resized parameters are broadcast views with the expected shape"""
+    T, n_age = 100, 5
+
+    scalar = resize_parameter(0.3, T, n_age)
+    assert scalar.shape == (T, n_age)
+    assert np.all(scalar == 0.3)
+    assert not scalar.flags.writeable
+    assert compact_parameter(scalar).shape == (1, 1)
+
+    time_varying = resize_parameter(np.arange(T), T, n_age)
+    assert time_varying.shape == (T, n_age)
+    assert np.all(time_varying[:, 2] == np.arange(T))
+    assert compact_parameter(time_varying).shape == (T, 1)
+
+    age_varying = resize_parameter(np.arange(n_age).reshape(1, n_age), T, n_age)
+    assert age_varying.shape == (T, n_age)
+    assert compact_parameter(age_varying).shape == (1, n_age)
+
+    full = resize_parameter(np.ones((T, n_age)), T, n_age)
+    assert compact_parameter(full).shape == (T, n_age)
+
+def test_apply_overrides_does_not_alias_definitions():
+    """Test that overrides are applied to a copy of the definitions"""
+    dates = compute_simulation_dates("2020-01-01", "2020-01-10")
+    definitions = create_definitions({"beta": 0.3, "gamma": 0.1}, len(dates), 2)
+    overrides = {"beta": [{"start_date": "2020-01-03", "end_date": "2020-01-05", "value": 0.1}]}
+
+    result = apply_overrides(definitions, overrides, dates)
+    assert np.allclose(result["beta"][2:5], 0.1)
+    assert np.allclose(result["beta"][:2], 0.3)
+    assert np.allclose(result["beta"][5:], 0.3)
+    assert np.allclose(definitions["beta"], 0.3)
+    assert result["gamma"] is definitions["gamma"]
+
+def test_compile_overrides():
+    """Test that overrides are compiled into index ranges over the simulation dates"""
+    dates = compute_simulation_dates("2020-01-01", "2020-01-10", dt=0.5)
+    overrides = {"beta": [{"start_date": "2020-01-02", "end_date": "2020-01-03", "value": 0.1},
+                          {"start_date": "2019-12-01", "end_date": "2019-12-31", "value": 0.2}]}
+    compiled = compile_overrides(overrides, dates, n_age=3)
+
+    start, stop, value = compiled["beta"][0]
+    assert (start, stop) == (2, 5)
+    assert value.shape == (3, 3)
+    start, stop, value = compiled["beta"][1]
+    assert start == stop == 0
+
+    with pytest.raises(ValueError):
+        compile_overrides({"beta": [{"start_date": "2020-01-02", "end_date": "2020-01-03", "value": np.ones(2)}]}, dates, n_age=3)
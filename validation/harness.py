@@ -0,0 +1,258 @@
+"""
+Statistical-equivalence and speed harness comparing EpiModel against the reference models in `validation/models`.
+
+For each reference model, the harness runs the hand-written implementation and the equivalent EpiModel
+across many seeds, compares the distributions of compartment trajectories with two-sample Kolmogorov-Smirnov
+tests, and reports the runtime ratio between the two. The process exits with a non-zero status if any
+comparison fails, so that alternative simulation engines can be accepted automatically:
+
+    python validation/harness.py                                   # all models, default settings
+    python validation/harness.py --models sir seir --nsim 1000     # selected models
+    python validation/harness.py --engine my_module:my_engine      # test an alternative engine
+    python validation/harness.py --max-runtime-ratio 0.5           # also require a 2x speedup
+
+An engine is a callable `engine(model, Nsim, seed, **simulation_kwargs)` returning a dictionary mapping
+compartment names to arrays of shape (Nsim, timesteps) with totals over demographic groups.
+"""
+import argparse
+import importlib
+import os
+import sys
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from scipy.stats import ks_2samp
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.stochastic_sir import StochasticSIR
+from models.stochastic_seir import StochasticSEIR
+from models.stochastic_sis import StochasticSIS
+from models.stochastic_sir_population import StochasticSIRAgeGroups
+from models.stochastic_seir_population import StochasticSEIRAgeGroups
+from models.stochastic_sis_population import StochasticSISAgeGroups
+from epydemix import EpiModel, simulate
+from epydemix.population import Population
+
+
+START_DATE = pd.Timestamp("2020-01-01")
+POPULATION = np.array([40000, 100000, 60000])
+CONTACT_MATRIX = np.array([[4.0, 1.5, 0.5],
+                           [1.5, 3.0, 1.0],
+                           [0.5, 1.0, 2.0]]) / 4
+BETA, SIGMA, GAMMA = 0.3, 0.25, 0.1
+
+
+@dataclass
+class ValidationCase:
+    """
+    A reference model and the equivalent EpiModel.
+
+    Attributes:
+        create_reference (Callable): Function creating the reference model for a number of time steps
+        create_model (Callable): Function creating the equivalent EpiModel
+        initial_conditions (Dict[str, np.ndarray]): Initial conditions of the EpiModel
+        compartments (List[str]): Compartments to compare
+    """
+    create_reference: Callable
+    create_model: Callable
+    initial_conditions: Dict[str, np.ndarray]
+    compartments: List[str]
+
+
+def create_model(compartments: List[str], population: np.ndarray, contact_matrix: np.ndarray) -> EpiModel:
+    """
+    Creates the EpiModel equivalent to a reference model.
+
+    Args:
+        compartments (List[str]): The compartments of the model, among S, E, I, R
+        population (np.ndarray): The population of each demographic group
+        contact_matrix (np.ndarray): The contact matrix
+
+    Returns:
+        EpiModel: The model
+    """
+    model = EpiModel(compartments=compartments, parameters={"beta": BETA, "sigma": SIGMA, "gamma": GAMMA})
+    if "E" in compartments:
+        model.add_transition("S", "E", kind="mediated", params=("beta", "I"))
+        model.add_transition("E", "I", kind="spontaneous", params="sigma")
+    else:
+        model.add_transition("S", "I", kind="mediated", params=("beta", "I"))
+    model.add_transition("I", "R" if "R" in compartments else "S", kind="spontaneous", params="gamma")
+
+    pop = Population()
+    pop.add_population(population)
+    pop.add_contact_matrix(contact_matrix)
+    model.set_population(pop)
+    return model
+
+
+def get_validation_cases() -> Dict[str, ValidationCase]:
+    """Returns the validation cases, keyed by name."""
+    N, Nk = int(POPULATION.sum()), POPULATION
+    I0, I0k = 20, np.array([5, 10, 5])
+    zeros = np.zeros_like(Nk)
+    single = np.array([[1.0]])
+    return {
+        "sir": ValidationCase(
+            lambda T: StochasticSIR(N - I0, I0, 0, BETA, GAMMA, N, T),
+            lambda: create_model(["S", "I", "R"], np.array([N]), single),
+            {"S": np.array([N - I0]), "I": np.array([I0])}, ["S", "I", "R"]),
+        "seir": ValidationCase(
+            lambda T: StochasticSEIR(N - I0, 0, I0, 0, BETA, SIGMA, GAMMA, N, T),
+            lambda: create_model(["S", "E", "I", "R"], np.array([N]), single),
+            {"S": np.array([N - I0]), "I": np.array([I0])}, ["S", "E", "I", "R"]),
+        "sis": ValidationCase(
+            lambda T: StochasticSIS(N - I0, I0, BETA, GAMMA, N, T),
+            lambda: create_model(["S", "I"], np.array([N]), single),
+            {"S": np.array([N - I0]), "I": np.array([I0])}, ["S", "I"]),
+        "sir_population": ValidationCase(
+            lambda T: StochasticSIRAgeGroups(Nk - I0k, I0k.copy(), zeros.copy(), BETA, GAMMA, CONTACT_MATRIX, Nk, T),
+            lambda: create_model(["S", "I", "R"], Nk, CONTACT_MATRIX),
+            {"S": Nk - I0k, "I": I0k}, ["S", "I", "R"]),
+        "seir_population": ValidationCase(
+            lambda T: StochasticSEIRAgeGroups(Nk - I0k, zeros.copy(), I0k.copy(), zeros.copy(), BETA, SIGMA, GAMMA,
+                                              CONTACT_MATRIX, Nk, T),
+            lambda: create_model(["S", "E", "I", "R"], Nk, CONTACT_MATRIX),
+            {"S": Nk - I0k, "I": I0k}, ["S", "E", "I", "R"]),
+        "sis_population": ValidationCase(
+            lambda T: StochasticSISAgeGroups(Nk - I0k, I0k.copy(), BETA, GAMMA, CONTACT_MATRIX, Nk, T),
+            lambda: create_model(["S", "I"], Nk, CONTACT_MATRIX),
+            {"S": Nk - I0k, "I": I0k}, ["S", "I"]),
+    }
+
+
+def run_reference(case: ValidationCase, Nsim: int, seed: int, time_steps: int) -> Dict[str, np.ndarray]:
+    """
+    Runs the reference model across seeds.
+
+    Returns:
+        Dict[str, np.ndarray]: Compartment totals of shape (Nsim, time_steps - 1), excluding the initial state
+    """
+    np.random.seed(seed)
+    reference = case.create_reference(time_steps)
+    trajectories = {comp: np.zeros((Nsim, time_steps)) for comp in case.compartments}
+    for n in range(Nsim):
+        results = reference.simulate()
+        for comp in case.compartments:
+            values = np.array(results[comp], dtype=float)
+            values = values.reshape(len(values), -1).sum(axis=1)
+            # Reference models stop when no infected individuals are left, the state is then absorbing
+            trajectories[comp][n, :len(values)] = values
+            trajectories[comp][n, len(values):] = values[-1]
+    return {comp: values[:, 1:] for comp, values in trajectories.items()}
+
+
+def epimodel_engine(model: EpiModel, Nsim: int, seed: int, **simulation_kwargs) -> Dict[str, np.ndarray]:
+    """
+    Default engine, running `simulate` once per replicate.
+
+    Returns:
+        Dict[str, np.ndarray]: Compartment totals of shape (Nsim, timesteps)
+    """
+    np.random.seed(seed)
+    trajectories = [simulate(model, **simulation_kwargs) for _ in range(Nsim)]
+    return {comp: np.stack([traj.compartments[f"{comp}_total"] for traj in trajectories])
+            for comp in model.compartments}
+
+
+def compare_case(name: str,
+                 case: ValidationCase,
+                 engine: Callable,
+                 Nsim: int,
+                 seed: int,
+                 time_steps: int,
+                 n_checkpoints: int,
+                 alpha: float) -> pd.DataFrame:
+    """
+    Compares the trajectory distributions of a reference model and of the equivalent EpiModel.
+
+    Trajectories are compared at `n_checkpoints` evenly spaced time steps (including the last one), and on
+    the peak of each compartment, with two-sample Kolmogorov-Smirnov tests. The significance level is
+    Bonferroni-corrected for the number of tests of the case.
+
+    Returns:
+        pd.DataFrame: One row per test, with the test statistic, the p-value and the outcome
+    """
+    start_time = time.perf_counter()
+    reference = run_reference(case, Nsim, seed, time_steps)
+    reference_time = time.perf_counter() - start_time
+
+    model = case.create_model()
+    start_time = time.perf_counter()
+    simulated = engine(model, Nsim, seed + 1,
+                       start_date=START_DATE,
+                       end_date=START_DATE + pd.Timedelta(days=time_steps - 2),
+                       initial_conditions_dict=case.initial_conditions)
+    engine_time = time.perf_counter() - start_time
+
+    checkpoints = np.unique(np.linspace(0, time_steps - 2, n_checkpoints).astype(int))
+    statistics = []
+    for comp in case.compartments:
+        for t in checkpoints:
+            statistics.append((comp, f"t={t + 1}", reference[comp][:, t], simulated[comp][:, t]))
+        statistics.append((comp, "max", reference[comp].max(axis=1), simulated[comp].max(axis=1)))
+
+    corrected_alpha = alpha / len(statistics)
+    rows = []
+    for comp, statistic, x, y in statistics:
+        if np.all(x == x[0]) and np.all(y == x[0]):
+            ks_statistic, p_value = 0., 1.
+        else:
+            ks_statistic, p_value = ks_2samp(x, y)
+        rows.append({"model": name, "compartment": comp, "statistic": statistic,
+                     "ks_statistic": ks_statistic, "p_value": p_value, "passed": p_value >= corrected_alpha,
+                     "reference_time": reference_time, "engine_time": engine_time,
+                     "runtime_ratio": engine_time / reference_time})
+    return pd.DataFrame(rows)
+
+
+def load_engine(path: Optional[str]) -> Callable:
+    """Loads an engine from a `module:function` path, or returns the default engine if path is None."""
+    if path is None:
+        return epimodel_engine
+    module_name, function_name = path.split(":")
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+def main() -> int:
+    cases = get_validation_cases()
+    parser = argparse.ArgumentParser(description="Compare EpiModel against the reference models.")
+    parser.add_argument("--models", nargs="+", default=list(cases.keys()), choices=list(cases.keys()))
+    parser.add_argument("--nsim", type=int, default=500, help="Number of simulations per model.")
+    parser.add_argument("--time-steps", type=int, default=150, help="Number of time steps.")
+    parser.add_argument("--checkpoints", type=int, default=10, help="Number of time steps compared.")
+    parser.add_argument("--alpha", type=float, default=0.01, help="Family-wise significance level per model.")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--engine", default=None, help="Engine to test, as module:function.")
+    parser.add_argument("--max-runtime-ratio", type=float, default=None,
+                        help="Maximum accepted ratio between engine and reference runtimes.")
+    parser.add_argument("--output", default=None, help="Path of a CSV file where the report is saved.")
+    args = parser.parse_args()
+
+    engine = load_engine(args.engine)
+    report = pd.concat([
+        compare_case(name, cases[name], engine, args.nsim, args.seed, args.time_steps, args.checkpoints, args.alpha)
+        for name in args.models
+    ], ignore_index=True)
+
+    summary = report.groupby("model", sort=False).agg(
+        tests=("passed", "size"), failed=("passed", lambda passed: int((~passed).sum())),
+        min_p_value=("p_value", "min"), runtime_ratio=("runtime_ratio", "first"))
+    summary["speed_ok"] = True if args.max_runtime_ratio is None else summary["runtime_ratio"] <= args.max_runtime_ratio
+    print(summary.to_string())
+
+    if args.output is not None:
+        report.to_csv(args.output, index=False)
+
+    accepted = (summary["failed"] == 0).all() and summary["speed_ok"].all()
+    print("\nACCEPTED" if accepted else "\nREJECTED")
+    return 0 if accepted else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())